@@ -0,0 +1,144 @@
+"""
+A* over the flat nav grid.
+
+Same search as Pathfinder._astar_reference() (4-connected, unit cost,
+Manhattan heuristic, ties in the open list broken by cell) but on integer
+cell indexes instead of (x, y) tuples:
+
+  * each cell's walkable neighbours are precomputed once per nav grid
+    version, in get_neighbors() order (+y, +x, -y, -x);
+  * cost and parent live in flat lists allocated once and reused by every
+    search; a per-cell generation stamp says whether the value belongs to
+    the current search, so nothing is cleared between calls.
+
+Index x * height + y orders cells exactly like (x, y) tuples, so the open
+list pops in the same order and every path is identical to the reference.
+
+nearest() reuses the same arrays for a breadth-first search from one cell
+that stops at the closest of several candidate goals.
+"""
+import heapq
+
+
+class GridAStar:
+    """Reusable A* search state for one NavGrid."""
+
+    def __init__(self, nav_grid):
+        self.nav_grid = nav_grid
+        w, h = nav_grid.width, nav_grid.height
+        n = w * h
+        self.width, self.height = w, h
+        self.xs = [i // h for i in range(n)]
+        self.ys = [i % h for i in range(n)]
+        self._stamp = [0] * n
+        self._cost = [0] * n
+        self._parent = [0] * n
+        self._generation = 0
+        self.version = None
+        self.adjacency = None
+        self.searches = 0
+
+    def _build_adjacency(self):
+        """Walkable neighbours of every cell (blocked cells too: a search may start on one)."""
+        grid = self.nav_grid
+        w, h = self.width, self.height
+        cells = grid.cells
+        n = w * h
+        adjacency = []
+        append = adjacency.append
+        for i in range(n):
+            y = self.ys[i]
+            nbrs = []
+            if y + 1 < h and not cells[i + 1]:
+                nbrs.append(i + 1)
+            if i + h < n and not cells[i + h]:
+                nbrs.append(i + h)
+            if y > 0 and not cells[i - 1]:
+                nbrs.append(i - 1)
+            if i >= h and not cells[i - h]:
+                nbrs.append(i - h)
+            append(tuple(nbrs))
+        self.adjacency = adjacency
+        self.version = grid.version
+
+    def search(self, start, goal):
+        """Cells from `start` to `goal` (both included), or None if the goal is unreachable."""
+        if self.version != self.nav_grid.version:
+            self._build_adjacency()
+        self.searches += 1
+        h = self.height
+        gx, gy = goal
+        s = start[0] * h + start[1]
+        g = gx * h + gy
+
+        self._generation += 1
+        gen = self._generation
+        stamp, cost, parent = self._stamp, self._cost, self._parent
+        adjacency, xs, ys = self.adjacency, self.xs, self.ys
+        push, pop = heapq.heappush, heapq.heappop
+
+        stamp[s] = gen
+        cost[s] = 0
+        parent[s] = -1
+        frontier = [(0, s)]
+        while frontier:
+            current = pop(frontier)[1]
+            if current == g:
+                break
+            new_cost = cost[current] + 1
+            for nxt in adjacency[current]:
+                if stamp[nxt] != gen or new_cost < cost[nxt]:
+                    stamp[nxt] = gen
+                    cost[nxt] = new_cost
+                    parent[nxt] = current
+                    push(frontier, (new_cost + abs(xs[nxt] - gx) + abs(ys[nxt] - gy), nxt))
+
+        if stamp[g] != gen:
+            return None
+        path = []
+        i = g
+        while i != -1:
+            path.append((xs[i], ys[i]))
+            i = parent[i]
+        path.reverse()
+        return path
+
+    def nearest(self, start, goals):
+        """
+        (position in `goals`, steps) of the goal cell closest to `start` by
+        walking distance, or None if none can be reached. Goals equally far
+        away go to the one listed first.
+        """
+        if self.version != self.nav_grid.version:
+            self._build_adjacency()
+        self.searches += 1
+        h = self.height
+        wanted = {}
+        for n, (gx, gy) in enumerate(goals):
+            wanted.setdefault(gx * h + gy, n)
+        s = start[0] * h + start[1]
+        if s in wanted:
+            return wanted[s], 0
+
+        self._generation += 1
+        gen = self._generation
+        stamp, adjacency = self._stamp, self.adjacency
+        stamp[s] = gen
+        layer = [s]
+        steps = 0
+        while layer:
+            steps += 1
+            found = None
+            nxt_layer = []
+            for i in layer:
+                for j in adjacency[i]:
+                    if stamp[j] != gen:
+                        stamp[j] = gen
+                        nxt_layer.append(j)
+                        n = wanted.get(j)
+                        if n is not None and (found is None or n < found):
+                            found = n
+            if found is not None:
+                return found, steps
+            layer = nxt_layer
+        return None
@@ -0,0 +1,274 @@
+"""
+Batch steering: every walking servo's steering force from NumPy arrays instead of Vector2s.
+
+BatchSteering.move() stands in for calling ServoAgent.move(dt) on each servo
+in turn. At the start of each move it packs the walking servos into
+struct-of-arrays form (positions, velocities, path targets, speeds), and every
+obstacle (tables, servos, seated customers) into one (x, y, radius) array.
+Then:
+
+  * seek/arrive for all of them is one broadcast;
+  * wall avoidance is one broadcast of the three feelers of every servo
+    against every wall;
+  * obstacle avoidance is one broadcast of every servo's detection box
+    against every obstacle;
+  * apply_force()'s integration is one more, and only the results are
+    written back to each servo's Vector2s.
+
+The arithmetic follows the float kernels in Actions/steering.py, and on the
+same state the forces agree with them to float tolerance (Benchmarks/steering.py
+checks). The one difference is that every servo avoids the others where they
+were at the start of the move. ServoAgent.move() runs servo by servo, so each
+servo avoids the ones before it where they are *after* they have moved. Runs
+therefore drift apart from "object" steering over a night.
+"""
+import math
+
+import numpy as np
+
+from Simulation.vector import Vector2
+
+
+PATH_WEIGHT, WALL_WEIGHT, OBSTACLE_WEIGHT = 1.0, 3.0, 5.0
+
+FEELER_LENGTH = 50.0
+DETECTION_BOX_LENGTH = 120.0
+
+# Side feelers are the heading turned 45° right and 45° left
+_DIAGONAL = math.sqrt(0.5)
+
+
+class BatchSteering:
+    """Packed walls and tables plus the batched steering for one world's servos."""
+
+    def __init__(self, world):
+        self.world = world
+        # (walls, 6): x1, y1, x2, y2, normal x, normal y
+        self.walls = np.array(world.wall_segments, dtype=float).reshape(-1, 6)
+        self.edges = (self.walls[:, 2] - self.walls[:, 0], self.walls[:, 3] - self.walls[:, 1])
+        # (tables, 3): x, y, radius; only servos and seated customers are packed per move
+        self.tables = np.array(world.obstacle_index.tables_packed(), dtype=float).reshape(-1, 3)
+
+    # ─── BATCHED FORCES ───────────────────────────────────────────────────
+    @staticmethod
+    def path_forces(pos, vel, target, max_speed, mode, slow_radius):
+        """
+        seek() (mode 1) / arrive() (mode 2) for every row; mode 0 is no force.
+        All arguments are arrays with one row per servo.
+        """
+        to = target - pos
+        dx, dy = to[:, 0], to[:, 1]
+        dist = np.sqrt(dx * dx + dy * dy)
+        safe = np.where(dist > 0, dist, 1.0)
+
+        # seek: desired velocity is `to` scaled to max_speed
+        fraction = max_speed / safe
+        seek_x = np.where(dist > 0, dx * fraction, dx)
+        seek_y = np.where(dist > 0, dy * fraction, dy)
+
+        # arrive: slow down inside slow_radius, plain stop right on top of it
+        speed = np.where(dist < slow_radius, max_speed * (dist / slow_radius), max_speed)
+        arrive_x = np.where(dist < 0.1, 0.0, (dx / safe) * speed)
+        arrive_y = np.where(dist < 0.1, 0.0, (dy / safe) * speed)
+
+        fx = np.where(mode == 1, seek_x, arrive_x) - vel[:, 0]
+        fy = np.where(mode == 1, seek_y, arrive_y) - vel[:, 1]
+        fx = np.where(mode == 0, 0.0, fx)
+        fy = np.where(mode == 0, 0.0, fy)
+        return fx, fy
+
+    @staticmethod
+    def headings(vel):
+        """(speed, heading x, heading y) per row; a servo standing still faces +x."""
+        vx, vy = vel[:, 0], vel[:, 1]
+        speed = np.sqrt(vx * vx + vy * vy)
+        moving = speed > 0
+        safe = np.where(moving, speed, 1.0)
+        return speed, np.where(moving, vx / safe, 1.0), np.where(moving, vy / safe, 0.0)
+
+    def wall_forces(self, pos, hx, hy):
+        """wall_avoidance() for every row. Returns (fx, fy) arrays."""
+        n = len(pos)
+        walls = self.walls
+        if not len(walls):
+            return np.zeros(n), np.zeros(n)
+        px, py = pos[:, 0:1], pos[:, 1:2]
+
+        # (servos, 3) feelers: ahead, right, left
+        c = _DIAGONAL
+        feel_x = np.stack([hx, c * hx + c * hy, c * hx - c * hy], axis=1) * FEELER_LENGTH
+        feel_y = np.stack([hy, c * hy - c * hx, c * hy + c * hx], axis=1) * FEELER_LENGTH
+
+        # (servos, 3, walls) segment intersections; t runs along the feeler,
+        # u along the wall. Parallel pairs divide by zero and never hit.
+        qx, qy = (px - walls[:, 0])[:, None, :], (py - walls[:, 1])[:, None, :]
+        ex, ey = self.edges
+        fx, fy = feel_x[:, :, None], feel_y[:, :, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            den = fx * ey - fy * ex
+            t = (qy * ex - qx * ey) / den
+            u = (fx * qy - fy * qx) / den
+        # Feelers are all FEELER_LENGTH long, so the nearest hit has the smallest t
+        t = np.where((t > 0) & (t < 1) & (u > 0), t, np.inf).reshape(n, -1)
+
+        # Nearest hit over every feeler and wall, first one on ties
+        rows = np.arange(n)
+        best = t.argmin(axis=1)
+        t = t[rows, best]
+        found = np.isfinite(t)
+        feeler, wall = best // len(walls), best % len(walls)
+        t = np.where(found, t, 0.0)
+        ix = px[:, 0] + t * feel_x[rows, feeler]
+        iy = py[:, 0] + t * feel_y[rows, feeler]
+        # The overshoot is measured from the last (left) feeler, as wall_force() does
+        overshoot = np.hypot(px[:, 0] + feel_x[:, 2] - ix, py[:, 0] + feel_y[:, 2] - iy)
+        fx = np.where(found, walls[wall, 4] * overshoot, 0.0)
+        fy = np.where(found, walls[wall, 5] * overshoot, 0.0)
+        return fx, fy
+
+    @staticmethod
+    def obstacle_forces(pos, speed, hx, hy, max_speed, radius, obstacles, skip):
+        """
+        obstacle_avoidance() for every row against every (x, y, radius) row of
+        `obstacles`; `skip` is a (servos, obstacles) mask of pairs to ignore
+        (a servo itself). Returns (fx, fy) arrays.
+        """
+        n = len(pos)
+        if not len(obstacles):
+            return np.zeros(n), np.zeros(n)
+        px, py = pos[:, 0:1], pos[:, 1:2]
+        hx, hy = hx[:, None], hy[:, None]
+        sx, sy = -hy, hx     # heading.rotate(90)
+        d_box = (DETECTION_BOX_LENGTH + (speed / max_speed) * DETECTION_BOX_LENGTH)[:, None]
+
+        # Only obstacles within some servo's reach can be in its detection box
+        reach = d_box + (radius[:, None] + obstacles[:, 2].max())
+        ox, oy = obstacles[:, 0], obstacles[:, 1]
+        near = ((ox > (px - reach).min()) & (ox < (px + reach).max())
+                & (oy > (py - reach).min()) & (oy < (py + reach).max()))
+        obstacles, skip = obstacles[near], skip[:, near]
+        if not len(obstacles):
+            return np.zeros(n), np.zeros(n)
+
+        # (servos, obstacles) positions in each servo's local space
+        ox, oy, r = obstacles[:, 0], obstacles[:, 1], obstacles[:, 2]
+        lx = (ox * hx + oy * hy) - (px * hx + py * hy)
+        ly = (ox * sx + oy * sy) - (px * sx + py * sy)
+        expanded = r + radius[:, None]
+        ahead = ~skip & (lx >= 0) & (lx < d_box) & (np.abs(ly) < expanded)
+        root = np.sqrt(np.where(ahead, expanded * expanded - ly * ly, 0.0))
+        ip = lx - root
+        ip = np.where(ip <= 0, lx + root, ip)
+        ip = np.where(ahead, ip, np.inf)
+
+        # Closest intersection, first one on ties
+        rows = np.arange(n)
+        best = ip.argmin(axis=1)
+        found = np.isfinite(ip[rows, best])
+        lx, ly, r = lx[rows, best], ly[rows, best], r[best]
+        d_box = d_box[:, 0]
+        multiplier = 1.0 + (d_box - lx) / d_box
+        lateral = (r - ly) * multiplier
+        braking = (r - lx) * 0.2
+        hx, hy, sx, sy = hx[:, 0], hy[:, 0], sx[:, 0], sy[:, 0]
+        fx = np.where(found, braking * hx + lateral * sx, 0.0)
+        fy = np.where(found, braking * hy + lateral * sy, 0.0)
+        return fx, fy
+
+    # ─── TICK ─────────────────────────────────────────────────────────────
+    def pack_obstacles(self, walking):
+        """(obstacles, skip) for obstacle_forces(): tables, servos and seated customers, and each walking servo's own row."""
+        world = self.world
+        servos = np.array([(s.position.x, s.position.y, s.radius) for s in world.servos], dtype=float)
+        customers = np.array(world.obstacle_index.customers_packed(), dtype=float).reshape(-1, 3)
+        obstacles = np.concatenate([self.tables, servos.reshape(-1, 3), customers])
+        column = {id(s): len(self.tables) + k for k, s in enumerate(world.servos)}
+        skip = np.zeros((len(walking), len(obstacles)), dtype=bool)
+        for i, s in enumerate(walking):
+            if not s.obstacles:
+                skip[i, :] = True      # never planned: nothing to avoid yet
+            else:
+                skip[i, column[id(s)]] = True
+        return obstacles, skip
+
+    @staticmethod
+    def integrate(pos, vel, fx, fy, max_speed, max_force, dt):
+        """
+        apply_force() for every row: cap the force, then the speed, and step.
+        Returns (vx, vy, px, py, heading x, heading y, turned) arrays; the
+        heading is only updated where `turned` (the servo is moving).
+        """
+        length = np.sqrt(fx * fx + fy * fy)
+        capped = length > max_force
+        scale = np.where(capped, max_force / np.where(capped, length, 1.0), 1.0)
+        vx = vel[:, 0] + fx * scale * dt
+        vy = vel[:, 1] + fy * scale * dt
+
+        speed = np.sqrt(vx * vx + vy * vy)
+        capped = speed > max_speed
+        scale = np.where(capped, max_speed / np.where(capped, speed, 1.0), 1.0)
+        vx, vy = vx * scale, vy * scale
+        speed = np.sqrt(vx * vx + vy * vy)
+        turned = speed > 0
+        safe = np.where(turned, speed, 1.0)
+        return vx, vy, pos[:, 0] + vx * dt, pos[:, 1] + vy * dt, vx / safe, vy / safe, turned
+
+    def move(self, servos, dt):
+        """Move every servo by dt, like calling servo.move(dt) on each, from positions packed up front."""
+        walking = [s for s in servos if s.executing and s.current_action is not None]
+        steered = None
+        if walking:
+            pos, vel, target, max_speed, max_force, radius, mode, slow, holding = [], [], [], [], [], [], [], [], []
+            for s in walking:
+                pos.append((s.position.x, s.position.y))
+                vel.append((s.velocity.x, s.velocity.y))
+                max_speed.append(s.max_speed)
+                max_force.append(s.max_force)
+                radius.append(s.radius)
+                slow.append(s.waypoint_threshold)
+                held = s.is_holding()
+                holding.append(held)
+                idx = s.waypoint_index
+                if idx < len(s.waypoints):
+                    wp = s.waypoints[idx]
+                    if held:
+                        wp = s.waypoints[idx - 1]
+                        mode.append(2)
+                    elif idx == len(s.waypoints) - 1 and s.position.distance_to(wp) < s.waypoint_threshold * 1.5:
+                        mode.append(2)
+                    else:
+                        mode.append(1)
+                    target.append((wp.x, wp.y))
+                else:
+                    mode.append(0)
+                    target.append((0.0, 0.0))
+            pos, vel, max_speed = np.array(pos), np.array(vel), np.array(max_speed)
+            obstacles, skip = self.pack_obstacles(walking)
+
+            pfx, pfy = self.path_forces(pos, vel, np.array(target), max_speed, np.array(mode), np.array(slow))
+            speed, hx, hy = self.headings(vel)
+            wfx, wfy = self.wall_forces(pos, hx, hy)
+            ofx, ofy = self.obstacle_forces(pos, speed, hx, hy, max_speed, np.array(radius, dtype=float),
+                                            obstacles, skip)
+            fx = pfx * PATH_WEIGHT + wfx * WALL_WEIGHT + ofx * OBSTACLE_WEIGHT
+            fy = pfy * PATH_WEIGHT + wfy * WALL_WEIGHT + ofy * OBSTACLE_WEIGHT
+            steered = self.integrate(pos, vel, fx, fy, max_speed, np.array(max_force), dt)
+
+        # Everyone has been steered from where they started, so the order from here on doesn't matter
+        walking_ids = {id(s) for s in walking}
+        for s in servos:
+            # Coasting from rest changes nothing
+            if id(s) not in walking_ids and (s.velocity.x or s.velocity.y):
+                s.coast(dt)
+        if steered is None:
+            return
+
+        moved = self.world.obstacle_index.moved
+        for s, held, vx, vy, px, py, hx, hy, turned in zip(walking, holding, *(a.tolist() for a in steered)):
+            s.velocity.update(vx, vy)
+            if turned:
+                s.heading = Vector2(hx, hy)
+                s.side = Vector2(-hy, hx)     # heading.rotate(90)
+            s.position.update(px, py)
+            moved(s)
+            s.advance_waypoints(held)
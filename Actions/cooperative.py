@@ -0,0 +1,213 @@
+"""
+Windowed cooperative A* (WHCA*): servos plan in space-time around each other.
+
+Each servo's plan is a search over (cell, tick) states. A step either moves to
+a walkable 4-neighbour or waits in place, and takes one tick. Every (cell, tick)
+slot on a plan is written to a shared ReservationTable, and later plans may
+neither enter a slot someone else holds nor swap cells with its holder. So
+servos planned one after another in the same window never meet in a cell.
+
+Only the first `window` ticks are planned in space-time. Past that the search
+is scored with the goal's true distance (the distance field, ignoring other
+servos) and the rest of the route is the plain shortest path. Halfway through
+the window the servo plans the next window from wherever it is
+(Pathfinder.extend_window).
+
+A wait becomes a hold: the servo may not leave that waypoint before the tick
+the plan leaves it. Servos move faster than one cell per tick, so between
+holds they may run ahead of their reservations; the holds are where another
+servo's right of way is actually kept.
+
+Silver, "Cooperative Pathfinding" (AIIDE 2005).
+"""
+import heapq
+
+from Actions.distance_field import UNREACHABLE
+
+
+class ReservationTable:
+    """(cell index, tick) -> the owner holding that slot."""
+
+    def __init__(self):
+        self._slots = {}
+        self._held = {}    # owner -> [(cell, tick), ...]
+
+    def reserve(self, owner, cell, tick):
+        self._slots[(cell, tick)] = owner
+        self._held.setdefault(owner, []).append((cell, tick))
+
+    def holder(self, cell, tick):
+        return self._slots.get((cell, tick))
+
+    @property
+    def slots(self):
+        """{(cell, tick): owner} for searches that look up many slots at once (read only)."""
+        return self._slots
+
+    def release(self, owner):
+        slots = self._slots
+        for key in self._held.pop(owner, ()):
+            if slots.get(key) is owner:
+                del slots[key]
+
+    def expire(self, now):
+        """Forget slots before tick `now`."""
+        slots = self._slots
+        for owner, held in list(self._held.items()):
+            keep = []
+            for key in held:
+                if key[1] < now:
+                    if slots.get(key) is owner:
+                        del slots[key]
+                else:
+                    keep.append(key)
+            if keep:
+                self._held[owner] = keep
+            else:
+                del self._held[owner]
+
+    def __len__(self):
+        return len(self._slots)
+
+    def state(self, key):
+        """(slots, held) as plain values, owners given as key(owner) (see Simulation/snapshot.py)."""
+        slots = tuple((slot, key(owner)) for slot, owner in self._slots.items())
+        held = tuple((key(owner), tuple(slots_held)) for owner, slots_held in self._held.items())
+        return slots, held
+
+    def restore(self, state, owner_of):
+        """Hold the slots of a state() again, for the owners owner_of(key) names."""
+        slots, held = state
+        self._slots = {slot: owner_of(k) for slot, k in slots}
+        self._held = {owner_of(k): list(slots_held) for k, slots_held in held}
+
+
+class CooperativePlanner:
+    """Space-time A* for each servo against the reservations of the others."""
+
+    def __init__(self, nav_grid, fields, window):
+        self.nav_grid = nav_grid
+        self.fields = fields
+        self.window = window
+        self.width, self.height = nav_grid.width, nav_grid.height
+        self.reservations = ReservationTable()
+        self.plans = {}       # owner -> (goal cell, tick to plan the next window at, or None)
+        self.expanded = 0
+
+    def _neighbours(self, i):
+        """Walkable 4-neighbours in get_neighbors() order (+y, +x, -y, -x)."""
+        h = self.height
+        cells = self.nav_grid.cells
+        y = i % h
+        out = []
+        if y + 1 < h and not cells[i + 1]:
+            out.append(i + 1)
+        if i + h < self.width * h and not cells[i + h]:
+            out.append(i + h)
+        if y > 0 and not cells[i - 1]:
+            out.append(i - 1)
+        if i >= h and not cells[i - h]:
+            out.append(i - h)
+        return out
+
+    def plan(self, owner, start, goal, now):
+        """
+        Reserve a path for `owner` from `start` to `goal` starting at tick
+        `now`. Returns (cells, holds): the cells to walk (waits collapsed) and,
+        per cell, the tick it may be left at (0 = no hold). None if the goal
+        can't be reached at all; the owner then holds no reservations.
+        """
+        table = self.reservations
+        table.release(owner)
+        self.plans.pop(owner, None)
+        field = self.fields.field(goal)
+        h0 = field.distance(start)
+        if h0 is None:
+            return None
+
+        h = self.height
+        dist = field.dist
+        window = self.window
+        s = start[0] * h + start[1]
+        g = goal[0] * h + goal[1]
+        slots = table.slots
+
+        # (f, -depth, cell, depth): ties go to the deeper state
+        frontier = [(h0, 0, s, 0)]
+        parent = {(s, 0): None}
+        end = None
+        while frontier:
+            _, _, cell, t = heapq.heappop(frontier)
+            self.expanded += 1
+            if cell == g or t == window:
+                end = (cell, t)
+                break
+            t1 = t + 1
+            for nxt in self._neighbours(cell) + [cell]:
+                if dist[nxt] == UNREACHABLE and nxt != cell:
+                    continue
+                other = slots.get((nxt, now + t1))
+                if other is not None and other is not owner:
+                    continue
+                # Swapping cells with another servo is a head-on collision
+                other = slots.get((nxt, now + t))
+                if other is not None and other is not owner and slots.get((cell, now + t1)) is other:
+                    continue
+                key = (nxt, t1)
+                if key in parent:
+                    # Every way into a state costs the same; the first one stays
+                    continue
+                parent[key] = (cell, t)
+                hn = dist[nxt] if dist[nxt] != UNREACHABLE else h0
+                heapq.heappush(frontier, (t1 + hn, -t1, nxt, t1))
+
+        if end is None:
+            return None
+
+        timeline = []
+        node = end
+        while node is not None:
+            timeline.append(node)
+            node = parent[node]
+        timeline.reverse()
+        for cell, t in timeline:
+            table.reserve(owner, cell, now + t)
+
+        cells, holds = [], []
+        for cell, t in timeline:
+            xy = (cell // h, cell % h)
+            if cells and cells[-1] == xy:
+                holds[-1] = now + t
+            else:
+                cells.append(xy)
+                holds.append(0)
+
+        last, t_end = end
+        if last == g:
+            # Keep the goal clear for the tick after arriving, too
+            table.reserve(owner, g, now + t_end + 1)
+            self.plans[owner] = (goal, None)
+        else:
+            rest = field.path(cells[-1])
+            cells.extend(rest[1:])
+            holds.extend([0] * (len(rest) - 1))
+            self.plans[owner] = (goal, now + max(1, window // 2))
+        return cells, tuple(holds)
+
+    def state(self, key):
+        """Reservations, per-owner plans and the expansion count as plain values, owners as key(owner)."""
+        plans = tuple((key(owner), plan) for owner, plan in self.plans.items())
+        return self.reservations.state(key), plans, self.expanded
+
+    def restore(self, state, owner_of):
+        """Carry on from a state(): owner_of(key) turns its keys back into owners."""
+        reservations, plans, self.expanded = state
+        self.reservations.restore(reservations, owner_of)
+        self.plans = {owner_of(k): plan for k, plan in plans}
+
+    def due(self, owner, now):
+        """The goal `owner` should plan its next window toward, or None if it isn't due yet."""
+        plan = self.plans.get(owner)
+        if plan is None or plan[1] is None or now < plan[1]:
+            return None
+        return plan[0]
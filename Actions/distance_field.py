@@ -0,0 +1,136 @@
+"""
+Per-goal distance fields over the nav grid.
+
+Almost every path a servo asks for ends at one of a handful of fixed goals:
+a food window or a delivery cell next to a table. A DistanceField is one
+breadth-first search outward from such a goal over the walkable cells
+(4-connected, unit cost, like the A* in pathfinder.py). It stores each cell's
+step count to the goal and the next cell to step to, so once it exists any
+path to that goal is read off by following next hops: O(path length).
+
+DistanceFields keeps the most recently used fields (bounded LRU) and drops
+them all as soon as the nav grid's version changes, so update_nav_grid() or
+any NavGrid.set() invalidates them automatically.
+
+Ties between equally short routes go to the first neighbour in
+Pathfinder.get_neighbors() order, so paths are shortest but may differ from
+the one A* happens to pick.
+"""
+from collections import deque, OrderedDict
+
+UNREACHABLE = -1
+
+
+class DistanceField:
+    """Steps to `goal` and next hop toward it for every cell of one nav grid version."""
+    __slots__ = ("goal", "width", "height", "dist", "next_hop")
+
+    def __init__(self, nav_grid, goal):
+        self.goal = goal
+        w = self.width = nav_grid.width
+        h = self.height = nav_grid.height
+        cells = nav_grid.cells
+        n = w * h
+        dist = [UNREACHABLE] * n
+        next_hop = [UNREACHABLE] * n
+
+        gx, gy = goal
+        g = gx * h + gy
+        dist[g] = 0
+        frontier = deque((g,))
+        pop, push = frontier.popleft, frontier.append
+        while frontier:
+            i = pop()
+            d = dist[i] + 1
+            y = i % h
+            # Same neighbour order as Pathfinder.get_neighbors(): +y, +x, -y, -x
+            for j, ok in ((i + 1, y + 1 < h), (i + h, i + h < n),
+                          (i - 1, y > 0), (i - h, i >= h)):
+                if ok and dist[j] == UNREACHABLE and cells[j] == 0:
+                    dist[j] = d
+                    next_hop[j] = i
+                    push(j)
+        self.dist = dist
+        self.next_hop = next_hop
+
+    def _exit_from(self, x, y):
+        """Best walkable neighbour to leave a blocked start cell by, or None."""
+        h = self.height
+        best = None
+        for nx, ny in ((x, y + 1), (x + 1, y), (x, y - 1), (x - 1, y)):
+            if 0 <= nx < self.width and 0 <= ny < h:
+                d = self.dist[nx * h + ny]
+                if d != UNREACHABLE and (best is None or d < best[0]):
+                    best = (d, nx * h + ny)
+        return best
+
+    def distance(self, start):
+        """Steps from `start` to the goal, or None if it can't be reached."""
+        x, y = start
+        if start == self.goal:
+            return 0
+        d = self.dist[x * self.height + y]
+        if d != UNREACHABLE:
+            return d
+        best = self._exit_from(x, y)
+        return None if best is None else best[0] + 1
+
+    def path(self, start):
+        """Cells from `start` to the goal (both included), or None if unreachable."""
+        h = self.height
+        x, y = start
+        i = x * h + y
+        cells = [start]
+        if start == self.goal:
+            return cells
+        if self.dist[i] == UNREACHABLE:
+            # A servo may stand on a blocked cell (e.g. right after a delivery)
+            best = self._exit_from(x, y)
+            if best is None:
+                return None
+            i = best[1]
+            cells.append((i // h, i % h))
+        next_hop = self.next_hop
+        i = next_hop[i]
+        while i != UNREACHABLE:
+            cells.append((i // h, i % h))
+            i = next_hop[i]
+        return cells
+
+
+class DistanceFields:
+    """LRU cache of DistanceFields for one nav grid, dropped whenever the grid's version changes."""
+
+    def __init__(self, nav_grid, max_fields=64):
+        self.nav_grid = nav_grid
+        self.max_fields = max_fields
+        self.version = nav_grid.version
+        self._fields = OrderedDict()   # goal cell -> DistanceField
+        self.builds = 0
+        self.hits = 0
+
+    def field(self, goal):
+        grid = self.nav_grid
+        if grid.version != self.version:
+            self._fields.clear()
+            self.version = grid.version
+        fields = self._fields
+        f = fields.get(goal)
+        if f is not None:
+            fields.move_to_end(goal)
+            self.hits += 1
+            return f
+        f = fields[goal] = DistanceField(grid, goal)
+        self.builds += 1
+        if len(fields) > self.max_fields:
+            fields.popitem(last=False)
+        return f
+
+    def path(self, start, goal):
+        return self.field(goal).path(start)
+
+    def distance(self, start, goal):
+        return self.field(goal).distance(start)
+
+    def __len__(self):
+        return len(self._fields)
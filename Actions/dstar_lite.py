@@ -0,0 +1,191 @@
+"""
+D* Lite: incremental shortest paths for a servo whose surroundings change.
+
+A DStarLite instance searches backward from one goal cell to the servo's
+current cell and keeps its g/rhs values between calls. When the cost of some
+cells changes (a servo parks in an aisle, an edit to the nav grid), only the
+vertices whose distance-to-goal actually changes are re-expanded, so a repair
+costs in proportion to the change rather than to the grid. The servo's start
+cell can move between repairs; `km` keeps the queued keys valid as it does.
+
+Costs are per cell entered: blocked nav grid cells are impassable, walkable
+ones cost 1 plus any penalty in the shared `penalties` dict (cell index ->
+extra cost). Penalised cells are discouraged, not forbidden, so a servo
+parked on a food window never makes the window unreachable.
+
+Koenig & Likhachev, "D* Lite" (AAAI 2002), optimised version.
+"""
+import heapq
+
+INF = float("inf")
+
+
+class DStarLite:
+    """Incremental planner from a moving start to one fixed goal on a NavGrid."""
+
+    def __init__(self, nav_grid, start, goal, penalties):
+        self.nav_grid = nav_grid
+        self.cells = nav_grid.cells
+        self.width, self.height = nav_grid.width, nav_grid.height
+        self.penalties = penalties
+        h = self.height
+        self.goal_cell = goal
+        self.goal = goal[0] * h + goal[1]
+        self.start = self.last = start[0] * h + start[1]
+        self.km = 0
+        self.g = {}
+        self.rhs = {self.goal: 0}
+        self._queue = []
+        self._queued = {}     # cell -> key currently valid in the queue
+        self.expanded = 0     # vertices popped over the planner's lifetime
+        self._push(self.goal)
+        self.compute()
+
+    # ─── GRAPH ────────────────────────────────────────────────────────────
+    def _neighbours(self, i):
+        """In-bounds 4-neighbours in get_neighbors() order (+y, +x, -y, -x)."""
+        h = self.height
+        y = i % h
+        out = []
+        if y + 1 < h:
+            out.append(i + 1)
+        if i + h < self.width * h:
+            out.append(i + h)
+        if y > 0:
+            out.append(i - 1)
+        if i >= h:
+            out.append(i - h)
+        return out
+
+    def _enter_cost(self, v):
+        if self.cells[v]:
+            return INF
+        return 1 + self.penalties.get(v, 0)
+
+    def _h(self, a, b):
+        h = self.height
+        return abs(a // h - b // h) + abs(a % h - b % h)
+
+    # ─── QUEUE ────────────────────────────────────────────────────────────
+    def _key(self, s):
+        m = min(self.g.get(s, INF), self.rhs.get(s, INF))
+        return (m + self._h(self.start, s) + self.km, m)
+
+    def _push(self, s):
+        key = self._key(s)
+        self._queued[s] = key
+        heapq.heappush(self._queue, (key, s))
+
+    def _top(self):
+        queue, queued = self._queue, self._queued
+        while queue:
+            key, s = queue[0]
+            if queued.get(s) == key:
+                return key, s
+            heapq.heappop(queue)
+        return (INF, INF), None
+
+    def _update_vertex(self, u):
+        g, rhs = self.g, self.rhs
+        if u != self.goal:
+            best = INF
+            for s in self._neighbours(u):
+                gs = g.get(s, INF)
+                if gs != INF:
+                    c = self._enter_cost(s) + gs
+                    if c < best:
+                        best = c
+            rhs[u] = best
+        self._queued.pop(u, None)
+        if g.get(u, INF) != rhs.get(u, INF):
+            self._push(u)
+
+    # ─── SEARCH ───────────────────────────────────────────────────────────
+    def compute(self):
+        """Bring g up to date for the current start; returns how many vertices were expanded."""
+        g, rhs = self.g, self.rhs
+        start = self.start
+        expanded = 0
+        while True:
+            k_old, u = self._top()
+            if u is None:
+                break
+            if not (k_old < self._key(start) or rhs.get(start, INF) != g.get(start, INF)):
+                break
+            expanded += 1
+            k_new = self._key(u)
+            if k_old < k_new:
+                self._push(u)
+                continue
+            heapq.heappop(self._queue)
+            del self._queued[u]
+            if g.get(u, INF) > rhs.get(u, INF):
+                g[u] = rhs[u]
+                for p in self._neighbours(u):
+                    self._update_vertex(p)
+            else:
+                g[u] = INF
+                self._update_vertex(u)
+                for p in self._neighbours(u):
+                    self._update_vertex(p)
+        self.expanded += expanded
+        return expanded
+
+    def move_start(self, start):
+        """The servo is now at `start` (x, y)."""
+        s = start[0] * self.height + start[1]
+        if s != self.start:
+            self.km += self._h(self.last, s)
+            self.last = self.start = s
+
+    def cells_changed(self, changed):
+        """Entry costs of `changed` cell indexes changed; repair. Returns vertices expanded."""
+        for v in changed:
+            # Only edges *into* v change, i.e. v's neighbours' rhs
+            for u in self._neighbours(v):
+                self._update_vertex(u)
+        return self.compute()
+
+    # ─── SNAPSHOTS ────────────────────────────────────────────────────────
+    def state(self):
+        """The search state as plain values (see Simulation/snapshot.py)."""
+        return (self.goal_cell, self.start, self.last, self.km, dict(self.g), dict(self.rhs),
+                tuple(self._queue), dict(self._queued), self.expanded)
+
+    @classmethod
+    def from_state(cls, nav_grid, penalties, state):
+        """A planner that carries on exactly where the one that gave `state` was."""
+        planner = cls.__new__(cls)
+        planner.nav_grid = nav_grid
+        planner.cells = nav_grid.cells
+        planner.width, planner.height = nav_grid.width, nav_grid.height
+        planner.penalties = penalties
+        (planner.goal_cell, planner.start, planner.last, planner.km, g, rhs,
+         queue, queued, planner.expanded) = state
+        planner.goal = planner.goal_cell[0] * planner.height + planner.goal_cell[1]
+        planner.g, planner.rhs = dict(g), dict(rhs)
+        planner._queue = list(queue)
+        planner._queued = dict(queued)
+        return planner
+
+    def path(self):
+        """Cells from the start to the goal (both included), or None if unreachable."""
+        s = self.start
+        g = self.g
+        if self.rhs.get(s, INF) == INF:
+            return None
+        h = self.height
+        cells = [(s // h, s % h)]
+        for _ in range(self.width * h):
+            if s == self.goal:
+                return cells
+            best, best_cost = None, INF
+            for n in self._neighbours(s):
+                c = self._enter_cost(n) + g.get(n, INF)
+                if c < best_cost:
+                    best, best_cost = n, c
+            if best is None:
+                return None
+            s = best
+            cells.append((s // h, s % h))
+        return None
@@ -0,0 +1,151 @@
+"""
+GOAP search: a servo's plan from an A* search over abstract world states.
+
+The planner sees the dining room as a GoapState of a few symbols:
+
+  at        grid cell the servo stands in (after the plan so far)
+  carrying  index of the table the dish in hand is for, or None
+  ready     index of the table of the dish waiting at the food window (the
+            longest-waiting customer's, as in the rule chain), or None
+  free      indexes of the free tables, while someone is queueing for one
+  done      what the plan has achieved: SERVED, SEATED or None
+
+and has three actions, grounded per food window or table:
+
+  PickUpDish(w)    needs carrying None, ready set  → at window w, carrying ready
+  DeliverDish      needs carrying set              → at the table, done SERVED
+  SeatCustomer(t)  needs carrying None, t free     → at the table, done SEATED
+
+Each action costs the walk to it in grid steps (read off the pathfinder's
+distance field out of the servo's cell; at a table, to the nearest approach
+cell) plus ACTION_COST. The goal is SERVED when
+there is a dish to deliver or pick up, otherwise SEATED when someone is
+queueing and a table is free: the rule chain's priorities. So a plan is
+(PickUpDish, DeliverDish), (DeliverDish,) or (SeatCustomer,), and the search
+picks the window and table with the cheapest whole trip.
+
+Plans are memoized by their starting state and the nav grid version; a
+situation seen before reuses its plan without searching. A memoized plan is
+exactly the one a fresh search would return.
+"""
+import heapq
+from collections import namedtuple
+
+SERVED, SEATED = "served", "seated"
+ACTION_COST = 1
+
+GoapState = namedtuple("GoapState", "at carrying ready free done")
+
+
+class GoapSearch:
+    """A* over GoapStates for one world, with plans memoized by start state."""
+
+    def __init__(self, world, max_plans=4096):
+        self.world = world
+        self.max_plans = max_plans
+        self.window_cells = [w.cell for w in world.food_windows]
+        self._plans = {}       # (goal, GoapState, nav grid version) -> plan
+        self._approach = {}    # table index -> approach cells
+        self.version = world.nav_grid.version
+        self.searches = 0
+        self.hits = 0
+        self.expanded = 0
+
+    # ─── COSTS ────────────────────────────────────────────────────────────
+    def _sync(self):
+        version = self.world.nav_grid.version
+        if version != self.version:
+            self._approach.clear()
+            self.version = version
+
+    def steps_from(self, start):
+        """
+        Distance field out of cell `start`. Moves cost the same both ways, so
+        its distance to a walkable cell is the walk from start to that cell:
+        one field prices every window and table for a state.
+        """
+        return self.world.pathfinder.fields.field(start)
+
+    def to_table(self, field, table):
+        """(steps, cell) from field's start to table index `table`'s nearest approach cell, or None."""
+        cells = self._approach.get(table)
+        if cells is None:
+            cells = self._approach[table] = self.world.approach_cells(self.world.tables[table])
+        best = None
+        for cell in cells:
+            steps = field.distance(cell)
+            if steps is not None and (best is None or steps < best[0]):
+                best = (steps, cell)
+        return best
+
+    # ─── SEARCH ───────────────────────────────────────────────────────────
+    def _successors(self, state):
+        """(action, cost, next state) for every action applicable in `state`."""
+        if state.done is not None:
+            return
+        field = self.steps_from(state.at)
+        if state.carrying is not None:
+            trip = self.to_table(field, state.carrying)
+            if trip is not None:
+                yield ("DeliverDish", None), trip[0] + ACTION_COST, \
+                    state._replace(at=trip[1], carrying=None, done=SERVED)
+            return
+        if state.ready is not None:
+            grid = self.world.nav_grid
+            for w, cell in enumerate(self.window_cells):
+                steps = field.distance(cell) if grid.is_walkable(*cell) else None
+                if steps is not None:
+                    yield ("PickUpDish", w), steps + ACTION_COST, \
+                        state._replace(at=cell, carrying=state.ready, ready=None)
+        for t in state.free:
+            trip = self.to_table(field, t)
+            if trip is not None:
+                yield ("SeatCustomer", t), trip[0] + ACTION_COST, \
+                    state._replace(at=trip[1], free=(), done=SEATED)
+
+    @staticmethod
+    def _heuristic(state, goal):
+        """ACTION_COST per action still needed: never more than the real cost."""
+        if state.done == goal:
+            return 0
+        if goal == SERVED and state.carrying is None:
+            return 2 * ACTION_COST
+        return ACTION_COST
+
+    def plan(self, goal, start):
+        """
+        Cheapest tuple of (action, target index) steps from GoapState `start`
+        to `goal`, or None if it can't be reached. Equal costs go to the
+        window or table listed first.
+        """
+        self._sync()
+        key = (goal, start, self.version)
+        if key in self._plans:
+            self.hits += 1
+            return self._plans[key]
+        self.searches += 1
+
+        counter = 0
+        frontier = [(self._heuristic(start, goal), counter, 0, start, ())]
+        best_cost = {start: 0}
+        found = None
+        while frontier:
+            _, _, cost, state, steps = heapq.heappop(frontier)
+            if cost > best_cost.get(state, cost):
+                continue
+            self.expanded += 1
+            if state.done == goal:
+                found = steps
+                break
+            for action, step_cost, nxt in self._successors(state):
+                new_cost = cost + step_cost
+                if new_cost < best_cost.get(nxt, new_cost + 1):
+                    best_cost[nxt] = new_cost
+                    counter += 1
+                    heapq.heappush(frontier, (new_cost + self._heuristic(nxt, goal), counter,
+                                              new_cost, nxt, steps + (action,)))
+
+        if len(self._plans) >= self.max_plans:
+            self._plans.clear()
+        self._plans[key] = found
+        return found
@@ -1,65 +1,304 @@
-from Customers.customer_fsm import CustomerState
-from constants import FOOD_WINDOW_CELL
-import pygame
+from Actions.goap_search import SEATED, SERVED, GoapSearch, GoapState
+from Actions.task_allocation import TaskAllocator
+from constants import ALLOCATION_URGENCY, GOAP_PLANNER, REPLANNING, TARGET_SELECTION, TASK_ALLOCATION
+from Simulation import trace
+from Simulation.trace import DEBUG, INFO
+
+_trace = trace.channel("goap")
+
+TARGET_SELECTION_MODES = ("first", "nearest")
+PLANNER_MODES = ("rules", "search")
+ALLOCATION_MODES = ("greedy", "global")
+REPLANNING_MODES = ("poll", "event")
 
 class ServoGOAPPlanner:
     """
     Goal-Oriented Action Planning (GOAP) for the restaurant simulation.
     """
-    def __init__(self, world):
-        """Initialize the GOAP planner."""
+    def __init__(self, world, targets=None, mode=None, allocation=None, replanning=None):
+        """
+        Initialize the GOAP planner.
+
+        targets: "first"   → free tables in world.tables order, the first
+                             walkable cell next to a table, the food window
+                             nearest as the crow flies (default)
+                 "nearest" → whichever is the shortest walk from the servo,
+                             found with one Pathfinder.nearest() search
+                 None      → TARGET_SELECTION from constants
+        mode:    "rules"   → compute_plan() is the priority chain (default)
+                 "search"  → compute_plan() searches for a multi-step plan
+                             (Actions/goap_search.py); the search picks the
+                             window and table itself, by walking cost
+                 None      → GOAP_PLANNER from constants
+        allocation: "greedy" → idle servos call compute_plan() in turn, each
+                               taking the most urgent task left (default)
+                    "global" → allocate() matches all idle servos to all open
+                               tasks at once by walk and wait
+                               (Actions/task_allocation.py)
+                    None     → TASK_ALLOCATION from constants
+        replanning: "poll"  → idle servos are planned for every tick (default)
+                    "event" → only when should_plan() sees something new
+                    None    → REPLANNING from constants
+        """
         self.world = world
-        self.FOOD_WINDOW_POS = pygame.math.Vector2(520, 120)
-        print(f"[GOAP] Food window at grid={FOOD_WINDOW_CELL}, pixel={tuple(self.FOOD_WINDOW_POS)}")
+        self.targets = TARGET_SELECTION if targets is None else targets
+        if self.targets not in TARGET_SELECTION_MODES:
+            raise ValueError(f"Unknown target selection {self.targets!r}; expected one of {TARGET_SELECTION_MODES}")
+        self.mode = GOAP_PLANNER if mode is None else mode
+        if self.mode not in PLANNER_MODES:
+            raise ValueError(f"Unknown planner {self.mode!r}; expected one of {PLANNER_MODES}")
+        self.allocation = TASK_ALLOCATION if allocation is None else allocation
+        if self.allocation not in ALLOCATION_MODES:
+            raise ValueError(f"Unknown allocation {self.allocation!r}; expected one of {ALLOCATION_MODES}")
+        self.allocator = TaskAllocator(world, ALLOCATION_URGENCY) if self.allocation == "global" else None
+        self.replanning = REPLANNING if replanning is None else replanning
+        if self.replanning not in REPLANNING_MODES:
+            raise ValueError(f"Unknown replanning {self.replanning!r}; expected one of {REPLANNING_MODES}")
+        self._idle_as_of = None    # "event": (index version, idle servos) when a pass last handed out nothing
+        self.passes = 0            # planning passes over the idle servos
+        self.passes_skipped = 0    # ... and ticks "event" replanning skipped one
+        self._search = None
+        self._table_index = None
+        self.plans_made = 0    # plans handed to servos (one per action with "rules")
+        if _trace.info:
+            for window in world.food_windows:
+                _trace.log(INFO, f"[GOAP] Food window at grid={window.cell}, pixel={tuple(window.center)}")
+
+    def nearest_food_window(self, servo):
+        """Food window closest to the servo (grid Manhattan distance; first one wins ties)."""
+        windows = self.world.food_windows
+        if len(windows) == 1:
+            return windows[0]
+        if self.targets == "nearest":
+            found = self.world.pathfinder.nearest(servo.grid_position(), [w.cell for w in windows])
+            if found is not None:
+                return next(w for w in windows if w.cell == found[0])
+        sx, sy = servo.grid_position()
+        return min(windows, key=lambda w: abs(w.cell[0] - sx) + abs(w.cell[1] - sy))
+
+    def nearest_free_table(self, servo):
+        """
+        Free table with the approach cell closest to the servo, or the first
+        free table if none can be reached (or targets is "first").
+        """
+        index = self.world.customer_index
+        if self.targets != "nearest":
+            return index.first_free_table()
+        cells, owners = [], []
+        for table in index.free_tables():
+            for cell in self.world.approach_cells(table):
+                cells.append(cell)
+                owners.append(table)
+        found = self.world.pathfinder.nearest(servo.grid_position(), cells)
+        if found is None:
+            return index.first_free_table()
+        return owners[cells.index(found[0])]
+
+    def wants_nearest_approach(self):
+        """
+        Whether servos serve a table from its nearest approach cell instead of
+        its first walkable one: with "nearest" targets, with "search", which
+        costs every table action by the walk to that cell, and with "global"
+        allocation, which assigns tables by it.
+        """
+        return self.targets == "nearest" or self.mode == "search" or self.allocation == "global"
         
+    def should_plan(self, idle):
+        """
+        Whether this tick's `idle` servos need a planning pass. With "event"
+        replanning a pass that handed out nothing is only repeated once work
+        may have appeared: the customer index's version moved on (someone
+        started queueing, a dish became ready, a table came free) or the idle
+        servos changed (one finished its action). Until then every
+        compute_plan() would come back None again.
+        """
+        if not idle:
+            return False
+        if (self.replanning == "event"
+                and self._idle_as_of == (self.world.customer_index.version, tuple(idle))):
+            self.passes_skipped += 1
+            return False
+        self.passes += 1
+        return True
+
+    def planned(self, idle, handed_out):
+        """Record a planning pass over `idle`; a pass that handed out a plan is never skipped after."""
+        if self.replanning == "event":
+            self._idle_as_of = None if handed_out else (self.world.customer_index.version, tuple(idle))
+
+    @property
+    def search(self):
+        """The GoapSearch behind "search" mode, made on first use."""
+        if self._search is None:
+            self._search = GoapSearch(self.world)
+        return self._search
+
     def compute_plan(self, servo):
         """
         servo: the ServoAgent that is asking for a new plan.
+        Returns the action to start now. With "search" the rest of a
+        multi-step plan goes to servo.next_actions.
+        """
+        if self.mode == "search":
+            return self._search_plan(servo)
+        plan = self._rule_plan(servo)
+        if plan is not None:
+            self.plans_made += 1
+        return plan
+
+    def allocate(self, servos):
         """
+        "global" allocation: actions for this tick's idle `servos`, as
+        {servo: action}. A servo holding a dish gets compute_plan() (its
+        delivery); the rest are matched to tasks in one assignment, then each
+        heads for its own nearest food window or free table.
+        """
+        plans = {}
+        pool = []
+        for servo in servos:
+            if servo.carrying is not None:
+                plans[servo] = self.compute_plan(servo)
+            else:
+                pool.append(servo)
+
+        index = self.world.customer_index
+        for servo, (action, cust) in self.allocator.assign(pool).items():
+            cell = servo.grid_position()
+            if action == "PickUpDish":
+                cust.order_claimed = True
+                plans[servo] = ("PickUpDish", cust, self.allocator.nearest_window(cell)[1])
+                if self.mode == "search":
+                    # The search's plan for a ready dish: deliver it straight after
+                    servo.next_actions = [("DeliverDish", cust, cust.target_table)]
+            else:
+                # Tables taken by servos bound before this one are no longer free
+                found = self.allocator.nearest_table(cell, index.free_tables())
+                if found is None:
+                    continue
+                table = found[1]
+                table.occupied = True
+                cust.seat_assigned = True
+                cust.target_table = table
+                plans[servo] = ("SeatCustomer", cust, table)
+            self.plans_made += 1
+            if _trace.info:
+                _trace.log(INFO, f"[GOAP] → {action} for Customer#{cust.spawn_tick} (allocated)")
+        return plans
+
+    def _search_plan(self, servo):
+        """compute_plan() for "search": find (or recall) the plan, then bind it to customers and tables."""
+        servo.next_actions = []
+        index = self.world.customer_index
+        tables = self.world.tables
+        if self._table_index is None:
+            self._table_index = {id(t): i for i, t in enumerate(tables)}
+        table_index = self._table_index
+
+        ready_cust = None
+        if servo.carrying is not None or index.has_ready():
+            goal = SERVED
+            carrying = ready = None
+            if servo.carrying is not None:
+                carrying = table_index[id(servo.carrying.target_table)]
+            else:
+                ready_cust = index.best_ready()
+                ready = table_index[id(ready_cust.target_table)]
+            start = GoapState(servo.grid_position(), carrying, ready, (), None)
+        elif index.has_queueing() and index.has_free_table():
+            goal = SEATED
+            free = tuple(table_index[id(t)] for t in index.free_tables())
+            start = GoapState(servo.grid_position(), None, None, free, None)
+        else:
+            return None
+
+        steps = self.search.plan(goal, start)
+        if steps is None:
+            if _trace.debug:
+                _trace.log(DEBUG, f"[GOAP] No plan reaches {goal} from {start}")
+            return None
+        self.plans_made += 1
+
+        actions = []
+        for name, target in steps:
+            if name == "PickUpDish":
+                ready_cust.order_claimed = True
+                actions.append(("PickUpDish", ready_cust, self.world.food_windows[target]))
+            elif name == "DeliverDish":
+                cust = servo.carrying if servo.carrying is not None else ready_cust
+                actions.append(("DeliverDish", cust, cust.target_table))
+            else:
+                table = tables[target]
+                cust = index.best_queueing()
+                table.occupied = True
+                cust.seat_assigned = True
+                cust.target_table = table
+                actions.append(("SeatCustomer", cust, table))
+        if _trace.info:
+            _trace.log(INFO, f"[GOAP] → plan {[a[0] for a in actions]} for Customer#{actions[0][1].spawn_tick}")
+        servo.next_actions = actions[1:]
+        return actions[0]
+
+    def _rule_plan(self, servo):
+        """compute_plan() for "rules": the priority chain, one action at a time."""
         # 1) If carrying a dish, go deliver it
         if servo.carrying is not None:
             cust = servo.carrying
-            print(f"[GOAP] → DeliverDish for Customer#{cust.spawn_tick}")
+            if _trace.info:
+                _trace.log(INFO, f"[GOAP] → DeliverDish for Customer#{cust.spawn_tick}")
             return ("DeliverDish", cust, cust.target_table)
 
         # 2) If any customer is ORDERED and order_ready, pick up from FOOD WINDOW
-        ready_customers = [
-            c for c in self.world.customers
-            if c.fsm.current == CustomerState.ORDERED and c.order_ready and not c.order_claimed
-        ]
-        if ready_customers:
-            # Sort by wait time to prioritize customers who have waited longer
-            ready_customers.sort(key=lambda c: c.wait_time, reverse=True)
-            target_cust = ready_customers[0]
+        #    (the one who has waited longest; see Customers/customer_index.py)
+        index = self.world.customer_index
+        target_cust = index.best_ready()
+        if target_cust is not None:
             target_cust.order_claimed = True
-            print(f"[GOAP] → PickUpDish for Customer#{target_cust.spawn_tick}")
-            return ("PickUpDish", target_cust, self.world.food_window)
+            if _trace.info:
+                _trace.log(INFO, f"[GOAP] → PickUpDish for Customer#{target_cust.spawn_tick}")
+            return ("PickUpDish", target_cust, self.nearest_food_window(servo))
 
         # 3) If any tables are free and there are waiting customers, seat them
-        waiting_customers = [
-            c for c in self.world.customers
-            if c.fsm.current in (CustomerState.WAITING, CustomerState.UNHAPPY, CustomerState.ANGRY)
-            and not c.seat_assigned
-        ]
-        if waiting_customers:
-            # Get list of free tables
-            free_tables = [t for t in self.world.tables if not t.occupied]
-            print(f"[GOAP] Found {len(waiting_customers)} WAITING/ANGRY customers")
-            print(f"[GOAP] Free tables right now: {[tuple(t.center) for t in free_tables]}")
-            
-            if free_tables:
-                # Sort customers by wait time to prioritize those who have waited longer
-                waiting_customers.sort(key=lambda c: c.wait_time, reverse=True)
-                target_cust = waiting_customers[0]
-                target_table = free_tables[0]
+        if index.has_queueing():
+            if _trace.debug:
+                _trace.log(DEBUG, f"[GOAP] Found {index.num_queueing()} WAITING/ANGRY customers")
+                _trace.log(DEBUG, f"[GOAP] Free tables right now: {[tuple(t.center) for t in index.free_tables()]}")
+
+            target_table = self.nearest_free_table(servo)
+            if target_table is not None:
+                # Longest-waiting customer, first (or nearest) free table
+                target_cust = index.best_queueing()
                 target_table.occupied = True
                 target_cust.seat_assigned = True
                 target_cust.target_table = target_table
-                print(f"[GOAP] → SeatCustomer for Customer#{target_cust.spawn_tick}")
+                if _trace.info:
+                    _trace.log(INFO, f"[GOAP] → SeatCustomer for Customer#{target_cust.spawn_tick}")
                 return ("SeatCustomer", target_cust, target_table)
             else:
-                print("[GOAP] → No action")
+                if _trace.debug:
+                    _trace.log(DEBUG, "[GOAP] → No action")
                 return None
 
         # 4) No action needed
         return None
+
+    def has_pending_work(self):
+        """
+        Side-effect-free version of the checks in compute_plan(): True if some
+        idle servo would be handed an action right now. Used by the event
+        scheduler to decide whether a tick can be skipped.
+        """
+        idle_servos = [s for s in self.world.servos if not s.executing]
+        if not idle_servos:
+            return False
+
+        # 1) A servo holding a dish always has a delivery to make
+        if any(s.carrying is not None for s in idle_servos):
+            return True
+
+        # 2) An unclaimed dish is waiting at the food window
+        index = self.world.customer_index
+        if index.has_ready():
+            return True
+
+        # 3) Someone is queueing and a table is free
+        return index.has_queueing() and index.has_free_table()
@@ -0,0 +1,370 @@
+"""
+Hierarchical pathfinding (HPA*) for large floors.
+
+The nav grid is cut into square clusters of `cluster_size` cells. Along every
+border between two neighbouring clusters, each run of cells that is walkable
+on both sides becomes an entrance: one transition in the middle of a short
+run, one at each end of a long one. The transition cells are the nodes of a
+small abstract graph:
+
+  * inter-edges (cost 1) join the two cells of a transition;
+  * intra-edges join the nodes of one cluster, with the walking distance
+    between them inside that cluster (a BFS per node, cluster-local).
+
+A query links start and goal into their clusters, runs A* over the abstract
+graph (a few dozen nodes per hundred clusters instead of every cell) and
+returns a HierarchicalPath: a read-only sequence of waypoints whose length is
+known up front but whose cluster-local legs are only searched when a servo
+first reads a waypoint on them. Walking the first few hops refines the first
+few legs; the rest is never searched if the servo is re-planned.
+
+When the nav grid changes, the clusters whose cells changed are found by
+comparing against a copy of the grid from the last build, and only those
+clusters, their borders and neighbours whose entrances moved are rebuilt.
+
+Paths are near-optimal (they pass through entrance cells), not always
+shortest; Pathfinder falls back to a flat A* when the abstract graph has no
+route (e.g. a start cell walled in within its own cluster).
+"""
+import heapq
+from bisect import bisect_right
+from collections import deque
+from collections.abc import Sequence
+
+SPLIT_ENTRANCE_AT = 6   # runs at least this long get a transition at each end
+_START, _GOAL = -1, -2
+
+
+class HierarchicalGrid:
+    """Abstract cluster/entrance graph over one NavGrid, kept in step with its version."""
+
+    def __init__(self, nav_grid, cluster_size=10):
+        self.nav_grid = nav_grid
+        self.cluster_size = cs = cluster_size
+        self.width, self.height = w, h = nav_grid.width, nav_grid.height
+        self.cols = -(-w // cs)
+        self.rows = -(-h // cs)
+        self.version = None
+        self._cells = None          # copy of nav_grid.cells at the last (re)build
+
+        self.borders = {}           # (cluster, neighbour) -> [(cell, cell), ...] transitions
+        self.nodes = {}             # cluster -> sorted node cells
+        self.inter = {}             # node cell -> set of node cells across a border
+        self.intra = {}             # cluster -> {node: [(node, cost), ...]}
+
+        # Profiling counters
+        self.full_builds = 0
+        self.clusters_rebuilt = 0
+        self.searches = 0
+
+    # ─── GEOMETRY ─────────────────────────────────────────────────────────
+    def cluster_of(self, i):
+        h, cs = self.height, self.cluster_size
+        return (i // h // cs) * self.rows + (i % h) // cs
+
+    def bounds(self, c):
+        """(x0, y0, x1, y1) of cluster c, exclusive upper bounds."""
+        cs = self.cluster_size
+        cx, cy = divmod(c, self.rows)
+        return (cx * cs, cy * cs, min(self.width, (cx + 1) * cs), min(self.height, (cy + 1) * cs))
+
+    def _neighbour_clusters(self, c):
+        cx, cy = divmod(c, self.rows)
+        if cx > 0:
+            yield c - self.rows
+        if cx + 1 < self.cols:
+            yield c + self.rows
+        if cy > 0:
+            yield c - 1
+        if cy + 1 < self.rows:
+            yield c + 1
+
+    # ─── BUILD / UPDATE ───────────────────────────────────────────────────
+    def refresh(self):
+        """Bring the abstract graph up to date with the nav grid."""
+        grid = self.nav_grid
+        if self.version == grid.version:
+            return
+        old = self._cells
+        # Cluster-local searches read this copy, so paths handed out earlier
+        # keep refining against the grid they were planned on
+        self._cells = bytes(grid.cells)
+        if old is None:
+            self._build_all()
+        else:
+            dirty = self._changed_clusters(old)
+            if dirty:
+                self._rebuild(dirty)
+        self.version = grid.version
+
+    def _build_all(self):
+        self.borders.clear()
+        self.inter.clear()
+        clusters = range(self.cols * self.rows)
+        for c in clusters:
+            for d in self._neighbour_clusters(c):
+                if c < d:
+                    self._build_border(c, d)
+        for c in clusters:
+            self.nodes[c] = self._collect_nodes(c)
+            self._build_intra(c)
+        self.full_builds += 1
+
+    def _changed_clusters(self, old):
+        """Clusters containing a cell that differs between `old` and the current copy."""
+        new = self._cells
+        h, cs = self.height, self.cluster_size
+        dirty = set()
+        for x in range(self.width):
+            lo = x * h
+            if old[lo:lo + h] == new[lo:lo + h]:
+                continue
+            for y0 in range(0, h, cs):
+                y1 = min(h, y0 + cs)
+                if old[lo + y0:lo + y1] != new[lo + y0:lo + y1]:
+                    dirty.add((x // cs) * self.rows + y0 // cs)
+        return dirty
+
+    def _rebuild(self, dirty):
+        touched = set(dirty)
+        for c in dirty:
+            for d in self._neighbour_clusters(c):
+                touched.add(d)
+                self._build_border(min(c, d), max(c, d))
+        for c in touched:
+            nodes = self._collect_nodes(c)
+            if c in dirty or nodes != self.nodes[c]:
+                self.nodes[c] = nodes
+                self._build_intra(c)
+                self.clusters_rebuilt += 1
+
+    def _build_border(self, c, d):
+        """Transitions across the border between cluster c and its right/lower neighbour d."""
+        for a, b in self.borders.pop((c, d), ()):
+            self._unlink(a, b)
+        cells = self._cells
+        h = self.height
+        x0, y0, x1, y1 = self.bounds(c)
+        if d // self.rows != c // self.rows:   # d is to the right: walk down the shared column pair
+            pairs = [((x1 - 1) * h + y, x1 * h + y) for y in range(y0, y1)]
+        else:                           # d is below: walk along the shared row pair
+            pairs = [(x * h + y1 - 1, x * h + y1) for x in range(x0, x1)]
+
+        transitions = []
+        run = []
+        for a, b in pairs + [(None, None)]:
+            if a is not None and not cells[a] and not cells[b]:
+                run.append((a, b))
+                continue
+            if run:
+                if len(run) >= SPLIT_ENTRANCE_AT:
+                    transitions += [run[0], run[-1]]
+                else:
+                    transitions.append(run[(len(run) - 1) // 2])
+                run = []
+        self.borders[(c, d)] = transitions
+        for a, b in transitions:
+            self.inter.setdefault(a, set()).add(b)
+            self.inter.setdefault(b, set()).add(a)
+
+    def _unlink(self, a, b):
+        for u, v in ((a, b), (b, a)):
+            partners = self.inter.get(u)
+            if partners is not None:
+                partners.discard(v)
+                if not partners:
+                    del self.inter[u]
+
+    def _collect_nodes(self, c):
+        nodes = set()
+        for d in self._neighbour_clusters(c):
+            for a, b in self.borders.get((min(c, d), max(c, d)), ()):
+                nodes.add(a if self.cluster_of(a) == c else b)
+        return sorted(nodes)
+
+    def _build_intra(self, c):
+        nodes = self.nodes[c]
+        bounds = self.bounds(c)
+        edges = {}
+        for n in nodes:
+            dist = self.local_distances(n, bounds, self._cells)
+            edges[n] = [(m, dist[m]) for m in nodes if m != n and m in dist]
+        self.intra[c] = edges
+
+    # ─── CLUSTER-LOCAL SEARCH ─────────────────────────────────────────────
+    def _local_neighbours(self, i, bounds, cells):
+        """Walkable 4-neighbours of cell i inside bounds, in get_neighbors() order."""
+        h = self.height
+        x, y = divmod(i, h)
+        x0, y0, x1, y1 = bounds
+        out = []
+        if y + 1 < y1 and not cells[i + 1]:
+            out.append(i + 1)
+        if x + 1 < x1 and not cells[i + h]:
+            out.append(i + h)
+        if y - 1 >= y0 and not cells[i - 1]:
+            out.append(i - 1)
+        if x - 1 >= x0 and not cells[i - h]:
+            out.append(i - h)
+        return out
+
+    def local_distances(self, src, bounds, cells, parents=None):
+        """BFS steps from src to every cell reachable inside bounds (src itself may be blocked)."""
+        dist = {src: 0}
+        frontier = deque((src,))
+        while frontier:
+            i = frontier.popleft()
+            d = dist[i] + 1
+            for j in self._local_neighbours(i, bounds, cells):
+                if j not in dist:
+                    dist[j] = d
+                    if parents is not None:
+                        parents[j] = i
+                    frontier.append(j)
+        return dist
+
+    def local_path(self, a, b, bounds, cells):
+        """Cells after a up to and including b, shortest inside bounds."""
+        parents = {}
+        self.local_distances(a, bounds, cells, parents)
+        cells = []
+        i = b
+        while i != a:
+            cells.append(i)
+            i = parents[i]
+        cells.reverse()
+        return cells
+
+    # ─── QUERY ────────────────────────────────────────────────────────────
+    def find_path(self, start, goal, to_pixel):
+        """HierarchicalPath of waypoints from start to goal, or None if the abstract graph has no route."""
+        self.refresh()
+        self.searches += 1
+        h = self.height
+        s = start[0] * h + start[1]
+        g = goal[0] * h + goal[1]
+        if s == g:
+            return HierarchicalPath(self, s, [], to_pixel)
+        cells = self._cells
+
+        sc, gc = self.cluster_of(s), self.cluster_of(g)
+        s_bounds, g_bounds = self.bounds(sc), self.bounds(gc)
+        from_start = self.local_distances(s, s_bounds, cells)
+        to_goal = self.local_distances(g, g_bounds, cells)
+
+        gx, gy = goal
+        cost = {_START: 0}
+        parent = {_START: None}
+        frontier = [(abs(start[0] - gx) + abs(start[1] - gy), _START)]
+        intra, inter, cluster_of = self.intra, self.inter, self.cluster_of
+        while frontier:
+            f, n = heapq.heappop(frontier)
+            if n == _GOAL:
+                break
+            base = cost[n]
+            if n == _START:
+                edges = [(m, from_start[m]) for m in self.nodes[sc] if m in from_start]
+                if sc == gc and g in from_start:
+                    edges.append((_GOAL, from_start[g]))
+            else:
+                edges = list(intra[cluster_of(n)].get(n, ()))
+                edges += [(m, 1) for m in sorted(inter.get(n, ()))]
+                if n in to_goal:
+                    edges.append((_GOAL, to_goal[n]))
+            for m, step in edges:
+                new_cost = base + step
+                if m not in cost or new_cost < cost[m]:
+                    cost[m] = new_cost
+                    parent[m] = n
+                    if m == _GOAL:
+                        estimate = 0
+                    else:
+                        estimate = abs(m // h - gx) + abs(m % h - gy)
+                    heapq.heappush(frontier, (new_cost + estimate, m))
+
+        if _GOAL not in cost:
+            return None
+
+        chain = []
+        n = _GOAL
+        while n is not None:
+            chain.append(n)
+            n = parent[n]
+        chain.reverse()
+
+        # Legs between consecutive abstract nodes: (from cell, to cell, steps, cluster bounds or None)
+        legs = []
+        for u, v in zip(chain, chain[1:]):
+            a = s if u == _START else u
+            b = g if v == _GOAL else v
+            if v == _GOAL:
+                legs.append((a, b, to_goal[a] if u != _START else from_start[g], g_bounds))
+            elif u == _START:
+                legs.append((a, b, from_start[b], s_bounds))
+            elif cluster_of(a) != cluster_of(b):
+                legs.append((a, b, 1, None))
+            else:
+                c = cluster_of(a)
+                legs.append((a, b, dict(intra[c][a])[b], self.bounds(c)))
+        return HierarchicalPath(self, s, [leg for leg in legs if leg[2] > 0], to_pixel)
+
+
+class HierarchicalPath(Sequence):
+    """
+    Read-only waypoint sequence from an abstract path. len() is exact from the
+    start; each leg's cells are searched the first time one of its waypoints
+    is read.
+    """
+    __slots__ = ("_grid", "_cells", "_start", "_legs", "_offsets", "_points", "_to_pixel", "_length")
+
+    def __init__(self, grid, start, legs, to_pixel):
+        self._grid = grid
+        self._cells = grid._cells
+        self._legs = legs
+        self._to_pixel = to_pixel
+        h = grid.height
+        self._start = to_pixel(start // h, start % h)
+        offsets = []
+        n = 1
+        for leg in legs:
+            offsets.append(n)
+            n += leg[2]
+        self._offsets = offsets
+        self._length = n
+        self._points = [None] * len(legs)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return tuple(self[j] for j in range(*i.indices(self._length)))
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("path index out of range")
+        if i == 0:
+            return self._start
+        k = bisect_right(self._offsets, i) - 1
+        points = self._points[k]
+        if points is None:
+            points = self._points[k] = self._refine(k)
+        return points[i - self._offsets[k]]
+
+    def _refine(self, k):
+        a, b, _, bounds = self._legs[k]
+        grid = self._grid
+        cells = [b] if bounds is None else grid.local_path(a, b, bounds, self._cells)
+        h = grid.height
+        return [self._to_pixel(i // h, i % h) for i in cells]
+
+    @property
+    def legs_refined(self):
+        return sum(points is not None for points in self._points)
+
+    @property
+    def num_legs(self):
+        return len(self._legs)
+
+    def __repr__(self):
+        return f"HierarchicalPath({self._length} waypoints, {self.legs_refined}/{len(self._legs)} legs refined)"
@@ -0,0 +1,59 @@
+"""
+Bounded LRU cache of finished paths.
+
+Servos keep asking for the same (start cell, goal cell) pairs: food window to
+table and back. Every entry is stamped with the nav grid version it was
+searched on, so a path found before an edit to world.nav_grid is treated as a
+miss and searched again. Lists are frozen into tuples before they are stored,
+so a servo holding one can't change what the next servo gets; other
+sequences (hierarchical paths, already read-only) are stored as they are.
+"""
+from collections import OrderedDict
+
+
+class PathCache:
+    """(start, goal) -> (nav grid version, waypoints tuple), least recently used evicted first."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, start, goal, version):
+        """The cached path, or None on a miss (an empty tuple means "no path")."""
+        key = (start, goal)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, start, goal, version, path):
+        if isinstance(path, list):
+            path = tuple(path)
+        if self.max_entries <= 0:
+            return path
+        entries = self._entries
+        entries[(start, goal)] = (version, path)
+        entries.move_to_end((start, goal))
+        if len(entries) > self.max_entries:
+            entries.popitem(last=False)
+        return path
+
+    def clear(self):
+        self._entries.clear()
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return (f"PathCache({len(self)}/{self.max_entries} entries, hits={self.hits}, "
+                f"misses={self.misses}, hit_rate={self.hit_rate:.1%})")
@@ -1,14 +1,118 @@
 import heapq
 
+from Actions.astar_kernel import GridAStar
+from Actions.cooperative import CooperativePlanner
+from Actions.distance_field import DistanceFields
+from Actions.dstar_lite import DStarLite
+from Actions.hpa import HierarchicalGrid
+from Actions.path_cache import PathCache
+from Actions.smoothing import LineOfSight, smooth
+from constants import (COOPERATIVE_WINDOW, DISTANCE_FIELD_CACHE_SIZE, HPA_CLUSTER_SIZE, PATH_CACHE_SIZE,
+                       PATH_SMOOTHING, PATHFINDING)
+from Simulation import trace
+from Simulation.trace import DEBUG, WARNING
+
+_trace = trace.channel("pathfinder")
+
+PATHFINDING_MODES = ("astar", "field", "hpa", "dstar", "whca")
+
 class Pathfinder:
-    def __init__(self, world):
-        """Initialize with reference to world for grid access."""
+    def __init__(self, world, mode=None, smoothing=None):
+        """
+        Initialize with reference to world for grid access.
+
+        mode: "astar" → a fresh A* search per query (default)
+              "field" → read paths off cached per-goal distance fields
+                        (Actions/distance_field.py); same lengths, ties may differ
+              "hpa"   → hierarchical A* over clusters of the grid (Actions/hpa.py);
+                        near-optimal paths refined leg by leg as they are walked
+              "dstar" → A*, but each servo's own plan is a D* Lite search
+                        (Actions/dstar_lite.py) that is repaired in place when
+                        cells change cost (see update_penalties())
+              "whca"  → A*, but each servo's own plan is a windowed cooperative
+                        space-time search (Actions/cooperative.py) that
+                        reserves its (cell, tick) slots against the others
+              None    → PATHFINDING from constants
+
+        smoothing: True → string-pull "astar", "field" and "dstar" paths down to
+                   the cells where they turn (Actions/smoothing.py); None →
+                   PATH_SMOOTHING from constants. "hpa" paths are refined
+                   lazily and "whca" waits are tied to cells, so neither is
+                   smoothed.
+        """
         self.world = world
+        self.mode = PATHFINDING if mode is None else mode
+        if self.mode not in PATHFINDING_MODES:
+            raise ValueError(f"Unknown pathfinding mode {self.mode!r}; expected one of {PATHFINDING_MODES}")
+        self._fields = None
+        self._kernel = None
+        self._hierarchy = None
+        self._cooperative = None
+        self._line_of_sight = None
+        self.smoothing = PATH_SMOOTHING if smoothing is None else smoothing
+
+        # "dstar" mode: one incremental planner per servo, sharing the
+        # per-cell penalties and a copy of the nav grid to diff against
+        self.replanners = {}      # owner -> DStarLite
+        self.penalties = {}       # cell index -> extra cost to enter it
+        self._replan_grid = None  # (nav grid, cells copy) the planners were last synced to
+        self._holds = {}          # "whca" mode: owner -> holds of its last path
+        self.cache = PathCache(PATH_CACHE_SIZE)
 
-    def find_path(self, start_grid, goal_grid):
+    @property
+    def fields(self):
+        """Distance fields over the world's current nav grid (built on first use)."""
+        if self._fields is None or self._fields.nav_grid is not self.world.nav_grid:
+            self._fields = DistanceFields(self.world.nav_grid, DISTANCE_FIELD_CACHE_SIZE)
+        return self._fields
+
+    @property
+    def kernel(self):
+        """Flat-array A* over the world's current nav grid (built on first use)."""
+        if self._kernel is None or self._kernel.nav_grid is not self.world.nav_grid:
+            self._kernel = GridAStar(self.world.nav_grid)
+        return self._kernel
+
+    @property
+    def hierarchy(self):
+        """Cluster/entrance graph over the world's current nav grid (built on first use)."""
+        if self._hierarchy is None or self._hierarchy.nav_grid is not self.world.nav_grid:
+            self._hierarchy = HierarchicalGrid(self.world.nav_grid, HPA_CLUSTER_SIZE)
+        return self._hierarchy
+
+    @property
+    def cooperative(self):
+        """Space-time planner and reservation table for "whca" mode (built on first use)."""
+        if self._cooperative is None or self._cooperative.nav_grid is not self.world.nav_grid:
+            self._cooperative = CooperativePlanner(self.world.nav_grid, self.fields, COOPERATIVE_WINDOW)
+        return self._cooperative
+
+    @property
+    def line_of_sight(self):
+        """Cached cell-to-cell visibility over the world's current nav grid (built on first use)."""
+        if self._line_of_sight is None or self._line_of_sight.nav_grid is not self.world.nav_grid:
+            self._line_of_sight = LineOfSight(self.world.nav_grid)
+        return self._line_of_sight
+
+    def _smoothed(self, cells):
+        if not self.smoothing:
+            return cells
+        kept = smooth(cells, self.line_of_sight)
+        if _trace.debug:
+            _trace.log(DEBUG, f"[Pathfinder] Smoothed {len(cells)} cells to {len(kept)} waypoints")
+        return kept
+
+    def find_path(self, start_grid, goal_grid, owner=None):
         """
-        Find a path from start to goal using A* pathfinding.
-        Returns a list of pixel‐center Vector2 waypoints.
+        Find a path from start to goal (A*, or the goal's distance field in
+        "field" mode). Returns a tuple of pixel‐center Vector2 waypoints,
+        empty if there is no path. Results are cached per (start, goal) and
+        nav grid version and shared between callers: don't mutate them.
+
+        owner: the servo asking. In "dstar" mode its path comes from (and
+        keeps) its own incremental planner instead, so repair() can fix it.
+        In "whca" mode it is reserved against the other servos' plans, and
+        holds(owner) says where it has to wait.
 
         NOTE: We allow the start_grid itself to be “walkable,” even if
         world.nav_grid[start_grid] == 1.  This way the Servo can depart
@@ -18,22 +122,252 @@ class Pathfinder:
         # 1) Ensure start_grid is in bounds.  (Even if it’s blocked, we still allow it.)
         sx, sy = start_grid
         if not (0 <= sx < self.world.grid_width and 0 <= sy < self.world.grid_height):
-            print(f"[Pathfinder] Start {start_grid} is out of bounds ({self.world.grid_width}×{self.world.grid_height})")
-            return []
+            if _trace.warning:
+                _trace.log(WARNING, f"[Pathfinder] Start {start_grid} is out of bounds ({self.world.grid_width}×{self.world.grid_height})")
+            return ()
 
         # 2) Ensure goal_grid is in bounds AND walkable.
         gx, gy = goal_grid
         if not (0 <= gx < self.world.grid_width and 0 <= gy < self.world.grid_height):
-            print(f"[Pathfinder] Goal {goal_grid} is out of bounds ({self.world.grid_width}×{self.world.grid_height})")
-            return []
+            if _trace.warning:
+                _trace.log(WARNING, f"[Pathfinder] Goal {goal_grid} is out of bounds ({self.world.grid_width}×{self.world.grid_height})")
+            return ()
 
         # If the goal cell is blocked, there’s no valid path.
         if self.world.nav_grid[gx][gy] != 0:
-            print(f"[Pathfinder] Goal {goal_grid} is blocked (nav_grid={self.world.nav_grid[gx][gy]})")
-            return []
+            if _trace.warning:
+                _trace.log(WARNING, f"[Pathfinder] Goal {goal_grid} is blocked (nav_grid={self.world.nav_grid[gx][gy]})")
+            return ()
+
+        if owner is not None and self.mode == "dstar":
+            return self._plan_incremental(owner, start_grid, goal_grid)
+        if owner is not None and self.mode == "whca":
+            return self._plan_cooperative(owner, start_grid, goal_grid)
+
+        version = self.world.nav_grid.version
+        cached = self.cache.get(start_grid, goal_grid, version)
+        if cached is not None:
+            if not cached and _trace.warning:
+                _trace.log(WARNING, f"[Pathfinder] No path found from {start_grid} to {goal_grid} (cached)")
+            elif _trace.debug:
+                _trace.log(DEBUG, f"[Pathfinder] Cached path with {len(cached)} waypoints")
+            return cached
+
+        if self.mode == "hpa":
+            waypoints = self.hierarchy.find_path(start_grid, goal_grid, self.world.grid_to_pixel)
+            if waypoints is not None:
+                if _trace.debug:
+                    _trace.log(DEBUG, f"[Pathfinder] Hierarchical path with {len(waypoints)} waypoints "
+                                      f"over {waypoints.num_legs} legs")
+                return self.cache.put(start_grid, goal_grid, version, waypoints)
+            # No abstract route: settle it with a full search below
+
+        if self.mode == "field":
+            path_cells = self.fields.path(start_grid, goal_grid)
+        else:
+            path_cells = self._astar(start_grid, goal_grid)
+
+        # If we never reached goal_grid, no path was found.
+        if path_cells is None:
+            if _trace.warning:
+                _trace.log(WARNING, f"[Pathfinder] No path found from {start_grid} to {goal_grid}")
+            return self.cache.put(start_grid, goal_grid, version, ())
+
+        # 4) Convert the cell‐path to pixel‐center Vector2 waypoints.
+        path_cells = self._smoothed(path_cells)
+        waypoints = []
+        for (cx, cy) in path_cells:
+            waypoints.append(self.world.grid_to_pixel(cx, cy))
+
+        if _trace.debug:
+            _trace.log(DEBUG, f"[Pathfinder] Found path with {len(waypoints)} waypoints: {path_cells}")
+        return self.cache.put(start_grid, goal_grid, version, waypoints)
+
+    # ─── INCREMENTAL REPLANNING ("dstar" mode) ──────────────────────────────
+    def _waypoints(self, cells):
+        return tuple(self.world.grid_to_pixel(cx, cy) for cx, cy in cells)
+
+    def _sync_grid(self):
+        """Tell every planner about nav grid cells that changed since the last sync."""
+        grid = self.world.nav_grid
+        synced = self._replan_grid
+        if synced is not None and synced[0] is grid:
+            old = synced[1]
+            if old != grid.cells:
+                changed = [i for i, (a, b) in enumerate(zip(old, grid.cells)) if a != b]
+                for planner in self.replanners.values():
+                    planner.cells_changed(changed)
+        else:
+            self.replanners.clear()
+        self._replan_grid = (grid, bytes(grid.cells))
+
+    def _plan_incremental(self, owner, start_grid, goal_grid):
+        self._sync_grid()
+        planner = self.replanners.get(owner)
+        if planner is None or planner.goal_cell != goal_grid:
+            planner = self.replanners[owner] = DStarLite(self.world.nav_grid, start_grid, goal_grid, self.penalties)
+        else:
+            # Same goal as last time (e.g. back to the food window): reuse the search
+            planner.move_start(start_grid)
+            planner.compute()
+        cells = planner.path()
+        if cells is None:
+            if _trace.warning:
+                _trace.log(WARNING, f"[Pathfinder] No path found from {start_grid} to {goal_grid}")
+            return ()
+        if _trace.debug:
+            _trace.log(DEBUG, f"[Pathfinder] D* Lite path with {len(cells)} waypoints "
+                              f"({planner.expanded} vertices expanded so far)")
+        return self._waypoints(self._smoothed(cells))
+
+    def update_penalties(self, penalties):
+        """
+        Replace the per-cell penalties ({(x, y): extra cost}) and repair every
+        planner. Returns {owner: vertices expanded} for the planners that had
+        to do any work, i.e. whose paths may have changed.
+        """
+        self._sync_grid()
+        h = self.world.nav_grid.height
+        new = {x * h + y: cost for (x, y), cost in penalties.items()}
+        old = self.penalties
+        changed = [i for i in old if new.get(i) != old[i]] + [i for i in new if i not in old]
+        if not changed:
+            return {}
+        old.clear()
+        old.update(new)
+        touched = {}
+        for owner, planner in self.replanners.items():
+            expanded = planner.cells_changed(changed)
+            if expanded:
+                touched[owner] = expanded
+        return touched
+
+    def repair(self, owner, start_grid):
+        """Current best path for `owner` from start_grid to its goal, or None if it has no planner."""
+        planner = self.replanners.get(owner)
+        if planner is None:
+            return None
+        planner.move_start(start_grid)
+        planner.compute()
+        cells = planner.path()
+        return () if cells is None else self._waypoints(self._smoothed(cells))
+
+    # ─── COOPERATIVE PLANNING ("whca" mode) ─────────────────────────────────
+    def _plan_cooperative(self, owner, start_grid, goal_grid):
+        planner = self.cooperative
+        plan = planner.plan(owner, start_grid, goal_grid, self.world.tick_count)
+        if plan is None:
+            self._holds.pop(owner, None)
+            return self.find_path(start_grid, goal_grid)
+        cells, holds = plan
+        self._holds[owner] = holds
+        if _trace.debug:
+            waits = sum(1 for tick in holds if tick)
+            _trace.log(DEBUG, f"[Pathfinder] Cooperative path with {len(cells)} waypoints, {waits} holds "
+                              f"({len(planner.reservations)} slots reserved)")
+        return self._waypoints(cells)
+
+    def holds(self, owner):
+        """Per waypoint of owner's last path, the tick it may be left at (0 = free to go); () if none."""
+        return self._holds.get(owner, ())
+
+    def extend_window(self, owner, start_grid):
+        """
+        "whca": owner's path from start_grid with the next window reserved, if
+        its current window is half used up; otherwise None.
+        """
+        planner = self.cooperative
+        goal = planner.due(owner, self.world.tick_count)
+        if goal is None:
+            return None
+        return self._plan_cooperative(owner, start_grid, goal)
+
+    def expire_reservations(self):
+        """Drop reservations for ticks that are over."""
+        self.cooperative.reservations.expire(self.world.tick_count)
+
+    # ─── SNAPSHOTS ──────────────────────────────────────────────────────────
+    def state(self, key):
+        """
+        The per-servo planning state of "dstar" and "whca" as plain values,
+        owners given as key(owner); None in the other modes, whose caches
+        never change a result. See Simulation/snapshot.py.
+        """
+        if self.mode == "dstar":
+            synced = self._replan_grid[1] if self._replan_grid is not None else None
+            planners = tuple((key(owner), planner.state()) for owner, planner in self.replanners.items())
+            return dict(self.penalties), synced, planners
+        if self.mode == "whca":
+            cooperative = self._cooperative.state(key) if self._cooperative is not None else None
+            holds = tuple((key(owner), holds) for owner, holds in self._holds.items())
+            return cooperative, holds
+        return None
+
+    def restore_state(self, state, owner_of):
+        """Carry on from a state(): owner_of(key) turns its keys back into owners."""
+        if state is None:
+            return
+        grid = self.world.nav_grid
+        if self.mode == "dstar":
+            penalties, synced, planners = state
+            self.penalties.update(penalties)
+            if synced is not None:
+                self._replan_grid = (grid, synced)
+            for k, planner in planners:
+                self.replanners[owner_of(k)] = DStarLite.from_state(grid, self.penalties, planner)
+        elif self.mode == "whca":
+            cooperative, holds = state
+            if cooperative is not None:
+                self.cooperative.restore(cooperative, owner_of)
+            self._holds = {owner_of(k): h for k, h in holds}
+
+    def distance(self, start_grid, goal_grid):
+        """
+        Length in steps of the shortest walkable path, or None if there is none
+        (same rules as find_path: a blocked start is allowed, the goal is not).
+        Answered from the goal's distance field, whatever the mode.
+        """
+        sx, sy = start_grid
+        gx, gy = goal_grid
+        grid = self.world.nav_grid
+        if not (grid.in_bounds(sx, sy) and grid.in_bounds(gx, gy)) or not grid.is_walkable(gx, gy):
+            return None
+        return self.fields.distance(start_grid, goal_grid)
+
+    def nearest(self, start_grid, goals):
+        """
+        The goal in `goals` with the shortest walkable path from start_grid, as
+        (goal, steps), or None if none can be reached. One breadth-first search
+        for all of them; equally near goals go to the one listed first. Goals
+        that are out of bounds or blocked are never picked.
+        """
+        grid = self.world.nav_grid
+        if not grid.in_bounds(*start_grid):
+            return None
+        goals = [g for g in goals if grid.in_bounds(*g) and grid.is_walkable(*g)]
+        if not goals:
+            return None
+        found = self.kernel.nearest(start_grid, goals)
+        if found is None:
+            return None
+        n, steps = found
+        if _trace.debug:
+            _trace.log(DEBUG, f"[Pathfinder] Nearest of {len(goals)} goals from {start_grid}: {goals[n]} ({steps} steps)")
+        return goals[n], steps
+
+    def _astar(self, start_grid, goal_grid):
+        """
+        A* on the flat-array kernel (Actions/astar_kernel.py); same paths as the
+        reference. Runs whatever the trace level: find_path() traces the result.
+        """
+        return self.kernel.search(start_grid, goal_grid)
 
-        # 3) A* algorithm.  We *skip* checking nav_grid for start_grid; we only
-        #    check walkability when we expand neighbors.
+    def _astar_reference(self, start_grid, goal_grid):
+        """
+        A* algorithm on (x, y) tuples and dicts.  We *skip* checking nav_grid for start_grid; we only
+        check walkability when we expand neighbors. Returns the cells from
+        start to goal, or None.
+        """
         frontier = []
         heapq.heappush(frontier, (0, start_grid))
         came_from = {start_grid: None}
@@ -52,25 +386,17 @@ class Pathfinder:
                     heapq.heappush(frontier, (priority, next_pos))
                     came_from[next_pos] = current
 
-        # If we never reached goal_grid in came_from, no path was found.
         if goal_grid not in came_from:
-            print(f"[Pathfinder] No path found from {start_grid} to {goal_grid}")
-            return []
+            return None
 
-        # 4) Reconstruct the cell‐path, then convert to pixel‐center Vector2 waypoints.
+        # Reconstruct the cell‐path
         path_cells = []
         cur = goal_grid
         while cur is not None:
             path_cells.append(cur)
             cur = came_from[cur]
         path_cells.reverse()
-
-        waypoints = []
-        for (cx, cy) in path_cells:
-            waypoints.append(self.world.grid_to_pixel(cx, cy))
-
-        print(f"[Pathfinder] Found path with {len(waypoints)} waypoints: {path_cells}")
-        return waypoints
+        return path_cells
 
     def get_neighbors(self, pos):
         """Return the 4-connected neighbors that are walkable (nav_grid == 0)."""
@@ -80,9 +406,10 @@ class Pathfinder:
             nx, ny = x + dx, y + dy
             # 1) Make sure (nx,ny) is in‐bounds
             if 0 <= nx < self.world.grid_width and 0 <= ny < self.world.grid_height:
-                # 2) If that cell is blocked (==1), print a debug and skip it
+                # 2) If that cell is blocked (==1), trace it and skip it
                 if self.world.nav_grid[nx][ny] == 1:
-                    print(f"[DEBUG][Pathfinder] Skipping blocked neighbor {(nx, ny)}")
+                    if _trace.debug:
+                        _trace.log(DEBUG, f"[DEBUG][Pathfinder] Skipping blocked neighbor {(nx, ny)}")
                     continue
                 # 3) Otherwise (==0), it’s walkable → include it
                 neighbors.append((nx, ny))
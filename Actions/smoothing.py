@@ -0,0 +1,90 @@
+"""
+Any-angle path smoothing by string pulling.
+
+A* and the distance fields return every cell centre of a 4-connected path,
+so a servo crossing the room diagonally zig-zags through a waypoint per cell.
+smooth() keeps only the cells where the path has to turn: from each kept
+cell it skips ahead to the farthest later cell still in straight line of
+sight, and drops the ones in between.
+
+Line of sight between two cell centres means every cell the segment passes
+through is walkable. A segment through a cell corner touches both cells
+beside it. The start cell is exempt, because a servo may stand on a blocked
+one. Answers are cached per cell pair and dropped whenever the nav grid's
+version changes.
+"""
+
+
+class LineOfSight:
+    """Cached straight-line visibility between cell centres of one NavGrid."""
+
+    def __init__(self, nav_grid, max_entries=65536):
+        self.nav_grid = nav_grid
+        self.max_entries = max_entries
+        self.version = nav_grid.version
+        self._cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, a, b):
+        grid = self.nav_grid
+        if grid.version != self.version:
+            self._cache.clear()
+            self.version = grid.version
+        key = (a, b)
+        seen = self._cache.get(key)
+        if seen is not None:
+            self.hits += 1
+            return seen
+        self.misses += 1
+        seen = self._trace(a, b)
+        if len(self._cache) >= self.max_entries:
+            self._cache.clear()
+        self._cache[key] = seen
+        return seen
+
+    def _trace(self, a, b):
+        """Walk the cells under the segment between the centres of a and b (a itself is skipped)."""
+        cells = self.nav_grid.cells
+        h = self.nav_grid.height
+        x, y = a
+        x1, y1 = b
+        dx, dy = abs(x1 - x), abs(y1 - y)
+        sx = 1 if x1 > x else -1
+        sy = 1 if y1 > y else -1
+        ix = iy = 0
+        while ix < dx or iy < dy:
+            # Which cell edge does the segment cross next: vertical (<0), horizontal (>0), corner (0)
+            decision = (1 + 2 * ix) * dy - (1 + 2 * iy) * dx
+            if decision == 0:
+                # Exactly through a corner: both side cells must be open
+                if cells[(x + sx) * h + y] or cells[x * h + y + sy]:
+                    return False
+                x += sx
+                y += sy
+                ix += 1
+                iy += 1
+            elif decision < 0:
+                x += sx
+                ix += 1
+            else:
+                y += sy
+                iy += 1
+            if cells[x * h + y]:
+                return False
+        return True
+
+
+def smooth(cells, line_of_sight):
+    """The cells of `cells` (a path) to keep so consecutive ones see each other."""
+    if len(cells) <= 2:
+        return list(cells)
+    kept = [cells[0]]
+    anchor = cells[0]
+    last = len(cells) - 1
+    for i in range(1, last):
+        if not line_of_sight(anchor, cells[i + 1]):
+            anchor = cells[i]
+            kept.append(anchor)
+    kept.append(cells[last])
+    return kept
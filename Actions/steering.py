@@ -1,6 +1,11 @@
-import pygame
+from Simulation.spatial_hash import pack_obstacle
+from Simulation.vector import Vector2, _make
 import math
 
+import numpy as np
+
+STEERING_MODES = ("object", "batch", "orca")
+
 # ───────────────────────────────────────────────────────────────────
 # HELPER FUNCTIONS FOR 2D GEOMETRY AND TRANSFORMATION
 # ───────────────────────────────────────────────────────────────────
@@ -22,7 +27,7 @@ def line_intersection(p1, p2, p3, p4):
     u = -((x1 - x2) * (y1 - y3) - (y1 - y2) * (x1 - x3)) / den
 
     if 0 < t < 1 and u > 0:
-        intersect_point = pygame.math.Vector2(x1 + t * (x2 - x1), y1 + t * (y2 - y1))
+        intersect_point = Vector2(x1 + t * (x2 - x1), y1 + t * (y2 - y1))
         return {'intersects': True, 'point': intersect_point, 'dist': p1.distance_to(intersect_point)}
     else:
         return {'intersects': False, 'point': None, 'dist': float('inf')}
@@ -35,16 +40,141 @@ def point_to_local_space(point, heading, side, position):
     # Perform the transformation
     transformed_x = point.dot(heading) + tx
     transformed_y = point.dot(side) + ty
-    return pygame.math.Vector2(transformed_x, transformed_y)
+    return Vector2(transformed_x, transformed_y)
 
 def vector_to_world_space(vec, heading, side):
     """Transforms a vector from local to world space."""
     # Create a transformation matrix
-    mat = pygame.math.Vector2(heading.x, side.x), pygame.math.Vector2(heading.y, side.y)
+    mat = Vector2(heading.x, side.x), Vector2(heading.y, side.y)
     # Perform the transformation
     transformed_x = vec.x * mat[0][0] + vec.y * mat[0][1]
     transformed_y = vec.x * mat[1][0] + vec.y * mat[1][1]
-    return pygame.math.Vector2(transformed_x, transformed_y)
+    return Vector2(transformed_x, transformed_y)
+
+
+# ───────────────────────────────────────────────────────────────────
+# FLOAT KERNELS FOR WALL AND OBSTACLE AVOIDANCE
+# ───────────────────────────────────────────────────────────────────
+# wall_avoidance() and obstacle_avoidance() on plain floats: no Vector2s, dicts
+# or getattr() per wall or per obstacle. Walls are packed once with their
+# normals (pack_walls); obstacles come as (x, y, radius) tuples, packed by the
+# ObstacleIndex as things move. Each kernel does the same float operations in
+# the same order as the Vector2 version (kept as the _reference methods), so
+# the forces are bit-identical.
+
+def _rotation(angle):
+    """(cos, sin) exactly as Vector2.rotate(angle) uses them for a non-right angle."""
+    angle = angle * math.pi / 180.0
+    angle = math.fmod(angle, 2.0 * math.pi)
+    if angle < 0:
+        angle += 2.0 * math.pi
+    return math.cos(angle), math.sin(angle)
+
+
+# Side feelers: 45° right, then 45° left (wall_avoidance() order)
+_COS_RIGHT, _SIN_RIGHT = _rotation(-45)
+_COS_LEFT, _SIN_LEFT = _rotation(45)
+
+
+def pack_walls(walls):
+    """((x1, y1, x2, y2, normal x, normal y), ...) for (start, end) wall pairs."""
+    packed = []
+    for start, end in walls:
+        wx, wy = end.x - start.x, end.y - start.y
+        nx, ny = float(-wy), float(wx)
+        length = math.sqrt(nx * nx + ny * ny)
+        if length:
+            nx, ny = nx / length, ny / length
+        packed.append((start.x, start.y, end.x, end.y, nx, ny))
+    return tuple(packed)
+
+
+def wall_force(px, py, vx, vy, walls, feeler_length=50.0):
+    """wall_avoidance() for a servo at (px, py) moving at (vx, vy); `walls` from pack_walls()."""
+    speed = math.sqrt(vx * vx + vy * vy)
+    if speed > 0:
+        hx, hy = vx / speed, vy / speed
+    else:
+        hx, hy = 1.0, 0.0
+    rx = _COS_RIGHT * hx - _SIN_RIGHT * hy
+    ry = _SIN_RIGHT * hx + _COS_RIGHT * hy
+    lx = _COS_LEFT * hx - _SIN_LEFT * hy
+    ly = _SIN_LEFT * hx + _COS_LEFT * hy
+
+    best = math.inf
+    hit = None
+    for fx, fy in ((hx, hy), (rx, ry), (lx, ly)):
+        x2 = px + feeler_length * fx
+        y2 = py + feeler_length * fy
+        for wall in walls:
+            x3, y3, x4, y4 = wall[0], wall[1], wall[2], wall[3]
+            den = (px - x2) * (y3 - y4) - (py - y2) * (x3 - x4)
+            if den == 0:
+                continue
+            t = ((px - x3) * (y3 - y4) - (py - y3) * (x3 - x4)) / den
+            u = -((px - x2) * (py - y3) - (py - y2) * (px - x3)) / den
+            if 0 < t < 1 and u > 0:
+                ix = px + t * (x2 - px)
+                iy = py + t * (y2 - py)
+                dx, dy = px - ix, py - iy
+                dist = math.sqrt(dx * dx + dy * dy)
+                if dist < best:
+                    best = dist
+                    hit = (ix, iy, wall[4], wall[5])
+
+    if hit is None:
+        return 0.0, 0.0
+    # The overshoot is measured from the last feeler tried, as it always was
+    ox, oy = x2 - hit[0], y2 - hit[1]
+    overshoot = math.sqrt(ox * ox + oy * oy)
+    return hit[2] * overshoot, hit[3] * overshoot
+
+
+def obstacle_force(px, py, vx, vy, max_speed, radius, obstacles, detection_box_length=120.0):
+    """
+    obstacle_avoidance() for a servo at (px, py) moving at (vx, vy). `obstacles`
+    is an ObstacleView (queried with near_packed() for just the detection box)
+    or a sequence of (x, y, radius) tuples.
+    """
+    speed = math.sqrt(vx * vx + vy * vy)
+    if speed > 0:
+        hx, hy = vx / speed, vy / speed
+    else:
+        hx, hy = 1.0, 0.0
+    sx, sy = -hy, hx     # heading.rotate(90)
+    d_box = detection_box_length + (speed / max_speed) * detection_box_length
+
+    if hasattr(obstacles, 'near_packed'):
+        reach = obstacles.max_radius + radius + 1.0
+        ex, ey = px + hx * d_box, py + hy * d_box
+        obstacles = obstacles.near_packed(min(px, ex) - reach, min(py, ey) - reach,
+                                          max(px, ex) + reach, max(py, ey) + reach)
+
+    tx = -(px * hx + py * hy)
+    ty = -(px * sx + py * sy)
+    closest = math.inf
+    found = None
+    for ox, oy, r in obstacles:
+        lx = (ox * hx + oy * hy) + tx
+        if lx >= 0 and lx < d_box:
+            ly = (ox * sx + oy * sy) + ty
+            expanded = r + radius
+            if abs(ly) < expanded:
+                root = math.sqrt(expanded ** 2 - ly ** 2)
+                ip = lx - root
+                if ip <= 0:
+                    ip = lx + root
+                if ip < closest:
+                    closest = ip
+                    found = (lx, ly, r)
+
+    if found is None:
+        return 0.0, 0.0
+    lx, ly, r = found
+    multiplier = 1.0 + (d_box - lx) / d_box
+    fy = (r - ly) * multiplier   # lateral push
+    fx = (r - lx) * 0.2          # braking
+    return fx * hx + fy * sx, fx * hy + fy * sy
 
 
 class SteeringBehavior:
@@ -83,24 +213,39 @@ class SteeringBehavior:
         if dist > 0:
             desired_velocity = to_target.normalize() * speed
         else:
-            desired_velocity = pygame.math.Vector2(0, 0)
+            desired_velocity = Vector2(0, 0)
             
         # Calculate steering force
         steering_force = desired_velocity - current_velocity
         return steering_force
 
+    @staticmethod
+    def desired_velocity(position, target, max_speed, slow_radius=None):
+        """
+        The velocity seek (slow_radius=None) or arrive would steer toward,
+        without subtracting the current velocity.
+        """
+        to_target = target - position
+        dist = to_target.length()
+        if dist == 0 or (slow_radius is not None and dist < 0.1):
+            return Vector2(0, 0)
+        speed = max_speed
+        if slow_radius is not None and dist < slow_radius:
+            speed = max_speed * (dist / slow_radius)
+        return to_target * (speed / dist)
+
     @staticmethod
     def avoid(position, obstacles, max_speed, look_ahead=50.0):
         """Generate force to avoid static obstacles. Each obstacle is (x,y,radius)."""
         # No force if no obstacles
         if not obstacles:
-            return pygame.math.Vector2(0, 0)
+            return Vector2(0, 0)
 
         # Check each obstacle
-        strongest_force = pygame.math.Vector2(0, 0)
+        strongest_force = Vector2(0, 0)
         for ox, oy, radius in obstacles:
             # Vector from position to obstacle center
-            to_obstacle = pygame.math.Vector2(ox, oy) - position
+            to_obstacle = Vector2(ox, oy) - position
             dist = to_obstacle.length()
             
             # Only avoid if within look_ahead distance
@@ -118,10 +263,36 @@ class SteeringBehavior:
     @staticmethod
     def wall_avoidance(agent, walls, feeler_length=50.0):
         """
-        Uses 'feelers' to detect and avoid walls.
+        Uses 'feelers' to detect and avoid walls. `walls` is (start, end)
+        pairs or, to skip packing them every call, pack_walls() of them.
+        """
+        if walls and not isinstance(walls[0][0], float):
+            walls = pack_walls(walls)
+        return _make(*wall_force(agent.position.x, agent.position.y,
+                                 agent.velocity.x, agent.velocity.y, walls, feeler_length))
+
+    @staticmethod
+    def obstacle_avoidance(agent, detection_box_length=120.0):
+        """
+        Avoids other agents, tables, and customers using a detection box.
+        """
+        obstacles = getattr(agent, 'obstacles', None)
+        if not obstacles:
+            return Vector2(0, 0)
+        if not hasattr(obstacles, 'near_packed'):
+            obstacles = [p for p in map(pack_obstacle, obstacles) if p is not None]
+        return _make(*obstacle_force(agent.position.x, agent.position.y,
+                                     agent.velocity.x, agent.velocity.y, agent.max_speed,
+                                     getattr(agent, 'radius', 20), obstacles, detection_box_length))
+
+    @staticmethod
+    def _wall_avoidance_reference(agent, walls, feeler_length=50.0):
+        """
+        wall_avoidance() on Vector2s and line_intersection() dicts, as it was
+        before the float kernel; Benchmarks/steering.py compares the two.
         """
         # Create three feelers: one straight ahead, one 45deg left, one 45deg right
-        heading = agent.velocity.normalize() if agent.velocity.length() > 0 else pygame.math.Vector2(1, 0)
+        heading = agent.velocity.normalize() if agent.velocity.length() > 0 else Vector2(1, 0)
         
         feelers = [
             agent.position + feeler_length * heading,
@@ -132,7 +303,7 @@ class SteeringBehavior:
         dist_to_closest_ip = float('inf')
         closest_wall = None
         closest_point = None
-        steering_force = pygame.math.Vector2(0, 0)
+        steering_force = Vector2(0, 0)
 
         for feeler in feelers:
             for wall_start, wall_end in walls:
@@ -145,20 +316,18 @@ class SteeringBehavior:
         if closest_wall:
             overshoot = feeler - closest_point
             wall_vector = closest_wall[1] - closest_wall[0]
-            wall_normal = pygame.math.Vector2(-wall_vector.y, wall_vector.x).normalize()
+            wall_normal = Vector2(-wall_vector.y, wall_vector.x).normalize()
             steering_force = wall_normal * overshoot.length()
         
         return steering_force
 
     @staticmethod
-    def obstacle_avoidance(agent, detection_box_length=120.0):
-        """
-        Avoids other agents, tables, and customers using a detection box.
-        """
+    def _obstacle_avoidance_reference(agent, detection_box_length=120.0):
+        """obstacle_avoidance() on Vector2s and getattr() per object, as it was before the float kernel."""
         if not hasattr(agent, 'obstacles') or not agent.obstacles:
-            return pygame.math.Vector2(0, 0)
+            return Vector2(0, 0)
 
-        heading = agent.velocity.normalize() if agent.velocity.length() > 0 else pygame.math.Vector2(1, 0)
+        heading = agent.velocity.normalize() if agent.velocity.length() > 0 else Vector2(1, 0)
         side = heading.rotate(90)
 
         # Dynamic detection box length
@@ -167,7 +336,17 @@ class SteeringBehavior:
         closest_dist = float('inf')
         closest_obj = None
 
-        for obj in agent.obstacles:
+        obstacles = agent.obstacles
+        if hasattr(obstacles, 'near'):
+            # Spatial index: only fetch objects whose centre could be inside the
+            # detection box (its bounding rectangle, padded by the widest radius).
+            reach = obstacles.max_radius + getattr(agent, 'radius', 20) + 1.0
+            px, py = agent.position.x, agent.position.y
+            ex, ey = px + heading.x * d_box_length, py + heading.y * d_box_length
+            obstacles = obstacles.near(min(px, ex) - reach, min(py, ey) - reach,
+                                       max(px, ex) + reach, max(py, ey) + reach)
+
+        for obj in obstacles:
             # Get the object's position, whether it's called 'position' or 'center'
             obj_pos = getattr(obj, 'position', None) or getattr(obj, 'center', None)
             if not obj_pos:
@@ -189,7 +368,7 @@ class SteeringBehavior:
                         closest_dist = ip
                         closest_obj = obj
                         
-        steering_force = pygame.math.Vector2(0, 0)
+        steering_force = Vector2(0, 0)
         if closest_obj:
             closest_obj_pos = getattr(closest_obj, 'position', None) or getattr(closest_obj, 'center', None)
             local_pos_closest = point_to_local_space(closest_obj_pos, heading, side, agent.position)
@@ -203,3 +382,247 @@ class SteeringBehavior:
             steering_force.x = (getattr(closest_obj, 'radius', 20) - local_pos_closest.x) * breaking_weight
         
         return vector_to_world_space(steering_force, heading, side)
+
+
+# ───────────────────────────────────────────────────────────────────
+# ORCA: OPTIMAL RECIPROCAL COLLISION AVOIDANCE
+# ───────────────────────────────────────────────────────────────────
+# van den Berg, Guy, Lin & Manocha, "Reciprocal n-Body Collision Avoidance"
+# (ISRR 2009); the linear programs follow the RVO2 library. Every neighbour
+# contributes one half-plane of allowed velocities; the servo takes the
+# velocity closest to its preferred one (seek/arrive toward its waypoint)
+# inside all of them. A line is (point x, point y, direction x, direction y),
+# allowed side on the left.
+
+ORCA_EPSILON = 1e-5
+
+
+def _orca_line(px, py, vx, vy, radius, ox, oy, ovx, ovy, oradius, share, time_horizon, dt):
+    """Half-plane of velocities that keep (px, py) clear of one neighbour for time_horizon."""
+    rel_x, rel_y = ox - px, oy - py
+    rvx, rvy = vx - ovx, vy - ovy
+    dist_sq = rel_x * rel_x + rel_y * rel_y
+    combined = radius + oradius
+    combined_sq = combined * combined
+
+    if dist_sq > combined_sq:
+        # No collision yet: w is from the cut-off circle's centre to the relative velocity
+        inv_tau = 1.0 / time_horizon
+        wx, wy = rvx - inv_tau * rel_x, rvy - inv_tau * rel_y
+        w_len_sq = wx * wx + wy * wy
+        dot1 = wx * rel_x + wy * rel_y
+        if dot1 < 0.0 and dot1 * dot1 > combined_sq * w_len_sq:
+            # Project on the cut-off circle
+            w_len = math.sqrt(w_len_sq)
+            ux, uy = wx / w_len, wy / w_len
+            dx, dy = uy, -ux
+            scale = combined * inv_tau - w_len
+            ux, uy = ux * scale, uy * scale
+        else:
+            # Project on the nearer leg of the cone
+            leg = math.sqrt(dist_sq - combined_sq)
+            if rel_x * wy - rel_y * wx > 0.0:
+                dx = (rel_x * leg - rel_y * combined) / dist_sq
+                dy = (rel_x * combined + rel_y * leg) / dist_sq
+            else:
+                dx = -(rel_x * leg + rel_y * combined) / dist_sq
+                dy = -(-rel_x * combined + rel_y * leg) / dist_sq
+            dot2 = rvx * dx + rvy * dy
+            ux, uy = dot2 * dx - rvx, dot2 * dy - rvy
+    else:
+        # Already overlapping: get apart within this step
+        inv_dt = 1.0 / dt
+        wx, wy = rvx - inv_dt * rel_x, rvy - inv_dt * rel_y
+        w_len = math.sqrt(wx * wx + wy * wy)
+        if w_len == 0.0:
+            return None
+        ux, uy = wx / w_len, wy / w_len
+        dx, dy = uy, -ux
+        scale = combined * inv_dt - w_len
+        ux, uy = ux * scale, uy * scale
+
+    return (vx + share * ux, vy + share * uy, dx, dy)
+
+
+def _linear_program1(lines, i, radius, opt_x, opt_y, direction_opt):
+    """Best point on line i inside the speed circle and lines[:i], or None."""
+    px, py, dx, dy = lines[i]
+    dot = px * dx + py * dy
+    disc = dot * dot + radius * radius - (px * px + py * py)
+    if disc < 0.0:
+        return None
+    root = math.sqrt(disc)
+    t_left, t_right = -dot - root, -dot + root
+    for j in range(i):
+        qx, qy, ex, ey = lines[j]
+        denominator = dx * ey - dy * ex
+        numerator = ex * (py - qy) - ey * (px - qx)
+        if abs(denominator) <= ORCA_EPSILON:
+            # Parallel lines
+            if numerator < 0.0:
+                return None
+            continue
+        t = numerator / denominator
+        if denominator >= 0.0:
+            t_right = min(t_right, t)
+        else:
+            t_left = max(t_left, t)
+        if t_left > t_right:
+            return None
+    if direction_opt:
+        t = t_right if opt_x * dx + opt_y * dy > 0.0 else t_left
+    else:
+        t = dx * (opt_x - px) + dy * (opt_y - py)
+        t = min(max(t, t_left), t_right)
+    return (px + t * dx, py + t * dy)
+
+
+def _linear_program2(lines, radius, opt_x, opt_y, direction_opt):
+    """(index of the first line that could not be satisfied or len(lines), velocity)."""
+    if direction_opt:
+        result = (opt_x * radius, opt_y * radius)
+    elif opt_x * opt_x + opt_y * opt_y > radius * radius:
+        length = math.sqrt(opt_x * opt_x + opt_y * opt_y)
+        result = (opt_x / length * radius, opt_y / length * radius)
+    else:
+        result = (opt_x, opt_y)
+    for i, (px, py, dx, dy) in enumerate(lines):
+        if dx * (py - result[1]) - dy * (px - result[0]) > 0.0:
+            found = _linear_program1(lines, i, radius, opt_x, opt_y, direction_opt)
+            if found is None:
+                return i, result
+            result = found
+    return len(lines), result
+
+
+def _linear_program3(lines, begin, radius, result):
+    """No velocity satisfies every line: minimise the worst violation, from line `begin` on."""
+    distance = 0.0
+    for i in range(begin, len(lines)):
+        px, py, dx, dy = lines[i]
+        if dx * (py - result[1]) - dy * (px - result[0]) > distance:
+            projected = []
+            for j in range(i):
+                qx, qy, ex, ey = lines[j]
+                determinant = dx * ey - dy * ex
+                if abs(determinant) <= ORCA_EPSILON:
+                    if dx * ex + dy * ey > 0.0:
+                        continue   # same direction
+                    point = (0.5 * (px + qx), 0.5 * (py + qy))
+                else:
+                    t = (ex * (py - qy) - ey * (px - qx)) / determinant
+                    point = (px + t * dx, py + t * dy)
+                nx, ny = ex - dx, ey - dy
+                length = math.sqrt(nx * nx + ny * ny)
+                projected.append((point[0], point[1], nx / length, ny / length))
+            fail, found = _linear_program2(projected, radius, -dy, dx, True)
+            if fail == len(projected):
+                result = found
+            distance = dx * (py - result[1]) - dy * (px - result[0])
+    return result
+
+
+def orca_velocity(lines, max_speed, pref_x, pref_y):
+    """The velocity closest to (pref_x, pref_y), no faster than max_speed, allowed by every line."""
+    fail, result = _linear_program2(lines, max_speed, pref_x, pref_y, False)
+    if fail < len(lines):
+        result = _linear_program3(lines, fail, max_speed, result)
+    return result
+
+
+class OrcaAvoidance:
+    """
+    "orca" steering for one world: every walking servo steers toward the
+    ORCA velocity for its preferred (path-following) velocity, in place of
+    the seek and obstacle forces. The velocities are all computed from the
+    same positions, then the servos move in order.
+
+    Neighbours come from a k-d tree over the servos and seated customers,
+    rebuilt once per move and queried for all walking servos at once; each
+    servo looks at no more than max_neighbours within neighbour_dist. Tables
+    are left out: they never move, and the paths already go around them.
+    Two walking servos share the avoiding (half each); idle servos and
+    customers don't react, so the walker takes it all. A servo parked on the
+    cell a walker is heading into is left out of that walker's constraints,
+    or the walker could never arrive.
+    """
+
+    def __init__(self, world, time_horizon, obstacle_time_horizon, neighbour_dist, max_neighbours):
+        from scipy.spatial import cKDTree  # only "orca" steering needs scipy here
+        self._tree_class = cKDTree
+        self.world = world
+        self.time_horizon = time_horizon
+        self.obstacle_time_horizon = obstacle_time_horizon
+        self.neighbour_dist = neighbour_dist
+        self.max_neighbours = max_neighbours
+
+    def move(self, servos, dt):
+        """Move every servo by dt (walking ones with ORCA, idle ones coast)."""
+        walking = [s for s in servos if s.executing and s.current_action is not None]
+        if not walking:
+            for s in servos:
+                s.coast(dt)
+            return
+
+        walls = self.world.wall_segments
+        bodies = self.world.obstacle_index.movers_packed()
+        reacting = {id(s) for s in walking}
+        idle = {id(s) for s in servos} - reacting
+        points, radii, velocities, reciprocal, parked = [], [], [], [], []
+        for obj, (x, y, radius), vel in bodies:
+            points.append((x, y))
+            radii.append(radius)
+            velocities.append(vel)
+            reciprocal.append(id(obj) in reacting)
+            parked.append(id(obj) in idle)
+        reach_sq = self.world.cell_size ** 2
+        slot = {id(obj): i for i, (obj, _, _) in enumerate(bodies)}
+
+        tree = self._tree_class(np.array(points, dtype=float))
+        k = min(self.max_neighbours + 1, len(bodies))
+        query = np.array([(s.position.x, s.position.y) for s in walking], dtype=float)
+        dists, found = tree.query(query, k=k, distance_upper_bound=self.neighbour_dist)
+        if k == 1:
+            found = found[:, None]
+
+        new_velocity = {}
+        holding = {}
+        for row, s in enumerate(walking):
+            held = holding[id(s)] = s.is_holding()
+            pref = s.preferred_velocity(held)
+            me = slot.get(id(s))
+            px, py = s.position.x, s.position.y
+            vx, vy = s.velocity.x, s.velocity.y
+            # On the last leg, a servo parked on the goal cell is not in the way
+            last = len(s.waypoints) - 1
+            goal = s.waypoints[last] if s.waypoint_index == last else None
+            lines = []
+            for j in found[row]:
+                j = int(j)
+                if j >= len(bodies) or j == me:
+                    continue
+                ox, oy = points[j]
+                if parked[j] and goal is not None and (ox - goal.x) ** 2 + (oy - goal.y) ** 2 < reach_sq:
+                    continue
+                ovx, ovy = velocities[j]
+                if reciprocal[j]:
+                    share, tau = 0.5, self.time_horizon
+                else:
+                    share, tau = 1.0, self.obstacle_time_horizon
+                line = _orca_line(px, py, vx, vy, s.radius, ox, oy, ovx, ovy, radii[j], share, tau, dt)
+                if line is not None:
+                    lines.append(line)
+                if len(lines) == self.max_neighbours:
+                    break
+            new_velocity[id(s)] = orca_velocity(lines, s.max_speed, pref.x, pref.y)
+
+        for s in servos:
+            v = new_velocity.get(id(s))
+            if v is None:
+                s.coast(dt)
+                continue
+            # Steer toward the ORCA velocity under the same force cap as always
+            vx, vy = s.velocity.x, s.velocity.y
+            wall_x, wall_y = wall_force(s.position.x, s.position.y, vx, vy, walls)
+            force = _make((v[0] - vx) + wall_x * 3.0, (v[1] - vy) + wall_y * 3.0)
+            s.apply_force(force, dt, holding[id(s)])
@@ -0,0 +1,101 @@
+"""
+Global task allocation: one assignment of idle servos to open tasks per tick.
+
+The default planner hands out work greedily: idle servos ask in index order,
+and each takes the longest-waiting task whether or not another servo is
+closer. TaskAllocator collects every open task and every idle servo instead,
+and solves a single assignment problem (the Hungarian method, scipy's
+linear_sum_assignment) over
+
+  cost(servo, task) = walk in grid steps - ALLOCATION_URGENCY * customer wait
+
+The tasks are:
+
+  PickUpDish   per unclaimed ready dish; the walk is to the servo's nearest
+               food window (Pathfinder.distance, from the window's cached
+               distance field)
+  SeatCustomer per queueing customer, as many as there are free tables; the
+               walk is to the servo's nearest free table (one
+               Pathfinder.nearest search per servo)
+
+A servo already holding a dish is not in the assignment: it delivers it, as
+before. Pairs that can't be walked are dropped. Each tick costs one search
+per idle servo plus one solve over at most servos × tasks entries.
+"""
+import numpy as np
+
+from Simulation import trace
+from Simulation.trace import DEBUG
+
+_trace = trace.channel("goap")
+
+UNREACHABLE_COST = 1e9
+
+
+class TaskAllocator:
+    """Assigns a world's idle servos to its open tasks, all at once."""
+
+    def __init__(self, world, urgency):
+        from scipy.optimize import linear_sum_assignment  # only "global" allocation needs scipy here
+        self._solve = linear_sum_assignment
+        self.world = world
+        self.urgency = urgency
+        self.solves = 0
+        self.assigned = 0
+
+    def nearest_window(self, cell):
+        """(steps, window) for the food window with the shortest walk from `cell`, or None."""
+        best = None
+        for window in self.world.food_windows:
+            steps = self.world.pathfinder.distance(cell, window.cell)
+            if steps is not None and (best is None or steps < best[0]):
+                best = (steps, window)
+        return best
+
+    def nearest_table(self, cell, tables):
+        """(steps, table) for the table in `tables` with the nearest approach cell, or None."""
+        cells, owners = [], []
+        for table in tables:
+            for approach in self.world.approach_cells(table):
+                cells.append(approach)
+                owners.append(table)
+        found = self.world.pathfinder.nearest(cell, cells)
+        if found is None:
+            return None
+        return found[1], owners[cells.index(found[0])]
+
+    def assign(self, servos):
+        """
+        servos: idle servos, none of them holding a dish.
+        Returns {servo: (action name, customer)} for the servos given a task;
+        the action's target is chosen when the plan is bound (see
+        ServoGOAPPlanner.allocate).
+        """
+        index = self.world.customer_index
+        ready = index.ready()
+        free = index.free_tables()
+        seats = index.queueing(len(free))
+        tasks = [("PickUpDish", cust) for cust in ready] + [("SeatCustomer", cust) for cust in seats]
+        if not servos or not tasks:
+            return {}
+
+        cost = np.full((len(servos), len(tasks)), UNREACHABLE_COST)
+        for i, servo in enumerate(servos):
+            cell = servo.grid_position()
+            window = self.nearest_window(cell) if ready else None
+            table = self.nearest_table(cell, free) if seats else None
+            for j, (action, cust) in enumerate(tasks):
+                trip = window if action == "PickUpDish" else table
+                if trip is not None:
+                    cost[i, j] = trip[0] - self.urgency * cust.wait_time
+
+        rows, cols = self._solve(cost)
+        self.solves += 1
+        assigned = {}
+        for i, j in zip(rows, cols):
+            if cost[i, j] < UNREACHABLE_COST:
+                assigned[servos[i]] = tasks[j]
+        self.assigned += len(assigned)
+        if _trace.debug:
+            _trace.log(DEBUG, f"[GOAP] Allocated {len(assigned)} of {len(tasks)} tasks to {len(servos)} idle servos")
+        return assigned
@@ -1,15 +1,18 @@
-import pygame
-from Actions.steering import SteeringBehavior
+from Simulation.vector import Vector2, _make
+from Actions.steering import SteeringBehavior, obstacle_force, wall_force
 from Customers.customer_fsm import CustomerState
 
-from constants import SERVO_INITIAL_POSITION, SERVO_SPEED_PIXELS_PER_TICK, TILE_SIZE
-from constants import FOOD_WINDOW_CELL
+from constants import SERVO_SPEED_PIXELS_PER_TICK
+from Simulation import trace
+from Simulation.trace import DEBUG, ERROR, INFO, WARNING
+
+_trace = trace.channel("servo")
 
 class ServoAgent:
     def __init__(self, world, planner, pathfinder):
         """
         Initialize the servo so that:
-          1) We start on a valid grid cell  (e.g. (9,6))
+          1) We start on the floor plan's servo_start cell (e.g. (9,6))
           2) We only use world.grid_to_pixel(gx, gy) ↔ world.pixel_to_grid(vec2).
         """
         self.world = world
@@ -18,9 +21,11 @@ class ServoAgent:
         self.color = (255, 255, 0)  # default to yellow
         
         # 1) Start position (pixel coords) near top-middle kitchen area
-        self.position = self.world.grid_to_pixel(SERVO_INITIAL_POSITION[0], SERVO_INITIAL_POSITION[1])
-        self.velocity = pygame.math.Vector2(0, 0)
-        self.heading = pygame.math.Vector2(0, -1) # Start facing up
+        start_x, start_y = self.world.layout.servo_start
+        self.position = self.world.grid_to_pixel(start_x, start_y)
+        self.previous_position = self.position.copy()  # as of the last tick, for drawing between ticks
+        self.velocity = Vector2(0, 0)
+        self.heading = Vector2(0, -1) # Start facing up
         self.side = self.heading.rotate(90)
         self.radius = 12 # For obstacle avoidance checks
         
@@ -31,15 +36,18 @@ class ServoAgent:
         # 3) Path‐following state
         self.waypoints = []   # list[Vector2] in pixel coords
         self.waypoint_index = 0
-        self.waypoint_threshold = TILE_SIZE  
+        self.waypoint_threshold = self.world.cell_size
+        self.holds = ()       # "whca" pathfinding: tick each waypoint may be left at (0 = free)
         
         # 4) Current GOAP action
         self.current_action = None #  e.g. ("SeatCustomer", cust, table) or ("PickUpDish", cust, table), etc.
         self.carrying = None  # Customer whose dish we're carrying
+        self.next_actions = []  # rest of a multi-step plan ("search" planner), started one after another
         self.executing = False  # prevents mid-action re-planning
         self.obstacles = [] # List of obstacles from the world
         
-        print(f"[Servo] Created at pos={tuple(self.position)}")
+        if _trace.info:
+            _trace.log(INFO, f"[Servo] Created at pos={tuple(self.position)}")
 
     # ────────────────────────────────────────────────────────────────────
     def start_new_plan(self, plan):
@@ -52,9 +60,11 @@ class ServoAgent:
         # If there is no plan, clear everything and return.
         if plan is None:
             self.current_action = None
+            self.next_actions = []
             self.executing = False
             self.waypoints = []
             self.waypoint_index = 0
+            self.holds = ()
             return
 
         # If the plan is the same as before, do nothing.
@@ -63,7 +73,7 @@ class ServoAgent:
 
         # We are truly starting a brand‐new plan:
         self.current_action = plan
-        self.velocity = pygame.math.Vector2(0, 0)
+        self.velocity = Vector2(0, 0)
 
         action_type, cust, table = plan
 
@@ -73,47 +83,52 @@ class ServoAgent:
         # First, figure out the table's grid coordinate:
         tgx, tgy = self.world.pixel_to_grid(table.center)
 
-        # 1) Find a "delivery cell" next to the target table
-        tgx, tgy = self.world.pixel_to_grid(table.center)
-        delivery_cell = None
-        for dx, dy in [(0, +1), (0, -1), (+1, 0), (-1, 0)]:
-            nx, ny = tgx + dx, tgy + dy
-            if (0 <= nx < self.world.grid_width 
-                and 0 <= ny < self.world.grid_height 
-                and self.world.nav_grid[nx][ny] == 0):
-                delivery_cell = (nx, ny)
-                break
+        # 1) Find a "delivery cell" next to the target table: the first walkable
+        #    neighbour, or the closest one if the planner asks for it
+        approach = self.world.approach_cells(table)
+        delivery_cell = approach[0] if approach else None
+        if len(approach) > 1 and action_type != "PickUpDish" and self.planner.wants_nearest_approach():
+            found = self.pathfinder.nearest(self.grid_position(), approach)
+            if found is not None:
+                delivery_cell = found[0]
 
         if delivery_cell is None:
             # (This should never happen if you've marked neighbor cells as walkable in update_nav_grid())
-            print(f"[Servo][ERROR] Could NOT find a free delivery cell next to table at {tgx,tgy}")
+            if _trace.error:
+                _trace.log(ERROR, f"[Servo][ERROR] Could NOT find a free delivery cell next to table at {tgx,tgy}")
             self.executing = False
             return
 
         # 2) Choose goal_cell based on action_type
         if action_type == "PickUpDish":
-            # In this lab, "food window" is at a known cell:
-            goal_cell = FOOD_WINDOW_CELL  
+            # The target is a food window: go to its own cell
+            goal_cell = (tgx, tgy)
         else:   # "SeatCustomer" or "DeliverDish"
             goal_cell = delivery_cell
     
-        print(f"[Servo][DEBUG] goal_cell = {goal_cell}, walkable? {self.world.nav_grid[goal_cell[0]][goal_cell[1]]}")
+        if _trace.debug:
+            _trace.log(DEBUG, f"[Servo][DEBUG] goal_cell = {goal_cell}, walkable? {self.world.nav_grid[goal_cell[0]][goal_cell[1]]}")
 
         # 3): compute current grid cell:
         start_cell = self.grid_position()
-        print(f"[Servo] Generating waypoints for {action_type} from {start_cell} → {goal_cell}")
+        if _trace.debug:
+            _trace.log(DEBUG, f"[Servo] Generating waypoints for {action_type} from {start_cell} → {goal_cell}")
 
         # 4) Run A* on the nav_grid to get a list of pixel‐center Vector2 waypoints.
-        self.waypoints = self.pathfinder.find_path(start_cell, goal_cell)
-        print(f"[Servo][DEBUG] goal_cell = {goal_cell}, walkable? {self.world.nav_grid[goal_cell[0]][goal_cell[1]]}")
+        self.waypoints = self.pathfinder.find_path(start_cell, goal_cell, owner=self)
+        self.holds = self.pathfinder.holds(self)
+        if _trace.debug:
+            _trace.log(DEBUG, f"[Servo][DEBUG] goal_cell = {goal_cell}, walkable? {self.world.nav_grid[goal_cell[0]][goal_cell[1]]}")
 
         # 5) If A* returned at least one waypoint, we are now "executing"
         if self.waypoints:
             self.executing = True
             self.waypoint_index = 0
-            print(f"[Servo] New waypoints: {[tuple(w) for w in self.waypoints]}")
+            if _trace.debug:
+                _trace.log(DEBUG, f"[Servo] New waypoints: {[tuple(w) for w in self.waypoints]}")
         else:
-            print(f"[Servo][ERROR] A* could not find path from {start_cell} to {goal_cell}")
+            if _trace.error:
+                _trace.log(ERROR, f"[Servo][ERROR] A* could not find path from {start_cell} to {goal_cell}")
             self.executing = False
             
     def move(self, dt):
@@ -123,22 +138,23 @@ class ServoAgent:
         """
         # 1) If we have no plan, do nothing.
         if not self.executing or self.current_action is None:
-            self.velocity *= 0.95 # Apply some friction to stop
-            if self.velocity.length() < 0.1:
-                self.velocity.update(0,0)
-            self.position += self.velocity * dt
+            self.coast(dt)
             return
 
         # --- COMBINE STEERING FORCES ---
-        force = pygame.math.Vector2(0, 0)
-        
         # 1. Path Following Force (Seek/Arrive)
-        path_force = pygame.math.Vector2(0, 0)
+        path_force = Vector2(0, 0)
+        holding = self.is_holding()
         if self.waypoint_index < len(self.waypoints):
             target = self.waypoints[self.waypoint_index]
             dist = self.position.distance_to(target)
 
-            if self.waypoint_index == len(self.waypoints) - 1 and dist < self.waypoint_threshold * 1.5:
+            if holding:
+                path_force = SteeringBehavior.arrive(
+                    self.position, self.waypoints[self.waypoint_index - 1], self.max_speed, self.velocity,
+                    slow_radius=self.waypoint_threshold
+                )
+            elif self.waypoint_index == len(self.waypoints) - 1 and dist < self.waypoint_threshold * 1.5:
                 path_force = SteeringBehavior.arrive(
                     self.position, target, self.max_speed, self.velocity, slow_radius=self.waypoint_threshold
                 )
@@ -147,18 +163,55 @@ class ServoAgent:
                     self.position, target, self.max_speed, self.velocity
                 )
         
-        # 2. Wall Avoidance Force
-        wall_force = SteeringBehavior.wall_avoidance(self, self.world.walls)
+        # 2. Wall Avoidance Force (float kernels; no Vector2 per wall or obstacle)
+        px, py = self.position.x, self.position.y
+        vx, vy = self.velocity.x, self.velocity.y
+        wall_x, wall_y = wall_force(px, py, vx, vy, self.world.wall_segments)
 
         # 3. Obstacle Avoidance Force
-        obstacle_force = SteeringBehavior.obstacle_avoidance(self)
-        
+        obstacle_x = obstacle_y = 0.0
+        if self.obstacles:
+            obstacle_x, obstacle_y = obstacle_force(px, py, vx, vy, self.max_speed, self.radius, self.obstacles)
+
         # --- WEIGHTED SUM OF FORCES ---
         # Adjust weights to prioritize avoidance
-        force += path_force * 1.0
-        force += wall_force * 3.0
-        force += obstacle_force * 5.0
+        force = _make((0.0 + path_force.x * 1.0) + wall_x * 3.0 + obstacle_x * 5.0,
+                      (0.0 + path_force.y * 1.0) + wall_y * 3.0 + obstacle_y * 5.0)
+
+        self.apply_force(force, dt, holding)
+
+    def preferred_velocity(self, holding=False):
+        """Velocity seek/arrive would steer toward: where the path wants the servo to go."""
+        if self.waypoint_index >= len(self.waypoints):
+            return Vector2(0, 0)
+        if holding:
+            return SteeringBehavior.desired_velocity(
+                self.position, self.waypoints[self.waypoint_index - 1], self.max_speed,
+                slow_radius=self.waypoint_threshold
+            )
+        target = self.waypoints[self.waypoint_index]
+        if self.waypoint_index == len(self.waypoints) - 1 and self.position.distance_to(target) < self.waypoint_threshold * 1.5:
+            return SteeringBehavior.desired_velocity(
+                self.position, target, self.max_speed, slow_radius=self.waypoint_threshold
+            )
+        return SteeringBehavior.desired_velocity(self.position, target, self.max_speed)
+
+    def is_holding(self):
+        """Cooperative plan says wait at the last waypoint until another servo has gone by."""
+        return bool(self.holds and 0 < self.waypoint_index < len(self.waypoints)
+                    and self.world.tick_count < self.holds[self.waypoint_index - 1])
+
+    def coast(self, dt):
+        """No plan: let friction bring the servo to a stop."""
+        # Friction loses 5% of the speed per simulation tick, however it is substepped
+        self.velocity *= 0.95 ** (dt / self.world.SIM_SECONDS_PER_TICK)
+        if self.velocity.length() < 0.1:
+            self.velocity.update(0,0)
+        self.position += self.velocity * dt
+        self.world.obstacle_index.moved(self)
 
+    def apply_force(self, force, dt, holding=False):
+        """Integrate the combined steering force over dt, then advance along the waypoints."""
         # --- APPLY FINAL FORCE ---
         # Cap the steering force
         if force.length() > self.max_force:
@@ -178,8 +231,14 @@ class ServoAgent:
 
         # Update position based on the new velocity
         self.position += self.velocity * dt
+        self.world.obstacle_index.moved(self)
+
+        self.advance_waypoints(holding)
 
-        # --- WAYPOINT LOGIC ---
+    def advance_waypoints(self, holding=False):
+        """After a move: step past a waypoint within reach, and act on reaching the last one."""
+        if holding:
+            return
         if self.waypoint_index < len(self.waypoints):
             dist_to_wp = self.position.distance_to(self.waypoints[self.waypoint_index])
             if dist_to_wp < self.waypoint_threshold:
@@ -197,36 +256,77 @@ class ServoAgent:
 
         action_type, cust, table = self.current_action
 
-        if action_type == "SeatCustomer":
+        if action_type == "SeatCustomer" and cust.fsm.current in (CustomerState.EATING, CustomerState.LEAVING):
+            # Another servo's dish got there first; seating again would undo the meal
+            if _trace.debug:
+                _trace.log(DEBUG, f"[Servo] Customer#{cust.spawn_tick} already eating; nothing to seat")
+
+        elif action_type == "SeatCustomer":
             cust.fsm.current = CustomerState.SEATED
             cust.target_table = table
             cust.seat_assigned = True
             cust.satisfaction = min(cust.satisfaction + 15, 100) # AWARD +15 for "just got seated" 
             cust.seat_tick = self.world.tick_count
-            print(f"[Servo] Seating Customer#{cust.spawn_tick} → +15 sat → now {cust.satisfaction}")
+            if _trace.info:
+                _trace.log(INFO, f"[Servo] Seating Customer#{cust.spawn_tick} → +15 sat → now {cust.satisfaction}")
 
 
         elif action_type == "PickUpDish":
-            print(f"[Servo] Picking up dish for Customer#{cust.spawn_tick}")
+            if _trace.info:
+                _trace.log(INFO, f"[Servo] Picking up dish for Customer#{cust.spawn_tick}")
             self.carrying = cust
 
         elif action_type == "DeliverDish":
-            print(f"[Servo] Delivering dish to Customer#{cust.spawn_tick}")
+            if _trace.info:
+                _trace.log(INFO, f"[Servo] Delivering dish to Customer#{cust.spawn_tick}")
             cust.fsm.current = CustomerState.EATING
             cust.order_delivered = True
             self.carrying = None
             
             # ─── AWARD +15 for "just began eating" ───
             cust.satisfaction = min(cust.satisfaction + 15, 100)
-            print(f"[Servo] Customer#{cust.spawn_tick} now EATING → +15 sat → now {cust.satisfaction}")
+            if _trace.info:
+                _trace.log(INFO, f"[Servo] Customer#{cust.spawn_tick} now EATING → +15 sat → now {cust.satisfaction}")
 
 
         # Clear so we re-plan next simulation tick
         self.current_action = None
         self.waypoints = []
         self.waypoint_index = 0
+        self.holds = ()
         self.executing = False
-        
+
+        # A multi-step plan goes straight on to its next action, without replanning
+        if self.next_actions:
+            self.start_new_plan(self.next_actions.pop(0))
+
+    def repair_path(self):
+        """
+        Swap in the pathfinder's repaired path (see Pathfinder.repair) if it
+        differs from what is left of the current one.
+        """
+        waypoints = self.pathfinder.repair(self, self.grid_position())
+        if not waypoints:
+            return
+        # waypoints[0] is the cell we're standing in; carry on from the next one
+        if tuple(waypoints[1:]) == tuple(self.waypoints[self.waypoint_index:]):
+            return
+        if _trace.debug:
+            _trace.log(DEBUG, f"[Servo] Path repaired: {len(waypoints)} waypoints from {self.grid_position()}")
+        self.waypoints = waypoints
+        self.waypoint_index = 1 if len(waypoints) > 1 else 0
+
+    def extend_path(self):
+        """Take the path with the next cooperative window reserved, once it is due (see Pathfinder.extend_window)."""
+        waypoints = self.pathfinder.extend_window(self, self.grid_position())
+        if not waypoints:
+            return
+        if _trace.debug:
+            _trace.log(DEBUG, f"[Servo] Next window reserved: {len(waypoints)} waypoints from {self.grid_position()}")
+        self.waypoints = waypoints
+        self.holds = self.pathfinder.holds(self)
+        self.waypoint_index = 1 if len(waypoints) > 1 else 0
+
     def actions_equal(self, a1, a2):
         """Compare if current GOAP action is the same as the next one so we don't re‐plan unnecessarily."""
         if a1 is None and a2 is None:
@@ -240,16 +340,22 @@ class ServoAgent:
         """Get the current grid‐cell (gx, gy) that contains our pixel position."""
         return self.world.pixel_to_grid(self.position)
 
-    def draw(self, screen: pygame.Surface):
+    def draw(self, screen, alpha=1.0):
         """
         Draw the servo as a solid yellow circle at self.position (Vector2),
         plus draw each waypoint as a small gray dot so we can see the path.
+        With alpha < 1 the servo is drawn that far from previous_position
+        (where the last tick left it) to self.position.
         """
+        import pygame  # only the renderer needs pygame
+        position = self.position
+        if alpha < 1.0:
+            position = self.previous_position + (self.position - self.previous_position) * alpha
         # 1) Draw the servo itself
         pygame.draw.circle(
             screen,
             self.color,                
-            (int(self.position.x), int(self.position.y)),
+            (int(position.x), int(position.y)),
             12
         )
 
@@ -265,11 +371,11 @@ class ServoAgent:
         # 3) Draw heading and feelers for debugging
         if self.velocity.length() > 0:
             # Heading line
-            pygame.draw.line(screen, (0, 255, 0), self.position, self.position + self.heading * 25, 2)
+            pygame.draw.line(screen, (0, 255, 0), position, position + self.heading * 25, 2)
             # Feeler lines
             feeler_len = 50.0
-            pygame.draw.line(screen, (255, 0, 255), self.position, self.position + self.heading.rotate(-45) * feeler_len, 1)
-            pygame.draw.line(screen, (255, 0, 255), self.position, self.position + self.heading.rotate(45) * feeler_len, 1)
+            pygame.draw.line(screen, (255, 0, 255), position, position + self.heading.rotate(-45) * feeler_len, 1)
+            pygame.draw.line(screen, (255, 0, 255), position, position + self.heading.rotate(45) * feeler_len, 1)
 
     def compute_waypoints(self, action):
         """Compute waypoints for the given action."""
@@ -283,19 +389,24 @@ class ServoAgent:
         
         if action_type == "PickUpDish":
             # Path to food window
-            print(f"[Servo] Computing path from {start_grid} to {FOOD_WINDOW_CELL} for PickUpDish")
-            path = self.pathfinder.find_path(start_grid, FOOD_WINDOW_CELL)
+            window_grid = self.world.pixel_to_grid(table.center)
+            if _trace.debug:
+                _trace.log(DEBUG, f"[Servo] Computing path from {start_grid} to {window_grid} for PickUpDish")
+            path = self.pathfinder.find_path(start_grid, window_grid)
             if not path:
-                print(f"[Servo] No path found from {start_grid} to {FOOD_WINDOW_CELL}")
+                if _trace.warning:
+                    _trace.log(WARNING, f"[Servo] No path found from {start_grid} to {window_grid}")
             return path
             
         elif action_type == "DeliverDish":
             # Path from current position to table
             table_grid = self.world.pixel_to_grid(table.position)
-            print(f"[Servo] Computing path from {start_grid} to {table_grid} for DeliverDish")
+            if _trace.debug:
+                _trace.log(DEBUG, f"[Servo] Computing path from {start_grid} to {table_grid} for DeliverDish")
             path = self.pathfinder.find_path(start_grid, table_grid)
             if not path:
-                print(f"[Servo] No path found from {start_grid} to {table_grid}")
+                if _trace.warning:
+                    _trace.log(WARNING, f"[Servo] No path found from {start_grid} to {table_grid}")
             return path
             
         return []
\ No newline at end of file
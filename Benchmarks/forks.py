@@ -0,0 +1,76 @@
+"""
+Fork check: a forked World continues exactly like the world it came from.
+
+For each pathfinding mode, runs the dining room from a few seeds, snapshots
+it part-way (and once more through to_bytes()/from_bytes(), as a worker
+process would get it), then steps the original and both forks to the end of
+the night. Every servo position on every tick and the final profit and
+customer count must agree. Prints one line per mode with the mismatches and
+the time a snapshot and a restore take there.
+
+    python -m Benchmarks.forks                 # every pathfinding mode
+    python -m Benchmarks.forks dstar whca      # just these
+"""
+import sys
+import time
+
+from Simulation.snapshot import WorldSnapshot
+from world import World
+
+MODES = ["astar", "field", "hpa", "dstar", "whca"]
+SEEDS = (1, 2, 3)
+CUTS = (37, 120)
+NUM_SERVOS = 3
+LAST_TICK = 600
+
+
+def finish(world):
+    """Every servo position per tick until the night is over, then (profit, customers served)."""
+    positions = []
+    while (world.tick_count < world.max_ticks or world.customers) and world.tick_count < LAST_TICK:
+        world._do_one_simulation_tick()
+        positions.append(tuple((s.position.x, s.position.y) for s in world.servos))
+    return positions, world.profit, len(world.completed_customers)
+
+
+def check(mode):
+    mismatches = 0
+    snapshot_s = restore_s = 0.0
+    for seed in SEEDS:
+        for cut in CUTS:
+            world = World(num_servos=NUM_SERVOS, seed=seed, render=False, arrivals="poisson", pathfinding=mode)
+            for _ in range(cut):
+                world._do_one_simulation_tick()
+            start = time.perf_counter()
+            snap = world.snapshot()
+            snapshot_s += time.perf_counter() - start
+            start = time.perf_counter()
+            fork = snap.restore()
+            restore_s += time.perf_counter() - start
+            shipped = WorldSnapshot.from_bytes(snap.to_bytes()).restore()
+            if not finish(world) == finish(fork) == finish(shipped):
+                mismatches += 1
+    runs = len(SEEDS) * len(CUTS)
+    return {
+        "mode": mode,
+        "runs": runs,
+        "mismatches": mismatches,
+        "snapshot_ms": snapshot_s / runs * 1000.0,
+        "restore_ms": restore_s / runs * 1000.0,
+    }
+
+
+def main(modes=None):
+    modes = modes or MODES
+    print(f"{'mode':>6} {'forks':>6} {'diverged':>9} {'snapshot':>11} {'restore':>11}")
+    failed = False
+    for mode in modes:
+        r = check(mode)
+        failed = failed or r["mismatches"] > 0
+        print(f"{r['mode']:>6} {r['runs']:>6} {r['mismatches']:>9} "
+              f"{r['snapshot_ms']:>8.3f} ms {r['restore_ms']:>8.3f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
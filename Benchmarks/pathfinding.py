@@ -0,0 +1,80 @@
+"""
+A* benchmark: the flat-array kernel against the reference tuple/dict search.
+
+Builds square-ish random floors from the 10×7 dining room up to 500×500
+(border walls plus a share of blocked cells), runs the same seeded
+start/goal queries through both searches, checks every path is identical
+and prints the time per query.
+
+    python -m Benchmarks.pathfinding                 # all sizes
+    python -m Benchmarks.pathfinding 200x200 500x500 # just these
+"""
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+from Actions.pathfinder import Pathfinder
+from Simulation.nav_grid import NavGrid
+
+SIZES = [(10, 7), (50, 50), (100, 100), (200, 200), (500, 500)]
+BLOCKED_SHARE = 0.2
+SEED = 7
+
+
+def random_floor(width, height, rng):
+    grid = NavGrid(width, height)
+    for x in range(width):
+        for y in range(height):
+            if x in (0, width - 1) or y in (0, height - 1) or rng.random() < BLOCKED_SHARE:
+                grid.set(x, y, 1)
+    return grid
+
+
+def queries_for(width, height):
+    """Fewer queries on bigger floors so the reference search finishes in seconds."""
+    return max(10, min(500, 200_000 // (width * height)))
+
+
+def bench(width, height, seed=SEED):
+    rng = random.Random(seed)
+    grid = random_floor(width, height, rng)
+    world = SimpleNamespace(nav_grid=grid, grid_width=width, grid_height=height)
+    pathfinder = Pathfinder(world, mode="astar")
+    walkable = [(x, y) for x in range(width) for y in range(height) if grid.is_walkable(x, y)]
+    pairs = [(rng.choice(walkable), rng.choice(walkable)) for _ in range(queries_for(width, height))]
+
+    # Adjacency is built once per nav grid version; time it separately
+    start = time.perf_counter()
+    pathfinder.kernel.search(*pairs[0])
+    setup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reference = [pathfinder._astar_reference(s, g) for s, g in pairs]
+    t_reference = time.perf_counter() - start
+
+    start = time.perf_counter()
+    flat = [pathfinder.kernel.search(s, g) for s, g in pairs]
+    t_flat = time.perf_counter() - start
+
+    return {
+        "size": f"{width}×{height}",
+        "queries": len(pairs),
+        "reference_ms": t_reference / len(pairs) * 1000.0,
+        "flat_ms": t_flat / len(pairs) * 1000.0,
+        "setup_ms": setup * 1000.0,
+        "identical": reference == flat,
+    }
+
+
+def main(sizes=None):
+    sizes = sizes or SIZES
+    print(f"{'grid':>9} {'queries':>7} {'reference':>12} {'flat':>12} {'speedup':>8} {'adjacency':>10}  same paths")
+    for width, height in sizes:
+        r = bench(width, height)
+        print(f"{r['size']:>9} {r['queries']:>7} {r['reference_ms']:>9.3f} ms {r['flat_ms']:>9.3f} ms "
+              f"{r['reference_ms'] / r['flat_ms']:>7.2f}× {r['setup_ms']:>7.1f} ms  {r['identical']}")
+
+
+if __name__ == "__main__":
+    main([tuple(int(n) for n in arg.split("x")) for arg in sys.argv[1:]])
@@ -0,0 +1,197 @@
+"""
+Steering benchmark: per-object ServoAgent.move() against batch steering, and
+the float wall/obstacle kernels against the Vector2 versions they replaced.
+
+Runs the banquet hall with more and more servos, once with steering="object"
+and once with steering="batch", from the same seed. It times only the
+servo-moving step (World.move_servos). Batch steering avoids the other servos
+where they were at the start of each move, so the two runs drift apart and
+their end states are not compared. Instead, on every frame of the batch run
+it computes every walking servo's wall and obstacle forces both batched and
+with the per-servo kernels, and reports the largest difference.
+
+The second table steps one "object" world and, every frame, computes every
+walking servo's wall and obstacle forces twice: with the reference methods
+(Vector2s, line_intersection() dicts, getattr() per obstacle) and with the
+float kernels. It reports the time per frame, the temporary objects each
+builds per frame (Vector2s plus line_intersection() result dicts, counted
+by wrapping their constructors for a separate pass), and the largest
+difference between their forces.
+
+    python -m Benchmarks.steering             # 3, 12, 48, 96 servos
+    python -m Benchmarks.steering 12 200      # just these
+"""
+import sys
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+import Actions.steering as steering
+import Simulation.vector as vector
+from Actions.steering import SteeringBehavior, obstacle_force, wall_force
+from world import World
+
+SERVO_COUNTS = [3, 12, 48, 96]
+LAYOUT = "banquet_hall"
+TICKS = 150
+SEED = 3
+
+
+def run(num_servos, steering, ticks=TICKS, seed=SEED):
+    """Seconds spent moving servos over one run."""
+    world = World(num_servos=num_servos, seed=seed, render=False, layout=LAYOUT,
+                  arrivals="poisson", steering=steering)
+    move = world.move_servos
+    spent = 0.0
+
+    def timed(dt):
+        nonlocal spent
+        start = time.perf_counter()
+        move(dt)
+        spent += time.perf_counter() - start
+
+    world.move_servos = timed
+    for _ in range(ticks):
+        world._do_one_simulation_tick()
+    return spent
+
+
+def batch_force_diff(num_servos, ticks=TICKS, seed=SEED):
+    """Largest gap between batched and per-servo wall/obstacle forces over a batch run."""
+    world = World(num_servos=num_servos, seed=seed, render=False, layout=LAYOUT,
+                  arrivals="poisson", steering="batch")
+    engine = world.steering_engine
+    worst = 0.0
+    for _ in range(ticks):
+        world._do_one_simulation_tick()
+        walking = [s for s in world.servos if s.executing and s.current_action is not None]
+        if not walking:
+            continue
+        pos = np.array([(s.position.x, s.position.y) for s in walking])
+        vel = np.array([(s.velocity.x, s.velocity.y) for s in walking])
+        max_speed = np.array([s.max_speed for s in walking])
+        radius = np.array([s.radius for s in walking], dtype=float)
+        speed, hx, hy = engine.headings(vel)
+        wfx, wfy = engine.wall_forces(pos, hx, hy)
+        obstacles, skip = engine.pack_obstacles(walking)
+        ofx, ofy = engine.obstacle_forces(pos, speed, hx, hy, max_speed, radius, obstacles, skip)
+        for i, s in enumerate(walking):
+            kernel = kernel_force(s, world.wall_segments)
+            batched = (wfx[i], wfy[i], ofx[i], ofy[i])
+            worst = max([worst] + [abs(a - b) for a, b in zip(kernel, batched)])
+    return worst
+
+
+def bench(num_servos):
+    t_object = run(num_servos, "object")
+    t_batch = run(num_servos, "batch")
+    return {
+        "servos": num_servos,
+        "object_ms": t_object / TICKS * 1000.0,
+        "batch_ms": t_batch / TICKS * 1000.0,
+        "max_diff": batch_force_diff(num_servos),
+    }
+
+
+def reference_force(s, walls):
+    """One walking servo's wall and obstacle forces, the Vector2 way."""
+    wall = SteeringBehavior._wall_avoidance_reference(s, walls)
+    obstacle = SteeringBehavior._obstacle_avoidance_reference(s)
+    return wall.x, wall.y, obstacle.x, obstacle.y
+
+
+def kernel_force(s, segments):
+    """The same forces from the float kernels."""
+    px, py, vx, vy = s.position.x, s.position.y, s.velocity.x, s.velocity.y
+    wx, wy = wall_force(px, py, vx, vy, segments)
+    ox, oy = obstacle_force(px, py, vx, vy, s.max_speed, s.radius, s.obstacles) if s.obstacles else (0.0, 0.0)
+    return wx, wy, ox, oy
+
+
+@contextmanager
+def counting_temporaries():
+    """Count Vector2s and line_intersection() dicts built inside the block; yields the counter."""
+    count = [0]
+    new, init, intersect = vector._new, vector.Vector2.__init__, steering.line_intersection
+
+    def counted_new(cls):
+        count[0] += 1
+        return new(cls)
+
+    def counted_init(self, *args):
+        count[0] += 1
+        init(self, *args)
+
+    def counted_intersect(*args):
+        count[0] += 1     # the result dict; its Vector2, if any, counts itself
+        return intersect(*args)
+
+    vector._new, vector.Vector2.__init__, steering.line_intersection = counted_new, counted_init, counted_intersect
+    try:
+        yield count
+    finally:
+        vector._new, vector.Vector2.__init__, steering.line_intersection = new, init, intersect
+
+
+def frame_cost(force, servos, walls):
+    """(seconds, temporaries, forces) for one frame of force(servo, walls) over the servos."""
+    start = time.perf_counter()
+    forces = [force(s, walls) for s in servos]
+    spent = time.perf_counter() - start
+    with counting_temporaries() as count:
+        for s in servos:
+            force(s, walls)
+    return spent, count[0], forces
+
+
+def bench_kernels(num_servos, ticks=TICKS, seed=SEED):
+    world = World(num_servos=num_servos, seed=seed, render=False, layout=LAYOUT, arrivals="poisson")
+    totals = {"reference_s": 0.0, "kernel_s": 0.0, "reference_objects": 0, "kernel_objects": 0}
+    frames = 0
+    worst = 0.0
+    for _ in range(ticks):
+        world._do_one_simulation_tick()
+        walking = [s for s in world.servos if s.executing and s.current_action is not None]
+        if not walking:
+            continue
+        frames += 1
+        spent, built, reference = frame_cost(reference_force, walking, world.walls)
+        totals["reference_s"] += spent
+        totals["reference_objects"] += built
+        spent, built, kernel = frame_cost(kernel_force, walking, world.wall_segments)
+        totals["kernel_s"] += spent
+        totals["kernel_objects"] += built
+        worst = max([worst] + [abs(a - b) for r, k in zip(reference, kernel) for a, b in zip(r, k)])
+    frames = max(frames, 1)
+    return {
+        "servos": num_servos,
+        "reference_ms": totals["reference_s"] / frames * 1000.0,
+        "kernel_ms": totals["kernel_s"] / frames * 1000.0,
+        "reference_objects": totals["reference_objects"] / frames,
+        "kernel_objects": totals["kernel_objects"] / frames,
+        "max_diff": worst,
+    }
+
+
+def main(counts=None):
+    counts = counts or SERVO_COUNTS
+    print(f"{'servos':>6} {'object':>12} {'batch':>12} {'speedup':>8}  max |Δ| force")
+    for n in counts:
+        r = bench(n)
+        print(f"{r['servos']:>6} {r['object_ms']:>9.3f} ms {r['batch_ms']:>9.3f} ms "
+              f"{r['object_ms'] / r['batch_ms']:>7.2f}×  {r['max_diff']:.3g}")
+
+    print()
+    print("wall + obstacle forces per frame, Vector2 reference vs float kernels")
+    print(f"{'servos':>6} {'reference':>12} {'kernels':>12} {'speedup':>8} "
+          f"{'ref objs':>9} {'kern objs':>9}  max |Δ|")
+    for n in counts:
+        r = bench_kernels(n)
+        print(f"{r['servos']:>6} {r['reference_ms']:>9.3f} ms {r['kernel_ms']:>9.3f} ms "
+              f"{r['reference_ms'] / r['kernel_ms']:>7.2f}× {r['reference_objects']:>9.1f} "
+              f"{r['kernel_objects']:>9.1f}  {r['max_diff']:.3g}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]])
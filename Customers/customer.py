@@ -1,17 +1,43 @@
-import pygame
+from Simulation.vector import Vector2
 from .customer_fsm import CustomerFSM, CustomerState
 from constants import UNHAPPY_TICKS, ANGRY_TICKS, LEAVE_TICKS
 from constants import SAT_DECREASE_UNHAPPY, SAT_ANGRY_VALUE, SAT_LEAVE_VALUE
+from Simulation import trace
+from Simulation.trace import DEBUG, INFO
+
+_trace = trace.channel("customer")
+
+
+def _indexed(name):
+    """Attribute that re-files the customer in the world's CustomerIndex when it changes."""
+    attr = "_" + name
+
+    def get(self):
+        return self.__dict__[attr]
+
+    def set(self, value):
+        self.__dict__[attr] = value
+        if self._index is not None:
+            self._index.refresh(self)
+    return property(get, set)
+
 
 class Customer:
     next_id = 1
+    _index = None   # the world's CustomerIndex while active (see Customers/customer_index.py)
+
+    # Flags the GOAP planner filters on
+    arrived = _indexed("arrived")
+    seat_assigned = _indexed("seat_assigned")
+    order_ready = _indexed("order_ready")
+    order_claimed = _indexed("order_claimed")
 
     def __init__(self, world, spawn_tick, group_size=1):
         """Initialize a new customer."""
         self.world = world
         self.spawn_tick = spawn_tick
-        self.position = pygame.math.Vector2(100, 480)  # Start in queue
-        self.fsm = CustomerFSM()
+        self.position = Vector2(100, 480)  # Start in queue
+        self.fsm = CustomerFSM(self)
         self.satisfaction = 50  # Start at 50% satisfaction
         self.wait_time = 0
         self.arrived = False
@@ -48,7 +74,7 @@ class Customer:
 
         # 3) Update position if seated at a table
         if self.target_table and not self.arrived:
-            target_pos = pygame.math.Vector2(self.target_table.center)
+            target_pos = Vector2(self.target_table.center)
             diff = target_pos - self.position
             if diff.length() > 1:
                 # Move 20% of the remaining distance each tick
@@ -61,21 +87,26 @@ class Customer:
         if self.fsm.current == CustomerState.ORDERED:
             if not self.order_timer_started:
                 self.order_timer_started = True
-                print(f"[Customer#{self.spawn_tick}] SEATED→ORDERED  (starting order timer)")
+                if _trace.info:
+                    _trace.log(INFO, f"[Customer#{self.spawn_tick}] SEATED→ORDERED  (starting order timer)")
             elif not self.order_ready:
                 self.dish_timer -= 1
-                print(f"[Customer#{self.spawn_tick}] Dish timer: {self.dish_timer}")
+                if _trace.debug:
+                    _trace.log(DEBUG, f"[Customer#{self.spawn_tick}] Dish timer: {self.dish_timer}")
                 if self.dish_timer <= 0:
                     self.order_ready = True
-                    print(f"Customer#{self.spawn_tick}: order_ready = True")
+                    if _trace.info:
+                        _trace.log(INFO, f"Customer#{self.spawn_tick}: order_ready = True")
 
         # 5) If EATING, update eating time
         if self.fsm.current == CustomerState.EATING:
             self.eating_time += 1
-            print(f"[Customer#{self.spawn_tick}] Eating tick {self.eating_time}/{self.eating_duration}")
+            if _trace.debug:
+                _trace.log(DEBUG, f"[Customer#{self.spawn_tick}] Eating tick {self.eating_time}/{self.eating_duration}")
 
-        # 6) Print debug info
-        print(f"[Customer#{self.spawn_tick}] POS CHECK: pos={tuple(self.position)} | FSM={self.fsm.current} | arrived={self.arrived} | seat_assigned={self.seat_assigned} | wait={self.wait_time} | sat={self.satisfaction}")
+        # 6) Trace debug info
+        if _trace.debug:
+            _trace.log(DEBUG, f"[Customer#{self.spawn_tick}] POS CHECK: pos={tuple(self.position)} | FSM={self.fsm.current} | arrived={self.arrived} | seat_assigned={self.seat_assigned} | wait={self.wait_time} | sat={self.satisfaction}")
 
         # 7) Calculate profit exactly once when customer is done
         if not self.profit_calculated and (self.marked_for_removal or self.fsm.current == CustomerState.LEAVING):
@@ -89,9 +120,12 @@ class Customer:
                 self.world.profit -= 30  # Penalty for unhappy customer
             
             self.profit_calculated = True
-            print(f"[Customer#{self.spawn_tick}] Profit calculated: finished_eating={self.finished_eating}, satisfaction={self.satisfaction}")
+            if _trace.info:
+                _trace.log(INFO, f"[Customer#{self.spawn_tick}] Profit calculated: finished_eating={self.finished_eating}, satisfaction={self.satisfaction}")
 
     def draw(self, screen):
+        import pygame  # only the renderer needs pygame
+
         # Only draw once spawn_tick has passed
         if self.world.tick_count < self.spawn_tick:
             return
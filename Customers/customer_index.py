@@ -0,0 +1,206 @@
+"""
+Live, state-bucketed indexes over a world's customers and tables.
+
+The GOAP planner used to rebuild "who has a dish waiting", "who is queueing"
+and "which tables are free" by scanning every customer and table for every
+idle servo on every tick. CustomerIndex keeps those sets current instead:
+Customer, CustomerFSM and Table call refresh()/table_changed() from their
+property setters whenever a field the planner filters on changes, so the
+planner's picks are heap peeks.
+
+Ordering is exactly what the old `sort(key=wait_time, reverse=True)[0]` gave:
+longest wait first, ties to the earliest customer in world.customers (lowest
+id). That works as a static heap key because
+
+  * a queueing customer has never arrived, and every un-arrived customer's
+    wait_time goes up by the same amount each tick, so queue order is fixed
+    from the moment they join (keyed on wait_time - tick_count at spawn);
+  * a ready customer who has arrived at their table never waits again, so
+    their wait_time is final. The rare dish that is ready before its customer
+    has sat down is kept in a small side set and compared by its live
+    wait_time.
+
+Free tables are a list of world.tables positions kept in order as tables
+free up and fill, so listing them never sorts.
+"""
+import heapq
+from bisect import bisect_left
+
+from constants import CustomerState
+
+QUEUEING_STATES = (CustomerState.WAITING, CustomerState.UNHAPPY, CustomerState.ANGRY)
+
+
+class _LazyHeap:
+    """Min-heap of (key, id, item) with O(1) removal by id (stale entries are skipped on peek)."""
+    __slots__ = ("heap", "live")
+
+    def __init__(self):
+        self.heap = []
+        self.live = {}    # id -> the entry currently valid for it
+
+    def push(self, key, item_id, item):
+        entry = (key, item_id, item)
+        self.live[item_id] = entry
+        heapq.heappush(self.heap, entry)
+
+    def discard(self, item_id):
+        self.live.pop(item_id, None)
+
+    def peek(self):
+        heap, live = self.heap, self.live
+        while heap:
+            entry = heap[0]
+            if live.get(entry[1]) is entry:
+                return entry
+            heapq.heappop(heap)
+        return None
+
+    def smallest(self, k=None):
+        """Items of the `k` smallest live entries (all of them if k is None), smallest first."""
+        entries = self.live.values()
+        entries = sorted(entries) if k is None else heapq.nsmallest(k, entries)
+        return [entry[2] for entry in entries]
+
+    def __contains__(self, item_id):
+        return item_id in self.live
+
+    def __len__(self):
+        return len(self.live)
+
+
+class CustomerIndex:
+    """Customers by FSM state, the seating queue, ready dishes and free tables of one world."""
+
+    def __init__(self, world):
+        self.world = world
+        self.by_state = {state: {} for state in CustomerState}   # state -> {id: customer}
+        self._state_of = {}                                      # id -> state it is bucketed under
+        self._queue = _LazyHeap()          # queueing, no seat assigned
+        self._ready = _LazyHeap()          # dish ready and unclaimed, customer at the table
+        self._ready_walking = {}           # dish ready and unclaimed, customer still walking
+        self._free_slots = []              # world.tables positions of the free tables, ascending
+        self._table_at = {}                # position in world.tables -> table
+        self._table_slot = {}              # id(table) -> position in world.tables
+        # Bumped whenever work appears: someone starts queueing, a dish becomes
+        # ready or a table comes free ("event" replanning watches it)
+        self.version = 0
+
+    # ─── MAINTENANCE ─────────────────────────────────────────────────────
+    def add_table(self, table, n):
+        self._table_slot[id(table)] = n
+        self._table_at[n] = table
+        table._index = self
+        self.table_changed(table)
+
+    def table_changed(self, table):
+        n = self._table_slot[id(table)]
+        free = self._free_slots
+        i = bisect_left(free, n)
+        listed = i < len(free) and free[i] == n
+        if table.occupied:
+            if listed:
+                del free[i]
+        elif not listed:
+            free.insert(i, n)
+            self.version += 1
+
+    def add(self, cust):
+        """Start tracking an active customer (call once it is in world.customers)."""
+        cust._index = self
+        self.refresh(cust)
+
+    def remove(self, cust):
+        """Stop tracking a customer leaving world.customers."""
+        key = cust.id
+        state = self._state_of.pop(key, None)
+        if state is not None:
+            del self.by_state[state][key]
+        self._queue.discard(key)
+        self._ready.discard(key)
+        self._ready_walking.pop(key, None)
+        cust._index = None
+
+    def refresh(self, cust):
+        """Re-file `cust` after a state, flag or arrival change."""
+        key = cust.id
+        state = cust.fsm.current
+        old = self._state_of.get(key)
+        if old is not state:
+            if old is not None:
+                del self.by_state[old][key]
+            self.by_state[state][key] = cust
+            self._state_of[key] = state
+
+        if state in QUEUEING_STATES and not cust.seat_assigned:
+            if key not in self._queue:
+                # Longest wait first: negate, ties by id
+                self._queue.push(self.world.tick_count - cust.wait_time, key, cust)
+                self.version += 1
+        else:
+            self._queue.discard(key)
+
+        if state is CustomerState.ORDERED and cust.order_ready and not cust.order_claimed:
+            if cust.arrived:
+                self._ready_walking.pop(key, None)
+                if key not in self._ready:
+                    self._ready.push(-cust.wait_time, key, cust)
+                    self.version += 1
+            else:
+                self._ready.discard(key)
+                if key not in self._ready_walking:
+                    self._ready_walking[key] = cust
+                    self.version += 1
+        else:
+            self._ready.discard(key)
+            self._ready_walking.pop(key, None)
+
+    # ─── QUERIES ─────────────────────────────────────────────────────────
+    def best_ready(self):
+        """Unclaimed ready dish whose customer has waited longest, or None."""
+        best = self._ready.peek()
+        for key, cust in self._ready_walking.items():
+            if best is None or (-cust.wait_time, key) < best[:2]:
+                best = (-cust.wait_time, key, cust)
+        return None if best is None else best[2]
+
+    def best_queueing(self):
+        """Customer without a seat who has waited longest, or None."""
+        top = self._queue.peek()
+        return None if top is None else top[2]
+
+    def first_free_table(self):
+        """Free table earliest in world.tables, or None."""
+        free = self._free_slots
+        return self._table_at[free[0]] if free else None
+
+    def has_ready(self):
+        return bool(self._ready) or bool(self._ready_walking)
+
+    def has_queueing(self):
+        return bool(self._queue)
+
+    def num_queueing(self):
+        return len(self._queue)
+
+    def has_free_table(self):
+        return bool(self._free_slots)
+
+    def queueing(self, limit=None):
+        """Customers without a seat, longest wait first; only the first `limit` if given."""
+        return self._queue.smallest(limit)
+
+    def ready(self):
+        """Unclaimed ready dishes' customers, longest wait first (best_ready() order)."""
+        entries = sorted(list(self._ready.live.values())
+                         + [(-cust.wait_time, key, cust) for key, cust in self._ready_walking.items()])
+        return [entry[2] for entry in entries]
+
+    def free_tables(self):
+        """Free tables in world.tables order."""
+        table_at = self._table_at
+        return [table_at[n] for n in self._free_slots]
+
+    def in_state(self, state):
+        """Active customers currently in `state` (unordered)."""
+        return self.by_state[state].values()
@@ -0,0 +1,121 @@
+import pygame
+
+from Customers.customer_fsm import CustomerState
+from Simulation.vector import Vector2
+from Simulation import trace
+from Simulation.trace import DEBUG
+from constants import SERVO_COLORS
+
+_trace = trace.channel("render")
+
+class Renderer:
+    """
+    Everything pygame lives here: the window, fonts, frame clock and event pump.
+    World only imports this module when render=True, so headless runs never
+    load pygame or SDL.
+    """
+    def __init__(self, world):
+        self.world = world
+
+        pygame.init()
+        pygame.font.init()
+
+        self.screen = pygame.display.set_mode((world.width, world.height))
+        pygame.display.set_caption("DinnerAutoDashhhh (D-Stage)")
+
+        # Initialize fonts
+        self.font_status = pygame.font.SysFont(None, 24)
+        self.font_kitchen = pygame.font.SysFont(None, 32)
+        self.font_window = pygame.font.SysFont(None, 24)
+        self.font_legend = pygame.font.SysFont(None, 16)
+        self.font_sat = pygame.font.SysFont(None, 18)
+
+        # ─── PYGAME CLOCK ─────────────────────────────────────────────────────
+        self.clock = pygame.time.Clock()
+
+    def tick(self, fps):
+        """Wait for the next frame; returns real seconds since the last one."""
+        return self.clock.tick(fps) / 1000.0
+
+    def quit_requested(self):
+        """Pump pygame events; True once the window has been closed."""
+        quit_seen = False
+        for ev in pygame.event.get():
+            if ev.type == pygame.QUIT:
+                quit_seen = True
+        return quit_seen
+
+    def close(self):
+        pygame.quit()
+
+    def draw(self, alpha=1.0):
+        """Draw all game objects to the screen; servos `alpha` of the way from their last tick to this one."""
+        world = self.world
+        screen = self.screen
+        WIDTH, HEIGHT = world.width, world.height
+
+        if _trace.debug:
+            _trace.log(DEBUG, f"[World] Tick {world.tick_count:03d}: drawAll()")
+
+        # 1) Fill background
+        screen.fill((249, 247, 237))
+
+        # 2) Draw status bar (dark gray)
+        pygame.draw.rect(screen, (64, 64, 64), pygame.Rect(0, 0, WIDTH, 40))
+        tick_text = self.font_status.render(f"Tick: {world.tick_count}/{world.max_ticks}", True, (255, 255, 255))
+        screen.blit(tick_text, (20, 10))
+
+        profit_text = self.font_status.render(f"Profit: ${int(world.profit)}", True, (255,255,255))
+        screen.blit(profit_text, (200, 10))
+
+
+        # 3) Draw KITCHEN bar (pale pink)
+        pygame.draw.rect(screen, (255, 246, 250), pygame.Rect(0, 40, WIDTH, 40))
+        kitchen_text = self.font_kitchen.render("KITCHEN", True, (0, 0, 0))
+        screen.blit(kitchen_text, (WIDTH // 2 - kitchen_text.get_width() // 2, 60 - 16))
+
+        # 4) Draw FOOD WINDOW (off-white)
+        pygame.draw.rect(screen, (250, 240, 240), pygame.Rect(200, 80, WIDTH-200, 40))
+        food_text = self.font_window.render("FOOD WINDOW", True, (0, 0, 0))
+        screen.blit(food_text, (WIDTH // 2 - food_text.get_width() // 2, 100 - 12))
+
+        # 5) Draw left queue panel (light yellow)
+        pygame.draw.rect(screen, (255, 247, 231), pygame.Rect(0, 120, 200, HEIGHT-120))
+        pygame.draw.rect(screen, (64, 64, 64), pygame.Rect(0, 120, 200, HEIGHT-120), 2)
+
+        # Draw legend text at top of queue panel
+        legend_lines = [
+            "1 tick = 1 min",
+            "Wait time:",
+            "  10 mins: UNHAPPY (yellow)",
+            "  20 mins: ANGRY (orange)",
+            "  30 mins: LEAVING (red)",
+
+        ]
+        for i, line in enumerate(legend_lines):
+            legend = self.font_legend.render(line, True, (0, 0, 0))
+            screen.blit(legend, (10, 42 + i*15))
+
+        #  6) Now draw each table on top of that overlay
+        for table in world.tables:
+            table.draw(screen)
+
+        # 7) Draw ALL customers (both waiting and seated)
+        waiting_count = 0
+        for cust in world.customers:
+            if cust.fsm.current in (CustomerState.WAITING,
+                                    CustomerState.UNHAPPY,
+                                    CustomerState.ANGRY):
+                # Position in queue
+                queue_x, queue_y = world.layout.queue_origin
+                queue_y += waiting_count * world.layout.queue_spacing
+                cust.position = Vector2(queue_x, queue_y)
+                waiting_count += 1
+            cust.draw(screen)
+
+        # 8) Draw ALL servos LAST so they remain on top
+        for idx, servo in enumerate(world.servos):
+            servo.color = SERVO_COLORS[idx % len(SERVO_COLORS)]
+            servo.draw(screen, alpha)
+
+        pygame.display.flip()
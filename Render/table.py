@@ -1,25 +1,40 @@
-import pygame
+from Simulation.vector import Vector2
 
 from constants import TILE_SIZE
 
 class Table:
-    def __init__(self, center, capacity=1):
+    _index = None   # the world's CustomerIndex, which keeps the free-table list
+
+    def __init__(self, center, capacity=1, size=TILE_SIZE):
         """
-        center: pygame.math.Vector2 for the table's center position
+        center: Vector2 for the table's center position
         capacity: number of customers that can sit at this table
+        size: side length in pixels (one grid cell)
         """
-        self.center = pygame.math.Vector2(center)
+        self.center = Vector2(center)
         self.capacity = capacity
         self.occupied = False
         
-        # Fixed table size
-        self.width, self.height = TILE_SIZE, TILE_SIZE
-        self.radius = TILE_SIZE / 2.0 # For obstacle avoidance
+        # One grid cell
+        self.width, self.height = size, size
+        self.radius = size / 2.0 # For obstacle avoidance
         
         # Calculate top-left corner from center
-        self.top_left = self.center - pygame.math.Vector2(self.width/2, self.height/2)
+        self.top_left = self.center - Vector2(self.width/2, self.height/2)
+
+    @property
+    def occupied(self):
+        return self._occupied
+
+    @occupied.setter
+    def occupied(self, value):
+        self._occupied = value
+        if self._index is not None:
+            self._index.table_changed(self)
 
     def draw(self, screen):
+        import pygame  # only the renderer needs pygame
+
         # Create rectangle from top-left corner
         rect = pygame.Rect(self.top_left.x, self.top_left.y, self.width, self.height)
         
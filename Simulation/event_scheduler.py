@@ -0,0 +1,296 @@
+import heapq
+import itertools
+from enum import Enum
+
+from constants import ANGRY_TICKS, LEAVE_TICKS, SERVO_WAGE, UNHAPPY_TICKS, CustomerState
+from Simulation import trace
+from Simulation.trace import WARNING
+
+_trace = trace.channel("scheduler")
+
+
+class EventKind(Enum):
+    SPAWN         = 1   # world.next_spawn_tick
+    UNHAPPY       = 2   # wait_time reaches UNHAPPY_TICKS
+    ANGRY         = 3   # wait_time reaches ANGRY_TICKS
+    LEAVING       = 4   # wait_time reaches LEAVE_TICKS
+    ORDER_READY   = 5   # dish_timer reaches 0
+    MEAL_FINISHED = 6   # eating_time reaches eating_duration
+    SERVO_ARRIVAL = 7   # earliest tick a walking servo could reach the end of its path
+    CUSTOMER_MOVE = 8   # customer walking to their table / SEATED→ORDERED hop
+    PLAN          = 9   # an idle servo has work to pick up
+
+
+class EventScheduler:
+    """
+    Discrete-event driver for headless runs.
+
+    The tick engine (World._do_one_simulation_tick) walks every customer and
+    runs a planning pass on every tick, even though nothing interesting
+    happens until a threshold is crossed or a servo gets where it is going.
+    The scheduler keeps a priority queue of the next timestamped customer,
+    spawn and planner events and runs only those ticks through the normal
+    tick logic, so the KPIs come out exactly the same as the tick engine's.
+
+    The ticks in between are quiet: servos still walk (physics can't be
+    skipped), but customers are not visited at all. Their counters are owed
+    and settled in bulk before the next tick run in full, or before any tick
+    in which a servo might finish its action, since an action changes
+    customers. When that can happen comes from a SERVO_ARRIVAL lower bound:
+    the distance left to the servo's goal over how far it can move in a
+    tick. When the bound comes due it is checked again against where the
+    servo has got to, and a servo that did finish makes the next tick run in
+    full. Planner pass counters only count the ticks run in full.
+    """
+    def __init__(self, world):
+        self.world = world
+        self.queue = []      # heap of (tick, seq, EventKind, subject)
+        self.arrivals = []   # heap of (tick, seq, servo): SERVO_ARRIVAL lower bounds
+        self._seq = itertools.count()
+        self._owed = 0       # quiet ticks whose customer counters are not applied yet
+
+        # Counters for profiling how much work we skipped
+        self.ticks_simulated = 0
+        self.ticks_skipped = 0
+
+    def schedule(self, tick, kind, subject=None):
+        heapq.heappush(self.queue, (tick, next(self._seq), kind, subject))
+
+    # ─── EVENT DISCOVERY ──────────────────────────────────────────────────
+    def walking(self):
+        """Servos following a path this tick."""
+        return [s for s in self.world.servos if s.executing and s.current_action is not None]
+
+    def arrival_tick(self, servo, now):
+        """
+        Lower bound on the tick at which `servo`, as it stands after tick
+        `now`, reaches the last waypoint: it has to come within
+        waypoint_threshold of the waypoint it is heading for and of the last
+        one, moving at most max_speed. Lazily refined paths (hpa) only have
+        the waypoint it is heading for read, so no leg is refined early.
+        """
+        world = self.world
+        waypoints, i = servo.waypoints, servo.waypoint_index
+        if i >= len(waypoints):
+            return now + 1
+        position = servo.position
+        dist = position.distance_to(waypoints[i])
+        if isinstance(waypoints, (list, tuple)):
+            dist = max(dist, position.distance_to(waypoints[-1]))
+        dist -= servo.waypoint_threshold
+        # A hair more than the servo can cover in a tick, so rounding never makes the bound late
+        per_tick = servo.max_speed * world.physics_dt * world.physics_substeps * (1.0 + 1e-9) + 1e-9
+        return now + max(1, int(dist / per_tick))
+
+    def _customer_event(self, cust, now):
+        """Return (tick, kind) of the next tick at which this customer changes, or None."""
+        state = cust.fsm.current
+
+        # Anything in motion (walking to a table, auto-transitions) needs the next tick
+        if (cust.target_table and not cust.arrived) or cust.marked_for_removal:
+            return now + 1, EventKind.CUSTOMER_MOVE
+        if state == CustomerState.SEATED:
+            return now + 1, EventKind.CUSTOMER_MOVE
+
+        # Queue thresholds: wait_time is bumped *before* the FSM checks it
+        if state in (CustomerState.WAITING, CustomerState.UNHAPPY, CustomerState.ANGRY):
+            if cust.seat_assigned:
+                return now + 1, EventKind.CUSTOMER_MOVE
+            if state == CustomerState.WAITING:
+                return now + max(1, UNHAPPY_TICKS - cust.wait_time), EventKind.UNHAPPY
+            if state == CustomerState.UNHAPPY:
+                return now + max(1, ANGRY_TICKS - cust.wait_time), EventKind.ANGRY
+            return now + max(1, LEAVE_TICKS - cust.wait_time), EventKind.LEAVING
+
+        if state == CustomerState.ORDERED:
+            if not cust.order_timer_started:
+                return now + 1, EventKind.CUSTOMER_MOVE
+            if not cust.order_ready:
+                return now + max(1, cust.dish_timer), EventKind.ORDER_READY
+            # Dish is sitting in the window: only a servo can move things on
+            return None
+
+        if state == CustomerState.EATING:
+            return now + max(1, cust.eating_duration - cust.eating_time), EventKind.MEAL_FINISHED
+
+        return now + 1, EventKind.CUSTOMER_MOVE
+
+    def refresh(self):
+        """
+        Rebuild the event queue from the current world state (counters
+        settled). The scan stops at the first event due on the very next
+        tick: that tick runs in full whatever else is due.
+        """
+        world = self.world
+        now = world.tick_count
+        self.queue.clear()
+
+        if world.goap.has_pending_work():
+            self.schedule(now + 1, EventKind.PLAN)
+            return
+
+        if world.next_spawn_tick is not None and now < world.next_spawn_tick <= world.max_ticks:
+            self.schedule(world.next_spawn_tick, EventKind.SPAWN)
+
+        for cust in world.customers:
+            event = self._customer_event(cust, now)
+            if event is not None:
+                self.schedule(event[0], event[1], cust)
+                if event[0] == now + 1:
+                    return
+
+    def peek(self):
+        """Return the tick of the next customer, spawn or planner event, or None if there is none."""
+        return self.queue[0][0] if self.queue else None
+
+    # ─── TIME ADVANCE ────────────────────────────────────────────────────
+    def settle(self):
+        """Apply the customer counters owed for the quiet ticks so far."""
+        owed = self._owed
+        if not owed:
+            return
+        for cust in self.world.customers:
+            if not cust.arrived:
+                cust.wait_time += owed
+            if cust.fsm.current == CustomerState.ORDERED and not cust.order_ready:
+                cust.dish_timer -= owed
+            elif cust.fsm.current == CustomerState.EATING:
+                cust.eating_time += owed
+        self._owed = 0
+
+    def _arrival_due(self, tick):
+        """
+        Whether a walking servo might finish its action during `tick`, whose
+        physics has not run yet. Bounds that came due are checked again
+        against where the servo has got to.
+        """
+        arrivals = self.arrivals
+        due = False
+        while arrivals and arrivals[0][0] <= tick:
+            _, _, servo = heapq.heappop(arrivals)
+            if not (servo.executing and servo.current_action is not None):
+                continue
+            bound = self.arrival_tick(servo, tick - 1)
+            if bound <= tick:
+                due = True
+                bound = tick + 1       # not there yet after this tick? look again next tick
+            heapq.heappush(arrivals, (bound, next(self._seq), servo))
+        return due
+
+    def fast_forward(self, until_tick=None):
+        """
+        Run quiet ticks (no customer, spawn or planner event due) up to and
+        including `until_tick`, or until a servo finishes an action when it is
+        None. Returns True if it stopped early because a servo finished one:
+        the next tick has to run in full.
+        """
+        world = self.world
+        if until_tick is not None and until_tick <= world.tick_count:
+            return False
+        wage = SERVO_WAGE / 60.0 * world.num_servos
+        walking = self.walking()
+
+        if not walking:
+            # Nobody can act: the customers' counters are owed in bulk and idle
+            # servos just coast under friction. Replay that physics step by
+            # physics step so the floating point trajectory is exactly what
+            # the tick engine produces.
+            num_ticks = until_tick - world.tick_count
+            if world.recorder is None:
+                world.tick_count += num_ticks
+                self._owed += num_ticks
+                for servo in world.servos:
+                    for _ in range(num_ticks * world.physics_substeps):
+                        if servo.velocity.length_squared() == 0:
+                            break
+                        servo.move(world.physics_dt)
+                # Same repeated subtraction as the tick engine (not a multiply) so the
+                # profit figure is bit-identical.
+                for _ in range(num_ticks):
+                    world.profit -= wage
+                self.ticks_skipped += num_ticks
+                return False
+
+        now = world.tick_count
+        self.arrivals = [(self.arrival_tick(servo, now), next(self._seq), servo) for servo in walking]
+        heapq.heapify(self.arrivals)
+        servos = world.servos
+        while until_tick is None or world.tick_count < until_tick:
+            world.tick_count += 1
+            self._owed += 1
+            world.maintain_paths()
+            # Customers are up to date before any servo can act on one, and for every replay frame
+            if world.recorder is not None or self._arrival_due(world.tick_count):
+                self.settle()
+            actions = [s.current_action for s in servos]
+            world.step_physics()
+            world.profit -= wage
+            if world.recorder is not None:
+                world.recorder.record(world)
+            self.ticks_skipped += 1
+            if any(s.current_action is not a for s, a in zip(servos, actions)):
+                return True
+        return False
+
+    def step(self):
+        """
+        Jump to the next event and run that tick in full.
+        Returns the list of (kind, subject) events found due at that tick (see
+        refresh()), or None if there is nothing left to happen.
+        """
+        self.settle()
+        self.refresh()
+        due_tick = self.peek()
+        if due_tick is None and not self.walking():
+            return None
+        self.fast_forward(None if due_tick is None else due_tick - 1)
+        return self._fire()
+
+    def _fire(self):
+        """Run the next tick in full, popping whatever events were due at it."""
+        self.settle()
+        due_tick = self.world.tick_count + 1
+        fired = []
+        while self.queue and self.queue[0][0] <= due_tick:
+            _, _, kind, subject = heapq.heappop(self.queue)
+            fired.append((kind, subject))
+
+        self.world._do_one_simulation_tick()
+        self.ticks_simulated += 1
+        return fired
+
+    def run(self, min_ticks=None):
+        """
+        Headless equivalent of the batch loop
+            while tick < min_ticks or world.customers: world._do_one_simulation_tick()
+        Returns the final tick count.
+        """
+        world = self.world
+        if min_ticks is None:
+            min_ticks = world.max_ticks
+
+        while world.tick_count < min_ticks or world.customers:
+            self.settle()
+            self.refresh()
+            due_tick = self.peek()
+
+            # Empty dining room: the tick engine would just pay wages (and finish
+            # any walk still under way) until min_ticks
+            if not world.customers and (due_tick is None or due_tick > min_ticks):
+                if self.fast_forward(min_ticks):
+                    self._fire()
+                continue
+
+            # Nothing can ever change again (e.g. a dish that no servo will claim).
+            # The tick engine would spin forever here, so stop instead.
+            if due_tick is None and not self.walking():
+                if _trace.warning:
+                    _trace.log(WARNING, f"[Scheduler] No pending events at tick {world.tick_count} "
+                                        f"with {len(world.customers)} customers left; stopping")
+                break
+
+            self.fast_forward(None if due_tick is None else due_tick - 1)
+            self._fire()
+
+        self.settle()
+        return world.tick_count
@@ -0,0 +1,143 @@
+"""
+Data-driven floor plans.
+
+A layout file (JSON, see Layouts/) describes the dining room on the nav grid:
+
+    {
+      "name": "default",
+      "width": 800, "height": 600,        pixel size; or "grid": [cols, rows]
+      "cell_size": 80,                    pixels per grid cell
+      "border": true,                     block the outer ring of cells
+      "blocked": [{"x": .., "y": .., "w": .., "h": ..}, ...],   interior walls
+      "open":    [{"name": "kitchen", "x": 1, "y": 0, "w": 8, "h": 2}, ...],
+      "tables":  [[gx, gy], ...],
+      "table_blocks": [{"origin": [3, 3], "cols": 3, "rows": 2, "spacing": [2, 2]}],
+      "food_windows": [[6, 1], ...],
+      "servo_start": [9, 6],
+      "queue": {"origin": [100, 180], "spacing": 60}    pixels
+    }
+
+The nav grid is built in that order: everything walkable, then the border,
+the blocked rects, the open rects (which win over walls), and finally each
+table blocks its own cell and frees its eight neighbours so servos can reach
+it. table_blocks generate rows × cols tables row by row, which keeps large
+venues with hundreds of tables to a couple of lines.
+"""
+import json
+import os
+
+from constants import LAYOUT
+from Simulation.nav_grid import NavGrid
+
+LAYOUT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Layouts")
+
+
+class FloorPlan:
+    """A parsed layout. Immutable once loaded; shared by worlds and snapshots."""
+    def __init__(self, spec, source=None):
+        self.source = source
+        self.name = spec.get("name", os.path.splitext(os.path.basename(source))[0] if source else "layout")
+        self.cell_size = int(spec.get("cell_size", 80))
+
+        if "grid" in spec:
+            self.grid_width, self.grid_height = (int(n) for n in spec["grid"])
+            self.width = int(spec.get("width", self.grid_width * self.cell_size))
+            self.height = int(spec.get("height", self.grid_height * self.cell_size))
+        else:
+            self.width = int(spec["width"])
+            self.height = int(spec["height"])
+            self.grid_width = self.width // self.cell_size
+            self.grid_height = self.height // self.cell_size
+
+        self.border = bool(spec.get("border", True))
+        self.blocked = [_rect(r) for r in spec.get("blocked", [])]
+        self.open = [_rect(r) for r in spec.get("open", [])]
+
+        tables = [tuple(t) for t in spec.get("tables", [])]
+        for block in spec.get("table_blocks", []):
+            ox, oy = block["origin"]
+            sx, sy = block.get("spacing", (2, 2))
+            for row in range(block["rows"]):
+                for col in range(block["cols"]):
+                    tables.append((ox + col * sx, oy + row * sy))
+        self.tables = tables
+
+        self.food_windows = [tuple(cell) for cell in spec.get("food_windows", [])]
+        if not self.food_windows:
+            raise ValueError(f"Layout {self.name!r} has no food windows")
+        self.servo_start = tuple(spec.get("servo_start", (self.grid_width - 1, self.grid_height - 1)))
+
+        queue = spec.get("queue", {})
+        self.queue_origin = tuple(queue.get("origin", (100, 180)))
+        self.queue_spacing = queue.get("spacing", 60)
+
+        for label, cells in (("table", self.tables), ("food window", self.food_windows),
+                             ("servo start", [self.servo_start])):
+            for gx, gy in cells:
+                if not (0 <= gx < self.grid_width and 0 <= gy < self.grid_height):
+                    raise ValueError(f"Layout {self.name!r}: {label} {(gx, gy)} is outside the "
+                                     f"{self.grid_width}×{self.grid_height} grid")
+
+    def build_nav_grid(self, grid=None):
+        """Fill `grid` (or a new NavGrid) from this plan and return it."""
+        w, h = self.grid_width, self.grid_height
+        if grid is None:
+            grid = NavGrid(w, h)
+        grid.fill(0)
+        cells = grid.cells
+
+        if self.border:
+            for x in range(w):
+                cells[x * h] = 1
+                cells[x * h + h - 1] = 1
+            cells[0:h] = b"\x01" * h
+            cells[(w - 1) * h:w * h] = b"\x01" * h
+
+        for rects, value in ((self.blocked, 1), (self.open, 0)):
+            for x0, y0, rw, rh in rects:
+                for x in range(max(0, x0), min(w, x0 + rw)):
+                    lo, hi = x * h + max(0, y0), x * h + min(h, y0 + rh)
+                    if hi > lo:
+                        cells[lo:hi] = bytes([value]) * (hi - lo)
+
+        for gx, gy in self.tables:
+            cells[gx * h + gy] = 1
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    nx, ny = gx + dx, gy + dy
+                    if (dx or dy) and 0 <= nx < w and 0 <= ny < h:
+                        cells[nx * h + ny] = 0
+
+        grid.version += 1
+        return grid
+
+    def __repr__(self):
+        return (f"FloorPlan({self.name!r}, {self.grid_width}×{self.grid_height}, "
+                f"tables={len(self.tables)}, food_windows={len(self.food_windows)})")
+
+
+def _rect(r):
+    return (int(r["x"]), int(r["y"]), int(r.get("w", 1)), int(r.get("h", 1)))
+
+
+def load_layout(layout=None):
+    """
+    layout: None (LAYOUT from constants), a FloorPlan, a dict spec, a path to a
+            JSON file, or the name of a file in Layouts/ (without ".json").
+    """
+    if layout is None:
+        layout = LAYOUT
+    if isinstance(layout, FloorPlan):
+        return layout
+    if isinstance(layout, dict):
+        return FloorPlan(layout)
+
+    path = layout
+    if not os.path.exists(path):
+        path = os.path.join(LAYOUT_DIR, layout if layout.endswith(".json") else layout + ".json")
+    try:
+        with open(path) as f:
+            spec = json.load(f)
+    except FileNotFoundError:
+        raise ValueError(f"Unknown layout {layout!r}: no such file and nothing called that in {LAYOUT_DIR}") from None
+    return FloorPlan(spec, source=path)
@@ -0,0 +1,73 @@
+class NavGrid:
+    """
+    Walkability grid stored as one contiguous bytearray (0 = walkable,
+    1 = blocked), cell (x, y) at index x * height + y.
+
+    Reads keep the old list-of-lists shape: nav_grid[x] is a read-only
+    memoryview of column x, so nav_grid[x][y] still works everywhere. Writes
+    go through set()/fill(), which bump `version` whenever a cell actually
+    changes, so caches built on the grid (paths, distance fields) can tell
+    when they are stale.
+    """
+    __slots__ = ("width", "height", "cells", "version", "_columns")
+
+    def __init__(self, width, height, cells=None):
+        self.width = width
+        self.height = height
+        if cells is None:
+            self.cells = bytearray(width * height)
+        else:
+            if len(cells) != width * height:
+                raise ValueError(f"NavGrid {width}×{height} needs {width * height} cells, got {len(cells)}")
+            self.cells = bytearray(cells)
+        self.version = 0
+        view = memoryview(self.cells).toreadonly()
+        self._columns = [view[x * height:(x + 1) * height] for x in range(width)]
+
+    # ─── READS ────────────────────────────────────────────────────────────
+    def __getitem__(self, x):
+        return self._columns[x]
+
+    def __len__(self):
+        return self.width
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_walkable(self, x, y):
+        return self.cells[x * self.height + y] == 0
+
+    def index(self, x, y):
+        return x * self.height + y
+
+    # ─── WRITES ───────────────────────────────────────────────────────────
+    def set(self, x, y, value):
+        i = x * self.height + y
+        if self.cells[i] != value:
+            self.cells[i] = value
+            self.version += 1
+
+    def fill(self, value):
+        self.cells[:] = bytes([value]) * len(self.cells)
+        self.version += 1
+
+    def copy(self):
+        grid = NavGrid(self.width, self.height, self.cells)
+        grid.version = self.version
+        return grid
+
+    def __reduce__(self):
+        # memoryviews can't be pickled; rebuild the column views on load
+        return (_restore, (self.width, self.height, bytes(self.cells), self.version))
+
+    def __repr__(self):
+        return f"NavGrid({self.width}×{self.height}, blocked={self.cells.count(1)}, version={self.version})"
+
+
+def _restore(width, height, cells, version):
+    grid = NavGrid(width, height, cells)
+    grid.version = version
+    return grid
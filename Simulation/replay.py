@@ -0,0 +1,307 @@
+"""
+Compact binary replays of headless runs.
+
+ReplayRecorder captures one frame per simulated tick: servo positions,
+velocities and headings, every active customer's state, satisfaction and
+position, table occupancy and profit. Frames go into flat, fixed-width NumPy
+record arrays, so a file is a short JSON header followed by raw arrays:
+
+    magic "DINRPLY1" | uint64 header length | JSON header | padding
+    frames     (tick, profit, customer slice, servo slice) per frame
+    customers  flat (id, spawn_tick, state, satisfaction, x, y) records
+    servos     flat (x, y, vx, vy, hx, hy) records
+    tables     (num_frames, num_tables) occupancy bytes
+
+Replay opens a file with np.memmap, so seeking to any tick of a very long
+run only touches the pages for that frame. ReplayView puts a frame behind the
+same attributes the Renderer reads from a World, so it can be drawn and played
+back at any speed without re-simulating:
+
+    world = World(seed=7, render=False)
+    world.recorder = ReplayRecorder(world)
+    ...run it...
+    world.recorder.save("insights/replays/seed7.rpl")
+
+    python -m Simulation.replay insights/replays/seed7.rpl 4   # play at 4× speed
+"""
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+from Agents.servo_agent import ServoAgent
+from Customers.customer import Customer
+from Customers.customer_fsm import CustomerFSM
+from Render.table import Table
+from Simulation.vector import _make
+from constants import CustomerState, SIM_SECONDS_PER_TICK
+
+MAGIC = b"DINRPLY1"
+VERSION = 1
+_ALIGN = 64
+
+FRAME_DTYPE = np.dtype([
+    ("tick", "<i4"),
+    ("profit", "<f8"),
+    ("customer_start", "<i8"),
+    ("customer_count", "<i4"),
+    ("servo_start", "<i8"),
+    ("servo_count", "<i4"),
+])
+CUSTOMER_DTYPE = np.dtype([
+    ("id", "<i4"),
+    ("spawn_tick", "<i4"),
+    ("state", "u1"),
+    ("satisfaction", "<i2"),
+    ("x", "<f4"),
+    ("y", "<f4"),
+])
+SERVO_DTYPE = np.dtype([
+    ("x", "<f4"), ("y", "<f4"),
+    ("vx", "<f4"), ("vy", "<f4"),
+    ("hx", "<f4"), ("hy", "<f4"),
+])
+
+
+def _aligned(n):
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+# ─── RECORDING ────────────────────────────────────────────────────────────
+class ReplayRecorder:
+    """
+    Attach to a world with `world.recorder = ReplayRecorder(world)`; the world
+    (and the event scheduler's fast-forward) then calls record() once per tick.
+    """
+    def __init__(self, world):
+        self.meta = {
+            "seed": world.seed,
+            "arrivals": repr(world.arrivals),
+            "width": world.width,
+            "height": world.height,
+            "cell_size": world.cell_size,
+            "max_ticks": world.max_ticks,
+            "layout": world.layout.name,
+            "queue": [list(world.layout.queue_origin), world.layout.queue_spacing],
+            "tables": [[t.center.x, t.center.y] for t in world.tables],
+        }
+        self._frames = []
+        self._customers = []
+        self._servos = []
+        self._tables = []
+
+    def record(self, world):
+        customers = self._customers
+        servos = self._servos
+        self._frames.append((world.tick_count, world.profit,
+                             len(customers), len(world.customers),
+                             len(servos), len(world.servos)))
+        for c in world.customers:
+            customers.append((c.id, c.spawn_tick, c.fsm.current.value, c.satisfaction,
+                              c.position.x, c.position.y))
+        for s in world.servos:
+            servos.append((s.position.x, s.position.y, s.velocity.x, s.velocity.y,
+                           s.heading.x, s.heading.y))
+        self._tables.append(bytes(t.occupied for t in world.tables))
+
+    def __len__(self):
+        return len(self._frames)
+
+    def arrays(self):
+        """The recording so far as (frames, customers, servos, tables) arrays."""
+        frames = np.array(self._frames, dtype=FRAME_DTYPE)
+        customers = np.array(self._customers, dtype=CUSTOMER_DTYPE)
+        servos = np.array(self._servos, dtype=SERVO_DTYPE)
+        num_tables = len(self.meta["tables"])
+        tables = np.frombuffer(b"".join(self._tables), dtype=np.uint8).reshape(len(self._tables), num_tables)
+        return frames, customers, servos, tables
+
+    def save(self, path):
+        frames, customers, servos, tables = self.arrays()
+        sections = {}
+        offset = 0
+        for name, array in (("frames", frames), ("customers", customers),
+                            ("servos", servos), ("tables", tables)):
+            sections[name] = {
+                "dtype": np.lib.format.dtype_to_descr(array.dtype),
+                "shape": list(array.shape),
+                "offset": offset,
+            }
+            offset = _aligned(offset + array.nbytes)
+        header = json.dumps({"version": VERSION, "meta": self.meta, "sections": sections}).encode()
+
+        data_start = _aligned(len(MAGIC) + 8 + len(header))
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(np.uint64(len(header)).tobytes())
+            f.write(header)
+            for name, array in (("frames", frames), ("customers", customers),
+                                ("servos", servos), ("tables", tables)):
+                f.seek(data_start + sections[name]["offset"])
+                f.write(np.ascontiguousarray(array).tobytes())
+            f.truncate(data_start + offset)
+        return path
+
+
+# ─── READING ──────────────────────────────────────────────────────────────
+class Replay:
+    """Memory-mapped view of a replay file."""
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a replay file")
+            header_len = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+            header = json.loads(f.read(header_len))
+        if header["version"] != VERSION:
+            raise ValueError(f"{path}: unsupported replay version {header['version']}")
+        self.meta = header["meta"]
+
+        data_start = _aligned(len(MAGIC) + 8 + header_len)
+        for name, spec in header["sections"].items():
+            dtype = np.lib.format.descr_to_dtype(spec["dtype"])
+            shape = tuple(spec["shape"])
+            if 0 in shape:
+                array = np.empty(shape, dtype=dtype)
+            else:
+                array = np.memmap(path, dtype=dtype, mode="r", offset=data_start + spec["offset"], shape=shape)
+            setattr(self, name, array)
+        self.ticks = self.frames["tick"]
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def first_tick(self):
+        return int(self.ticks[0])
+
+    @property
+    def last_tick(self):
+        return int(self.ticks[-1])
+
+    def frame_index(self, tick):
+        """Index of the last frame recorded at or before `tick` (clamped to the first frame)."""
+        return max(0, int(np.searchsorted(self.ticks, tick, side="right")) - 1)
+
+    def frame(self, i):
+        """(frame record, customers, servos, table occupancy) for frame index i."""
+        f = self.frames[i]
+        cs = int(f["customer_start"])
+        ss = int(f["servo_start"])
+        return (f,
+                self.customers[cs:cs + int(f["customer_count"])],
+                self.servos[ss:ss + int(f["servo_count"])],
+                self.tables[i])
+
+
+# ─── PLAYBACK ─────────────────────────────────────────────────────────────
+class ReplayView:
+    """
+    Stand-in for a World that the Renderer can draw: seek() loads a frame into
+    real Table/Customer/ServoAgent objects (built without their constructors),
+    drawAll() draws it and play() runs the pygame loop at any speed.
+    """
+    def __init__(self, replay, render=True):
+        if isinstance(replay, str):
+            replay = Replay(replay)
+        self.replay = replay
+        meta = replay.meta
+        self.width = meta["width"]
+        self.height = meta["height"]
+        self.max_ticks = meta["max_ticks"]
+        self.cell_size = meta["cell_size"]
+        (qx, qy), spacing = meta["queue"]
+        self.layout = SimpleNamespace(name=meta["layout"], queue_origin=(qx, qy), queue_spacing=spacing)
+        self.tables = [Table(center=center, size=self.cell_size) for center in meta["tables"]]
+        self.customers = []
+        self.servos = []
+        self._customer_cache = {}
+        self._servo_cache = []
+        self.tick_count = 0
+        self.profit = 0.0
+
+        self.render = render
+        self.renderer = None
+        if render:
+            from Render.renderer import Renderer
+            self.renderer = Renderer(self)
+
+        self.seek(replay.first_tick)
+
+    def seek(self, tick):
+        """Show the state as of `tick`."""
+        frame, customers, servos, occupied = self.replay.frame(self.replay.frame_index(tick))
+        self.tick_count = int(frame["tick"])
+        self.profit = float(frame["profit"])
+
+        for table, flag in zip(self.tables, occupied):
+            table.occupied = bool(flag)
+
+        self.customers = [self._customer(rec) for rec in customers.tolist()]
+
+        while len(self._servo_cache) < len(servos):
+            self._servo_cache.append(self._new_servo())
+        self.servos = self._servo_cache[:len(servos)]
+        for servo, (x, y, vx, vy, hx, hy) in zip(self.servos, servos.tolist()):
+            servo.position = _make(x, y)
+            servo.velocity = _make(vx, vy)
+            servo.heading = _make(hx, hy)
+
+    def _customer(self, rec):
+        cust_id, spawn_tick, state, satisfaction, x, y = rec
+        c = self._customer_cache.get(cust_id)
+        if c is None:
+            c = Customer.__new__(Customer)
+            c.world = self
+            c.id = cust_id
+            c.spawn_tick = spawn_tick
+            c.fsm = CustomerFSM.__new__(CustomerFSM)
+            self._customer_cache[cust_id] = c
+        c.fsm.current = CustomerState(state)
+        c.satisfaction = satisfaction
+        c.position = _make(x, y)
+        return c
+
+    def _new_servo(self):
+        s = ServoAgent.__new__(ServoAgent)
+        s.world = self
+        s.waypoints = []
+        s.color = (255, 255, 0)
+        return s
+
+    def drawAll(self):
+        if not self.render:
+            return
+        self.renderer.draw()
+
+    def play(self, speed=1.0, fps=30, start_tick=None):
+        """
+        Play back in real time × `speed` (1 tick = SIM_SECONDS_PER_TICK real
+        seconds at speed 1, like the live game) until the window is closed.
+        """
+        if self.renderer is None:
+            raise RuntimeError("ReplayView.play() needs render=True")
+        tick = float(self.replay.first_tick if start_tick is None else start_tick)
+        last = self.replay.last_tick
+        running = True
+        while running:
+            if self.renderer.quit_requested():
+                running = False
+            dt = self.renderer.tick(fps)
+            if tick < last:
+                tick = min(last, tick + dt * speed / SIM_SECONDS_PER_TICK)
+            self.seek(int(tick))
+            self.drawAll()
+        self.renderer.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python -m Simulation.replay <file.rpl> [speed]")
+        sys.exit(2)
+    ReplayView(sys.argv[1]).play(speed=float(sys.argv[2]) if len(sys.argv) > 2 else 1.0)
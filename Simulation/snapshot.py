@@ -0,0 +1,295 @@
+"""
+World snapshots for cheap what-if branching.
+
+take_snapshot() flattens a running World into plain tuples, dicts and
+numbers: no pygame surfaces, fonts, back-references or helper objects.
+Object references (a servo's current_action, what it is carrying, a
+customer's table, the seated customers in the obstacle index) are stored
+as indexes.
+restore_snapshot() rebuilds a World straight from that data without going
+through World.__init__, so a shared warm-up prefix can be simulated once and
+forked hundreds of times:
+
+    world = World(seed=3, render=False)
+    for _ in range(120):
+        world._do_one_simulation_tick()
+    snap = world.snapshot()
+
+    for n in range(200):
+        branch = snap.restore()          # independent World at tick 120
+        if n % 2:
+            branch.add_servo()           # "what if a 4th servo clocks in?"
+        ...
+
+A snapshot is immutable and never aliases the world it came from, so it can
+be restored any number of times, pickled, or shipped to worker processes
+(to_bytes()/from_bytes()).
+"""
+import pickle
+from types import SimpleNamespace
+
+import numpy as np
+
+from Actions.goap_servo import ServoGOAPPlanner
+from Actions.pathfinder import Pathfinder
+from Actions.steering import pack_walls
+from Agents.servo_agent import ServoAgent
+from Customers.customer import Customer
+from Customers.customer_fsm import CustomerFSM
+from Customers.customer_index import CustomerIndex
+from Render.table import Table
+from Simulation.nav_grid import NavGrid
+from Simulation.spatial_hash import ObstacleIndex, ObstacleView
+from Simulation.vector import _make
+from constants import OBSTACLE_HASH_CELL_SIZE
+
+# Customer attributes that are object references; everything else in a
+# customer's __dict__ is a plain number/bool and is copied as-is.
+_CUSTOMER_REFS = ("world", "fsm", "position", "target_table", "_index")
+
+# Servo attributes copied as-is (numbers, bools, colour tuple)
+_SERVO_PLAIN = ("color", "radius", "max_speed", "max_force",
+                "waypoint_index", "waypoint_threshold", "executing", "holds")
+
+# Obstacle / action target kinds
+_TABLE, _SERVO, _CUSTOMER, _FOOD_WINDOW = 0, 1, 2, 3
+
+
+class WorldSnapshot:
+    """Flat, immutable copy of a World's dynamic state. Build with take_snapshot()."""
+    __slots__ = ("world", "tables", "customers", "num_active", "servos", "rng_states", "nav_grid", "pathfinder")
+
+    def __init__(self, world, tables, customers, num_active, servos, rng_states, nav_grid, pathfinder):
+        self.world = world            # dict of scalar World attributes
+        self.tables = tables          # tuple of (center, capacity, occupied, id)
+        self.customers = customers    # tuple of (fsm_state, position, table_idx, plain_attrs)
+        self.num_active = num_active  # customers[:num_active] are world.customers, the rest completed
+        self.servos = servos          # tuple of (plain_attrs, vectors, waypoints, action, carrying, has_obstacles, next_actions)
+        self.rng_states = rng_states  # (arrival_rng, rng) bit generator states
+        self.nav_grid = nav_grid      # (nav grid cells as bytes, version)
+        self.pathfinder = pathfinder  # "dstar"/"whca" planning state, servos as indexes (Pathfinder.state)
+
+    @property
+    def tick(self):
+        return self.world["tick_count"]
+
+    def restore(self, render=False):
+        """Build a new, independent World from this snapshot."""
+        return restore_snapshot(self, render=render)
+
+    def to_bytes(self):
+        return pickle.dumps(tuple(getattr(self, name) for name in self.__slots__),
+                            protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(*pickle.loads(data))
+
+
+# ─── CAPTURE ──────────────────────────────────────────────────────────────
+def take_snapshot(world):
+    """Capture everything needed to continue `world` exactly where it is."""
+    table_index = {id(t): i for i, t in enumerate(world.tables)}
+    servo_index = {id(s): i for i, s in enumerate(world.servos)}
+    all_customers = world.customers + world.completed_customers
+    customer_index = {id(c): i for i, c in enumerate(all_customers)}
+
+    def ref(obj):
+        """Encode a table / servo / customer / food-window reference."""
+        key = id(obj)
+        if key in table_index:
+            return (_TABLE, table_index[key])
+        if key in customer_index:
+            return (_CUSTOMER, customer_index[key])
+        if key in servo_index:
+            return (_SERVO, servo_index[key])
+        for i, window in enumerate(world.food_windows):
+            if obj is window:
+                return (_FOOD_WINDOW, i)
+        raise ValueError(f"Cannot snapshot reference to {obj!r}: not part of this world")
+
+    tables = tuple(
+        ((t.center.x, t.center.y), t.capacity, t.occupied, t.id)
+        for t in world.tables
+    )
+
+    customers = []
+    for c in all_customers:
+        plain = {k: v for k, v in c.__dict__.items() if k not in _CUSTOMER_REFS}
+        table = table_index[id(c.target_table)] if c.target_table is not None else None
+        customers.append((c.fsm.current, (c.position.x, c.position.y), table, plain))
+
+    servos = []
+    for s in world.servos:
+        plain = tuple(getattr(s, name) for name in _SERVO_PLAIN)
+        vectors = tuple((v.x, v.y) for v in (s.position, s.velocity, s.heading, s.side))
+        waypoints = tuple((w.x, w.y) for w in s.waypoints)
+        action = None
+        if s.current_action is not None:
+            name, cust, target = s.current_action
+            action = (name, ref(cust), ref(target))
+        next_actions = tuple((name, ref(cust), ref(target)) for name, cust, target in s.next_actions)
+        carrying = ref(s.carrying) if s.carrying is not None else None
+        # Before its first tick a servo has no obstacle view yet
+        has_obstacles = isinstance(s.obstacles, ObstacleView)
+        servos.append((plain, vectors, waypoints, action, carrying, has_obstacles, next_actions))
+
+    scalars = {
+        "seed": world.seed,
+        "render": world.render,
+        "width": world.width,
+        "height": world.height,
+        "cell_size": world.cell_size,
+        "grid_width": world.grid_width,
+        "grid_height": world.grid_height,
+        "tick_count": world.tick_count,
+        "max_ticks": world.max_ticks,
+        "arrivals": world.arrivals,
+        "arrival_ticks": tuple(world.arrival_ticks),
+        "_next_arrival": world._next_arrival,
+        "next_spawn_tick": world.next_spawn_tick,
+        "_sim_time_acc": world._sim_time_acc,
+        "SIM_SECONDS_PER_TICK": world.SIM_SECONDS_PER_TICK,
+        "physics_substeps": world.physics_substeps,
+        "profit": world.profit,
+        "num_servos": world.num_servos,
+        "layout": world.layout,
+        "food_windows": tuple(((w.center.x, w.center.y), w.cell) for w in world.food_windows),
+        "walls": tuple(((a.x, a.y), (b.x, b.y)) for a, b in world.walls),
+        "pathfinding": world.pathfinder.mode,
+        "targets": world.goap.targets,
+        "planner": world.goap.mode,
+        "allocation": world.goap.allocation,
+        "replanning": world.goap.replanning,
+        "smoothing": world.pathfinder.smoothing,
+        "steering": world.steering,
+        "obstacle_customers": tuple(customer_index[id(c)] for c in world.obstacle_index.customers),
+    }
+    rng_states = (world.arrival_rng.bit_generator.state, world.rng.bit_generator.state)
+    nav_grid = (bytes(world.nav_grid.cells), world.nav_grid.version)
+    pathfinder = world.pathfinder.state(lambda servo: servo_index[id(servo)])
+
+    return WorldSnapshot(scalars, tables, tuple(customers), len(world.customers),
+                         tuple(servos), rng_states, nav_grid, pathfinder)
+
+
+# ─── RESTORE ──────────────────────────────────────────────────────────────
+def _rng_from_state(state):
+    bit_generator = getattr(np.random, state["bit_generator"])()
+    bit_generator.state = state
+    return np.random.Generator(bit_generator)
+
+
+def restore_snapshot(snap, render=False):
+    """
+    Rebuild a World from `snap`. Bypasses World.__init__ (no initial customer,
+    no grid building, no pygame unless render=True) and wires up fresh
+    pathfinder/planner/servo objects around the saved state.
+    """
+    from world import World
+
+    scalars = snap.world
+    world = World.__new__(World)
+    for name in ("seed", "layout", "width", "height", "cell_size", "grid_width", "grid_height",
+                 "tick_count", "max_ticks", "arrivals", "_next_arrival", "next_spawn_tick",
+                 "_sim_time_acc", "SIM_SECONDS_PER_TICK", "profit", "num_servos", "physics_substeps"):
+        setattr(world, name, scalars[name])
+    world.physics_dt = world.SIM_SECONDS_PER_TICK / world.physics_substeps
+    world.arrival_ticks = list(scalars["arrival_ticks"])
+    world.arrival_rng = _rng_from_state(snap.rng_states[0])
+    world.rng = _rng_from_state(snap.rng_states[1])
+
+    world.render = render
+    world.renderer = None
+    world.recorder = None
+    if render:
+        from Render.renderer import Renderer
+        world.renderer = Renderer(world)
+
+    # Static-ish layout
+    cells, version = snap.nav_grid
+    world.nav_grid = NavGrid(world.grid_width, world.grid_height, cells)
+    world.nav_grid.version = version
+    world.food_windows = [SimpleNamespace(center=_make(*center), cell=cell)
+                          for center, cell in scalars["food_windows"]]
+    world.food_window = world.food_windows[0]
+    world.walls = [(_make(*a), _make(*b)) for a, b in scalars["walls"]]
+    world.wall_segments = pack_walls(world.walls)
+    world.steering = scalars["steering"]
+
+    tables = []
+    for (cx, cy), capacity, occupied, table_id in snap.tables:
+        t = Table(center=(cx, cy), capacity=capacity, size=world.cell_size)
+        t.occupied = occupied
+        t.id = table_id
+        tables.append(t)
+    world.tables = tables
+    world.obstacles = tables
+
+    # Customers (active first, then completed)
+    customers = []
+    for state, (px, py), table, plain in snap.customers:
+        c = Customer.__new__(Customer)
+        c.__dict__.update(plain)
+        c.world = world
+        fsm = CustomerFSM.__new__(CustomerFSM)
+        fsm._current = state
+        fsm.customer = c
+        c.fsm = fsm
+        c.position = _make(px, py)
+        c.target_table = tables[table] if table is not None else None
+        customers.append(c)
+    world.customers = customers[:snap.num_active]
+    world.completed_customers = customers[snap.num_active:]
+
+    world.customer_index = CustomerIndex(world)
+    for i, t in enumerate(tables):
+        world.customer_index.add_table(t, i)
+    for c in world.customers:
+        world.customer_index.add(c)
+
+    world.pathfinder = Pathfinder(world, scalars["pathfinding"], scalars["smoothing"])
+    world.goap = ServoGOAPPlanner(world, scalars["targets"], scalars["planner"], scalars["allocation"],
+                                  scalars["replanning"])
+
+    # Servos: build them first, then resolve references (obstacles may point at other servos)
+    servos = []
+    for plain, vectors, waypoints, *_ in snap.servos:
+        s = ServoAgent.__new__(ServoAgent)
+        s.world = world
+        s.planner = world.goap
+        s.pathfinder = world.pathfinder
+        for name, value in zip(_SERVO_PLAIN, plain):
+            setattr(s, name, value)
+        s.position, s.velocity, s.heading, s.side = (_make(x, y) for x, y in vectors)
+        s.previous_position = s.position.copy()
+        s.waypoints = tuple(_make(x, y) for x, y in waypoints)
+        servos.append(s)
+    world.servos = servos
+
+    targets = {_TABLE: tables, _SERVO: servos, _CUSTOMER: customers, _FOOD_WINDOW: world.food_windows}
+
+    def deref(encoded):
+        kind, i = encoded
+        return targets[kind][i]
+
+    # Obstacle index: tables, servos and the customers seated at the last sync
+    index = ObstacleIndex(OBSTACLE_HASH_CELL_SIZE)
+    for i, t in enumerate(tables):
+        index.add_table(t, i)
+    for i, s in enumerate(servos):
+        index.add_servo(s, i)
+    index.sync_customers([customers[i] for i in scalars["obstacle_customers"]])
+    world.obstacle_index = index
+    world.steering_engine = world.make_steering_engine()
+
+    for s, (_, _, _, action, carrying, has_obstacles, next_actions) in zip(servos, snap.servos):
+        s.current_action = None if action is None else (action[0], deref(action[1]), deref(action[2]))
+        s.next_actions = [(name, deref(cust), deref(target)) for name, cust, target in next_actions]
+        s.carrying = None if carrying is None else deref(carrying)
+        s.obstacles = ObstacleView(index, s) if has_obstacles else []
+
+    # Incremental and cooperative plans, so "dstar"/"whca" servos repair and extend them as before
+    world.pathfinder.restore_state(snap.pathfinder, servos.__getitem__)
+
+    return world
@@ -0,0 +1,255 @@
+"""
+Uniform-grid spatial index for steering obstacle queries.
+
+SpatialHash buckets objects by the grid cell their position falls in and
+answers "what is inside this rectangle" by visiting only the overlapping
+buckets. Objects are re-bucketed only when they cross a cell boundary, so
+keeping it current as agents move is cheap.
+
+ObstacleIndex is the world's instance: tables (static), servos (re-bucketed
+after every move()) and seated customers (synced once per tick). Each servo
+gets an ObstacleView in place of the per-tick list World.get_obstacles()
+used to build. Candidates come back in get_obstacles() order (tables, then
+servos, then customers by spawn order), so obstacle avoidance picks exactly
+the same object as a full scan would.
+
+The index also keeps every obstacle packed as a plain (x, y, radius) tuple,
+refreshed whenever the object is added or moved(). Steering kernels read
+those instead of looking up `position`/`center`/`radius` per object per frame.
+"""
+import math
+
+
+def obstacle_position(obj):
+    """Same lookup obstacle avoidance uses: `position`, falling back to `center`."""
+    return getattr(obj, 'position', None) or getattr(obj, 'center', None)
+
+
+def pack_obstacle(obj):
+    """(x, y, radius) for steering, or None when `obj` has no position to avoid."""
+    pos = obstacle_position(obj)
+    if not pos:
+        return None
+    return (pos[0], pos[1], getattr(obj, 'radius', 20))
+
+
+class SpatialHash:
+    """Buckets of objects keyed by integer cell; one bucket per object."""
+    def __init__(self, cell_size):
+        self.cell_size = float(cell_size)
+        self.buckets = {}     # (cx, cy) -> {id(obj): obj}
+        self._cell_of = {}    # id(obj) -> (cx, cy) or None when it has no position
+
+    def _cell(self, pos):
+        if not pos:
+            return None
+        size = self.cell_size
+        return (math.floor(pos[0] / size), math.floor(pos[1] / size))
+
+    def insert(self, obj, pos):
+        key = id(obj)
+        cell = self._cell(pos)
+        self._cell_of[key] = cell
+        if cell is not None:
+            self.buckets.setdefault(cell, {})[key] = obj
+
+    def move(self, obj, pos):
+        """Re-bucket `obj` if `pos` is in a different cell from last time."""
+        key = id(obj)
+        old = self._cell_of.get(key)
+        cell = self._cell(pos)
+        if cell == old:
+            return
+        if old is not None:
+            bucket = self.buckets[old]
+            del bucket[key]
+            if not bucket:
+                del self.buckets[old]
+        self._cell_of[key] = cell
+        if cell is not None:
+            self.buckets.setdefault(cell, {})[key] = obj
+
+    def remove(self, obj):
+        key = id(obj)
+        old = self._cell_of.pop(key)
+        if old is not None:
+            bucket = self.buckets[old]
+            del bucket[key]
+            if not bucket:
+                del self.buckets[old]
+
+    def __contains__(self, obj):
+        return id(obj) in self._cell_of
+
+    def __len__(self):
+        return len(self._cell_of)
+
+    def query(self, x0, y0, x1, y1):
+        """Objects bucketed in any cell overlapping the rectangle (unordered)."""
+        size = self.cell_size
+        cx0, cx1 = math.floor(x0 / size), math.floor(x1 / size)
+        cy0, cy1 = math.floor(y0 / size), math.floor(y1 / size)
+        buckets = self.buckets
+        found = []
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(buckets):
+            # Huge box, few buckets: walk the buckets instead of the cells
+            for (cx, cy), bucket in buckets.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    found.extend(bucket.values())
+            return found
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = buckets.get((cx, cy))
+                if bucket:
+                    found.extend(bucket.values())
+        return found
+
+
+class ObstacleIndex:
+    """Tables, servos and seated customers of one world, in a SpatialHash."""
+    TABLE, SERVO, CUSTOMER = 0, 1, 2
+
+    def __init__(self, cell_size):
+        self.hash = SpatialHash(cell_size)
+        self._objects = {}        # id(obj) -> obj
+        self._order = {}          # id(obj) -> (kind, n): get_obstacles() order
+        self._customers = {}      # id(customer) -> customer, for the seated ones
+        self._packed = {}         # id(obj) -> (x, y, radius) or None, as of its last move
+        self.max_radius = 0.0
+
+    def _add(self, obj, order):
+        self._objects[id(obj)] = obj
+        self._order[id(obj)] = order
+        self._packed[id(obj)] = pack_obstacle(obj)
+        self.hash.insert(obj, obstacle_position(obj))
+        self.max_radius = max(self.max_radius, getattr(obj, 'radius', 20))
+
+    def _remove(self, obj):
+        del self._objects[id(obj)]
+        del self._order[id(obj)]
+        del self._packed[id(obj)]
+        self.hash.remove(obj)
+
+    def add_table(self, table, n):
+        self._add(table, (self.TABLE, n))
+
+    def add_servo(self, servo, n):
+        self._add(servo, (self.SERVO, n))
+
+    def moved(self, obj):
+        """Call after `obj`'s position changes."""
+        self._packed[id(obj)] = pack_obstacle(obj)
+        self.hash.move(obj, obstacle_position(obj))
+
+    def sync_customers(self, seated):
+        """Make the seated customers (in world.customers order) the customer obstacles."""
+        current = self._customers
+        wanted = {id(c): c for c in seated}
+        for key in [k for k in current if k not in wanted]:
+            self._remove(current.pop(key))
+        for key, cust in wanted.items():
+            if key in current:
+                self.moved(cust)
+            else:
+                current[key] = cust
+                # Spawn order matches world.customers order
+                self._add(cust, (self.CUSTOMER, cust.id))
+
+    @property
+    def customers(self):
+        return list(self._customers.values())
+
+    def members(self, exclude=None):
+        """Every obstacle except `exclude`, in get_obstacles() order."""
+        order = self._order
+        objs = [o for o in self._objects.values() if o is not exclude]
+        objs.sort(key=lambda o: order[id(o)])
+        return objs
+
+    def packed(self, exclude=None):
+        """(x, y, radius) of every obstacle with a position except `exclude`, in get_obstacles() order."""
+        packed = self._packed
+        return [p for p in (packed[id(o)] for o in self.members(exclude)) if p is not None]
+
+    def tables_packed(self):
+        """(x, y, radius) of every table with a position, in get_obstacles() order. Tables never move."""
+        order, packed = self._order, self._packed
+        tables = [o for o in self._objects.values() if order[id(o)][0] == self.TABLE]
+        tables.sort(key=lambda o: order[id(o)])
+        return [packed[id(o)] for o in tables if packed[id(o)] is not None]
+
+    def near_packed(self, x0, y0, x1, y1, exclude=None):
+        """near(), as (x, y, radius) tuples."""
+        packed = self._packed
+        return [packed[id(o)] for o in self.near(x0, y0, x1, y1, exclude)]
+
+    def customers_packed(self):
+        """(x, y, radius) of every seated customer with a position, in get_obstacles() order."""
+        order, packed = self._order, self._packed
+        customers = sorted(self._customers.values(), key=lambda o: order[id(o)])
+        return [packed[id(o)] for o in customers if packed[id(o)] is not None]
+
+    def movers_packed(self):
+        """
+        (obj, (x, y, radius), (vx, vy)) for the servos and seated customers
+        with a position, in get_obstacles() order. Customers stand still.
+        """
+        order, packed = self._order, self._packed
+        movers = [o for o in self._objects.values() if order[id(o)][0] != self.TABLE]
+        movers.sort(key=lambda o: order[id(o)])
+        found = []
+        for o in movers:
+            p = packed[id(o)]
+            if p is None:
+                continue
+            if order[id(o)][0] == self.SERVO:
+                found.append((o, p, (o.velocity.x, o.velocity.y)))
+            else:
+                found.append((o, p, (0.0, 0.0)))
+        return found
+
+    def near(self, x0, y0, x1, y1, exclude=None):
+        """Obstacles whose position lies in cells overlapping the rectangle, in get_obstacles() order."""
+        order = self._order
+        objs = [o for o in self.hash.query(x0, y0, x1, y1) if o is not exclude]
+        if len(objs) > 1:
+            objs.sort(key=lambda o: order[id(o)])
+        return objs
+
+    def __len__(self):
+        return len(self._order)
+
+
+class ObstacleView:
+    """
+    A servo's obstacles: everything in the index except the servo itself.
+    Iterates like the list get_obstacles() returns; near() is the fast path.
+    """
+    __slots__ = ("index", "agent")
+
+    def __init__(self, index, agent):
+        self.index = index
+        self.agent = agent
+
+    @property
+    def max_radius(self):
+        return self.index.max_radius
+
+    def near(self, x0, y0, x1, y1):
+        return self.index.near(x0, y0, x1, y1, exclude=self.agent)
+
+    def near_packed(self, x0, y0, x1, y1):
+        return self.index.near_packed(x0, y0, x1, y1, exclude=self.agent)
+
+    def packed(self):
+        return self.index.packed(exclude=self.agent)
+
+    def __iter__(self):
+        return iter(self.index.members(exclude=self.agent))
+
+    def __len__(self):
+        n = len(self.index)
+        return n - 1 if id(self.agent) in self.index._order else n
+
+    def __bool__(self):
+        return len(self) > 0
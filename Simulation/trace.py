@@ -0,0 +1,216 @@
+"""
+Leveled trace logging for the simulation.
+
+Each subsystem grabs a channel once at import time and guards its messages
+with the channel's level flag, so a disabled message costs one attribute
+check and its f-string is never formatted:
+
+    from Simulation import trace
+    from Simulation.trace import DEBUG
+
+    _trace = trace.channel("pathfinder")
+    ...
+    if _trace.debug:
+        _trace.log(DEBUG, f"[Pathfinder] Skipping blocked neighbor {(nx, ny)}")
+
+Levels are set per subsystem, either in code with configure()/set_level() or
+through the DINER_TRACE environment variable, e.g.
+
+    DINER_TRACE="warning,world=info,pathfinder=debug" python batch_run.py
+
+Records go to every registered sink: stdout by default, plus an optional
+in-memory ring buffer that keeps the last N records for dump() when something
+goes wrong.
+"""
+import os
+import sys
+from collections import deque
+from typing import NamedTuple
+
+DEBUG   = 10
+INFO    = 20
+WARNING = 30
+ERROR   = 40
+OFF     = 100
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR", OFF: "OFF"}
+_LEVELS_BY_NAME = {name.lower(): level for level, name in LEVEL_NAMES.items()}
+
+# Quiet by default: only problems reach stdout unless someone asks for more
+DEFAULT_LEVEL = WARNING
+
+
+class TraceRecord(NamedTuple):
+    tick: object        # world tick when the record was made (None if no clock is set)
+    subsystem: str
+    level: int
+    message: str
+
+    def format(self):
+        tick = "---" if self.tick is None else f"{self.tick:03d}"
+        return f"{tick} {LEVEL_NAMES.get(self.level, self.level):<7} {self.subsystem:<10} {self.message}"
+
+
+# ─── SINKS ─────────────────────────────────────────────────────────────────
+# Every sink has a `level`: records below it are dropped by that sink only, so
+# e.g. stdout can show INFO while the ring buffer still captures DEBUG.
+class StdoutSink:
+    """Prints the bare message, so console output looks like the old print() calls."""
+    def __init__(self, level=DEBUG):
+        self.level = level
+
+    def write(self, record):
+        print(record.message)
+
+
+class RingBufferSink:
+    """Keeps the last `capacity` records in memory."""
+    def __init__(self, capacity=1000, level=DEBUG):
+        self.level = level
+        self.records = deque(maxlen=capacity)
+
+    def write(self, record):
+        self.records.append(record)
+
+    def dump(self, file=None):
+        file = file or sys.stdout
+        for record in self.records:
+            print(record.format(), file=file)
+
+    def clear(self):
+        self.records.clear()
+
+
+# ─── CHANNELS ──────────────────────────────────────────────────────────────
+class Channel:
+    """Per-subsystem handle. Check the flags before building a message."""
+    __slots__ = ("name", "level", "debug", "info", "warning", "error")
+
+    def __init__(self, name, level):
+        self.name = name
+        self.set_level(level)
+
+    def set_level(self, level):
+        self.level = level
+        self.debug = level <= DEBUG
+        self.info = level <= INFO
+        self.warning = level <= WARNING
+        self.error = level <= ERROR
+
+    def log(self, level, message):
+        if level >= self.level:
+            _emit(self.name, level, message)
+
+
+_channels = {}
+_levels = {}                 # explicit per-subsystem overrides
+_default_level = DEFAULT_LEVEL
+_sinks = [StdoutSink()]
+_clock = None                # callable returning the current tick
+
+
+def _emit(subsystem, level, message):
+    record = TraceRecord(_clock() if _clock is not None else None, subsystem, level, message)
+    for sink in _sinks:
+        if level >= sink.level:
+            sink.write(record)
+
+
+def channel(name):
+    """Return (creating if needed) the channel for a subsystem."""
+    ch = _channels.get(name)
+    if ch is None:
+        ch = Channel(name, _levels.get(name, _default_level))
+        _channels[name] = ch
+    return ch
+
+
+def parse_level(level):
+    if isinstance(level, int):
+        return level
+    try:
+        return _LEVELS_BY_NAME[level.strip().lower()]
+    except KeyError:
+        raise ValueError(f"Unknown trace level {level!r}; expected one of {sorted(_LEVELS_BY_NAME)}") from None
+
+
+def set_level(level, subsystem=None):
+    """Set one subsystem's level, or the default for every subsystem without an override."""
+    global _default_level
+    level = parse_level(level)
+    if subsystem is None:
+        _default_level = level
+        for name, ch in _channels.items():
+            if name not in _levels:
+                ch.set_level(level)
+    else:
+        _levels[subsystem] = level
+        channel(subsystem).set_level(level)
+
+
+def configure(spec=None, default=None, stdout=None, stdout_level=DEBUG, ring_buffer=None):
+    """
+    spec:         "warning,world=info,pathfinder=debug" (bare level = default)
+    default:      default level for subsystems without an override
+    stdout:       True/False to attach/detach the stdout sink
+    stdout_level: minimum level the stdout sink prints (when attaching it)
+    ring_buffer:  capacity of an in-memory ring buffer sink (0 removes it)
+    """
+    if default is not None:
+        set_level(default)
+    if spec:
+        for part in spec.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            if "=" in part:
+                name, level = part.split("=", 1)
+                set_level(level, name.strip())
+            else:
+                set_level(part)
+
+    if stdout is not None:
+        _sinks[:] = [s for s in _sinks if not isinstance(s, StdoutSink)]
+        if stdout:
+            _sinks.insert(0, StdoutSink(parse_level(stdout_level)))
+
+    if ring_buffer is not None:
+        _sinks[:] = [s for s in _sinks if not isinstance(s, RingBufferSink)]
+        if ring_buffer > 0:
+            _sinks.append(RingBufferSink(ring_buffer))
+
+
+def add_sink(sink):
+    _sinks.append(sink)
+
+
+def remove_sink(sink):
+    _sinks.remove(sink)
+
+
+def get_ring_buffer():
+    """The active RingBufferSink, or None."""
+    for sink in _sinks:
+        if isinstance(sink, RingBufferSink):
+            return sink
+    return None
+
+
+def dump(file=None):
+    """Write the ring buffer's records (if any) to `file` (stdout by default)."""
+    ring = get_ring_buffer()
+    if ring is not None:
+        ring.dump(file)
+
+
+def set_clock(clock):
+    """
+    clock: zero-arg callable returning the current tick, stamped on every
+    record. There is one clock for the process; World.run() points it at the
+    world it runs, and headless runs leave it unset unless they set it.
+    """
+    global _clock
+    _clock = clock
+
+
+configure(os.environ.get("DINER_TRACE"))
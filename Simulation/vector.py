@@ -0,0 +1,207 @@
+import math
+
+
+class Vector2:
+    """
+    Lightweight 2D vector for the headless simulation core.
+
+    Drop-in for the subset of pygame.math.Vector2 the simulation uses, without
+    importing pygame (so no SDL is needed). The arithmetic mirrors pygame's C
+    implementation operation for operation, so trajectories are bit-identical
+    to the pygame version.
+    """
+    __slots__ = ("x", "y")
+
+    # Same tolerance pygame uses for its special cases (rotate, scale_to_length)
+    EPSILON = 1e-6
+
+    def __init__(self, x=0.0, y=None):
+        if y is None:
+            if isinstance(x, (int, float)):
+                self.x = self.y = float(x)
+                return
+            x, y = x
+        self.x = float(x)
+        self.y = float(y)
+
+    # ─── SEQUENCE PROTOCOL (tuple(v), x, y = v, pygame.draw) ─────────────────
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, i):
+        return (self.x, self.y)[i]
+
+    def __iter__(self):
+        return iter((self.x, self.y))
+
+    def __bool__(self):
+        return self.x != 0.0 or self.y != 0.0
+
+    def __eq__(self, other):
+        try:
+            ox, oy = other
+        except (TypeError, ValueError):
+            return NotImplemented
+        return self.x == ox and self.y == oy
+
+    __hash__ = None  # mutable, like pygame's
+
+    def __repr__(self):
+        return f"Vector2({self.x}, {self.y})"
+
+    def copy(self):
+        return _make(self.x, self.y)
+
+    def update(self, x=0.0, y=None):
+        if y is None:
+            x, y = x
+        self.x = float(x)
+        self.y = float(y)
+
+    # ─── ARITHMETIC ─────────────────────────────────────────────────────────
+    def __add__(self, other):
+        if type(other) is Vector2:
+            ox, oy = other.x, other.y
+        else:
+            ox, oy = other
+        return _make(self.x + ox, self.y + oy)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if type(other) is Vector2:
+            ox, oy = other.x, other.y
+        else:
+            ox, oy = other
+        return _make(self.x - ox, self.y - oy)
+
+    def __rsub__(self, other):
+        ox, oy = other
+        return _make(ox - self.x, oy - self.y)
+
+    def __iadd__(self, other):
+        if type(other) is Vector2:
+            ox, oy = other.x, other.y
+        else:
+            ox, oy = other
+        self.x += ox
+        self.y += oy
+        return self
+
+    def __isub__(self, other):
+        if type(other) is Vector2:
+            ox, oy = other.x, other.y
+        else:
+            ox, oy = other
+        self.x -= ox
+        self.y -= oy
+        return self
+
+    def __mul__(self, other):
+        if isinstance(other, Vector2):
+            return self.dot(other)   # pygame: v * w is the dot product
+        return _make(self.x * other, self.y * other)
+
+    def __rmul__(self, other):
+        return _make(other * self.x, other * self.y)
+
+    def __imul__(self, scalar):
+        self.x *= scalar
+        self.y *= scalar
+        return self
+
+    def __truediv__(self, scalar):
+        return _make(self.x / scalar, self.y / scalar)
+
+    def __itruediv__(self, scalar):
+        self.x /= scalar
+        self.y /= scalar
+        return self
+
+    def __neg__(self):
+        return _make(-self.x, -self.y)
+
+    def __pos__(self):
+        return _make(self.x, self.y)
+
+    # ─── GEOMETRY ──────────────────────────────────────────────────────────
+    def dot(self, other):
+        if type(other) is Vector2:
+            ox, oy = other.x, other.y
+        else:
+            ox, oy = other
+        return self.x * ox + self.y * oy
+
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y)
+
+    def length_squared(self):
+        return self.x * self.x + self.y * self.y
+
+    def distance_to(self, other):
+        if type(other) is Vector2:
+            ox, oy = other.x, other.y
+        else:
+            ox, oy = other
+        dx = self.x - ox
+        dy = self.y - oy
+        return math.sqrt(dx * dx + dy * dy)
+
+    def distance_squared_to(self, other):
+        if type(other) is Vector2:
+            ox, oy = other.x, other.y
+        else:
+            ox, oy = other
+        dx = self.x - ox
+        dy = self.y - oy
+        return dx * dx + dy * dy
+
+    def normalize(self):
+        length = math.sqrt(self.x * self.x + self.y * self.y)
+        if length == 0:
+            raise ValueError("Can't normalize Vector of length Zero")
+        return _make(self.x / length, self.y / length)
+
+    def scale_to_length(self, new_length):
+        old_length = math.sqrt(self.x * self.x + self.y * self.y)
+        if old_length < self.EPSILON:
+            raise ValueError("Cannot scale a vector with zero length")
+        fraction = new_length / old_length
+        self.x *= fraction
+        self.y *= fraction
+
+    def rotate(self, angle):
+        """Rotate by `angle` degrees (counter-clockwise in maths axes, like pygame)."""
+        # Same steps as pygame's _vector2_rotate_helper: convert to radians,
+        # wrap to [0, 2π) and special-case the right angles so they stay exact.
+        angle = angle * math.pi / 180.0
+        angle = math.fmod(angle, 2.0 * math.pi)
+        if angle < 0:
+            angle += 2.0 * math.pi
+        eps = self.EPSILON
+        half_pi = math.pi / 2.0
+        if math.fmod(angle + eps, half_pi) < 2 * eps:
+            quadrant = int((angle + eps) / half_pi)
+            if quadrant in (0, 4):
+                return _make(self.x, self.y)
+            if quadrant == 1:
+                return _make(-self.y, self.x)
+            if quadrant == 2:
+                return _make(-self.x, -self.y)
+            return _make(self.y, -self.x)
+
+        sin_v = math.sin(angle)
+        cos_v = math.cos(angle)
+        return _make(cos_v * self.x - sin_v * self.y,
+                 sin_v * self.x + cos_v * self.y)
+
+
+_new = object.__new__
+
+
+def _make(x, y):
+    """Build a Vector2 from two floats, skipping __init__'s argument parsing."""
+    v = _new(Vector2)
+    v.x = x
+    v.y = y
+    return v
@@ -1,6 +1,7 @@
 import csv
 import time
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -8,28 +9,51 @@ import warnings
 from scipy import stats
 from itertools import combinations
 import json
-from constants import CUSTOMER_RANDOM_SPAWN_RATE, CustomerState
+from constants import CustomerState
 from world import World
+from Simulation.event_scheduler import EventScheduler
+from Simulation.replay import ReplayRecorder
 import numpy as np
 
 # Filter scipy warnings
 warnings.filterwarnings('ignore', category=RuntimeWarning)
 warnings.filterwarnings('ignore', category=UserWarning)
 
+# Arrival model for every batch entry point: Poisson, so each seed is a different night
+BATCH_ARRIVALS = "poisson"
+
 def create_insights_directory():
     """Create insights directory if it doesn't exist."""
     os.makedirs("insights", exist_ok=True)
 
-def run_trials(num_servos, num_trials=30):
-    """Run trials for a specific number of servos."""
-    results = []
-    for trial in range(num_trials):
-        world = World(num_servos=num_servos, seed=trial, render=False)
-        print(f"\nSEED={trial}  CUSTOMER_RANDOM_SPAWN_RATE={CUSTOMER_RANDOM_SPAWN_RATE}")
-        print(f"Starting profit=${world.profit:.2f}, max_ticks={world.max_ticks}")
-        cpu_ms = 0.0
-        
-        # Run until all customers are served or leave
+def run_trial(num_servos, trial, engine="tick", arrivals=BATCH_ARRIVALS, replay_dir=None):
+    """
+    Run one seeded trial and return (result_row, run_info).
+
+    Self-contained so it can run inside a worker process; cpu_ms is measured
+    here, around the simulation only, so the per-tick figure means the same
+    thing whether trials run serially or in a pool.
+
+    engine: "tick"  → step every tick with World._do_one_simulation_tick()
+            "event" → jump between events with EventScheduler (same KPIs; only
+                      walking servos are stepped between events, see README)
+    arrivals: arrival model passed to World (name or instance; None = ARRIVAL_MODEL
+              from constants, the interactive default)
+    replay_dir: if set, record the trial and save it there as a replay file
+                (play back with `python -m Simulation.replay <file>`)
+    """
+    world = World(num_servos=num_servos, seed=trial, render=False, arrivals=arrivals)
+    if replay_dir is not None:
+        world.recorder = ReplayRecorder(world)
+    start_profit = world.profit
+    cpu_ms = 0.0
+    
+    # Run until all customers are served or leave
+    if engine == "event":
+        start = time.perf_counter()
+        tick = EventScheduler(world).run(min_ticks=250)
+        cpu_ms = (time.perf_counter() - start) * 1000.0
+    else:
         tick = 0
         while tick < 250 or len(world.customers) > 0:
             start = time.perf_counter()
@@ -41,42 +65,84 @@ def run_trials(num_servos, num_trials=30):
             # Only spawn new customers up to tick 250
             if tick >= 250:
                 world.spawn_rate = 0
-        
-        # Process any remaining customers
-        print(f"\nProcessing completed at tick {tick}:")
-        print(f"Final profit: ${world.profit:.2f}")
-        
-        # Calculate metrics
-        total_customers = len(world.completed_customers)
-        served_customers = len([c for c in world.completed_customers if c.finished_eating])
-        satisfied_customers = len([c for c in world.completed_customers if c.satisfaction >= 30])
-        service_rate = served_customers / total_customers * 100 if total_customers > 0 else 0
-        satisfaction_rate = satisfied_customers / total_customers * 100 if total_customers > 0 else 0
-        avg_wait_time = sum(c.wait_time for c in world.completed_customers) / len(world.completed_customers) if world.completed_customers else 0
-        
-        print(f"Total customers: {total_customers}")
-        print(f"Served customers: {served_customers}")
-        print(f"Satisfied customers: {satisfied_customers}")
-        print(f"Service rate: {service_rate:.2f}%")
-        print(f"Satisfaction rate: {satisfaction_rate:.2f}%")
-        print(f"Average wait time: {avg_wait_time:.2f} minutes")
-        print("-" * 80)
-        
-        # Store results
-        results.append({
-            'trial': trial,
-            'num_servos': num_servos,
-            'profit': world.profit - 500,
-            'service_rate': service_rate,
-            'satisfaction_rate': satisfaction_rate,
-            'avg_wait_time': avg_wait_time,
-            'cpu_ms': cpu_ms / tick,
-            'total_customers': total_customers,
-            'served_customers': served_customers,
-            'satisfied_customers': satisfied_customers
-        })
     
-    # Print summary statistics
+    if world.recorder is not None:
+        world.recorder.save(os.path.join(replay_dir, f"servos{num_servos}_seed{trial}.rpl"))
+
+    # Calculate metrics
+    total_customers = len(world.completed_customers)
+    served_customers = len([c for c in world.completed_customers if c.finished_eating])
+    satisfied_customers = len([c for c in world.completed_customers if c.satisfaction >= 30])
+    service_rate = served_customers / total_customers * 100 if total_customers > 0 else 0
+    satisfaction_rate = satisfied_customers / total_customers * 100 if total_customers > 0 else 0
+    avg_wait_time = sum(c.wait_time for c in world.completed_customers) / len(world.completed_customers) if world.completed_customers else 0
+    
+    result = {
+        'trial': trial,
+        'num_servos': num_servos,
+        'profit': world.profit - 500,
+        'service_rate': service_rate,
+        'satisfaction_rate': satisfaction_rate,
+        'avg_wait_time': avg_wait_time,
+        'cpu_ms': cpu_ms / tick,
+        'total_customers': total_customers,
+        'served_customers': served_customers,
+        'satisfied_customers': satisfied_customers
+    }
+    run_info = {
+        'start_profit': start_profit,
+        'final_profit': world.profit,
+        'max_ticks': world.max_ticks,
+        'final_tick': tick,
+        'arrivals': repr(world.arrivals),
+    }
+    return result, run_info
+
+def print_trial(result, run_info):
+    """Per-trial report, printed by the parent process as each trial finishes."""
+    print(f"\nSERVOS={result['num_servos']}  SEED={result['trial']}  ARRIVALS={run_info['arrivals']}")
+    print(f"Starting profit=${run_info['start_profit']:.2f}, max_ticks={run_info['max_ticks']}")
+    print(f"\nProcessing completed at tick {run_info['final_tick']}:")
+    print(f"Final profit: ${run_info['final_profit']:.2f}")
+    print(f"Total customers: {result['total_customers']}")
+    print(f"Served customers: {result['served_customers']}")
+    print(f"Satisfied customers: {result['satisfied_customers']}")
+    print(f"Service rate: {result['service_rate']:.2f}%")
+    print(f"Satisfaction rate: {result['satisfaction_rate']:.2f}%")
+    print(f"Average wait time: {result['avg_wait_time']:.2f} minutes")
+    print("-" * 80)
+
+def iter_trials(jobs, engine="tick", workers=1, arrivals=BATCH_ARRIVALS, replay_dir=None):
+    """
+    Yield (result_row, run_info) for each (num_servos, seed) job as it finishes.
+
+    workers <= 1 runs the jobs in this process, in order. Otherwise they are
+    spread across a process pool and yielded in completion order.
+    """
+    if workers is None or workers <= 1:
+        for num_servos, trial in jobs:
+            yield run_trial(num_servos, trial, engine, arrivals, replay_dir)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_trial, num_servos, trial, engine, arrivals, replay_dir) for num_servos, trial in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+def run_jobs(jobs, engine="tick", workers=1, arrivals=BATCH_ARRIVALS, replay_dir=None):
+    """Run (num_servos, seed) jobs, streaming per-trial reports; returns rows in job order."""
+    order = {job: i for i, job in enumerate(jobs)}
+    results = []
+    for result, run_info in iter_trials(jobs, engine, workers, arrivals, replay_dir):
+        print_trial(result, run_info)
+        results.append(result)
+
+    # Completion order depends on scheduling; sort back so the output matches a serial run
+    results.sort(key=lambda r: order[(r['num_servos'], r['trial'])])
+    return results
+
+def print_summary(num_servos, results):
+    """Print summary statistics for one servo configuration."""
     avg_profit = sum(r['profit'] for r in results) / len(results)
     avg_service_rate = sum(r['service_rate'] for r in results) / len(results)
     avg_satisfaction_rate = sum(r['satisfaction_rate'] for r in results) / len(results)
@@ -89,7 +155,11 @@ def run_trials(num_servos, num_trials=30):
     print(f"  Satisfaction Rate: {avg_satisfaction_rate:.2f}%")
     print(f"  Average Wait Time: {avg_wait_time:.2f} minutes")
     print(f"  Average CPU Time: {avg_cpu_ms:.2f}ms per tick")
-    
+
+def run_trials(num_servos, num_trials=30, engine="tick", workers=1, arrivals=BATCH_ARRIVALS, replay_dir=None):
+    """Run trials for a specific number of servos."""
+    results = run_jobs([(num_servos, trial) for trial in range(num_trials)], engine, workers, arrivals, replay_dir)
+    print_summary(num_servos, results)
     return results
 
 def analyze_and_visualize_results(df):
@@ -215,19 +285,29 @@ def analyze_and_visualize_results(df):
 
     print("Comprehensive performance analysis graph saved to 'insights/performance_analysis.png'")
 
-def main(servo_configs_to_run=None):
-    """Run the batch simulation."""
+def main(servo_configs_to_run=None, engine="tick", workers=None, num_trials=30, arrivals=BATCH_ARRIVALS, replay_dir=None):
+    """
+    Run the batch simulation.
+
+    workers:  size of the process pool the (num_servos, seed) trials are spread
+              over; defaults to one per CPU. 1 runs everything in this process.
+    arrivals: arrival model for every trial. Defaults to BATCH_ARRIVALS (Poisson)
+              so each seed is a different night; "fixed" gives the same
+              customers for every seed.
+    replay_dir: save a replay of every trial here (e.g. "insights/replays").
+    """
     if servo_configs_to_run is None:
         servo_configs_to_run = [1, 2, 3]
+    if workers is None:
+        workers = os.cpu_count() or 1
 
-    all_results = []
-    
     create_insights_directory()
 
-    # Run trials for specified servo configurations
+    # Run trials for specified servo configurations, all in one pool
+    jobs = [(num_servos, trial) for num_servos in servo_configs_to_run for trial in range(num_trials)]
+    all_results = run_jobs(jobs, engine, workers, arrivals, replay_dir)
     for num_servos in servo_configs_to_run:
-        results = run_trials(num_servos)
-        all_results.extend(results)
+        print_summary(num_servos, [r for r in all_results if r['num_servos'] == num_servos])
 
     # Create and analyze the final DataFrame
     df = pd.DataFrame(all_results)
@@ -20,8 +20,26 @@ WIDTH = 800
 HEIGHT = 600
 MAX_TICKS = 250
 SIM_SECONDS_PER_TICK = 0.2  # 1 in-game minute = 0.2 real seconds
+# Fixed physics steps per simulation tick: servos move PHYSICS_SUBSTEPS times by
+# SIM_SECONDS_PER_TICK / PHYSICS_SUBSTEPS, whatever the frame rate. 1 is the
+# largest step (and the fastest headless runs); more steps track paths closer.
+PHYSICS_SUBSTEPS = 1
 CUSTOMER_RANDOM_SPAWN_RATE = 5 # or random.randint(2, 7) 
 
+# ─── ARRIVALS ────────────────────────────────────────────────────────────
+# How customers arrive (see Simulation/arrivals.py). The whole schedule is drawn
+# up front from each world's own RNG, so seeds matter and ticks stay RNG-free.
+#   "fixed"   → one customer every CUSTOMER_RANDOM_SPAWN_RATE ticks
+#   "poisson" → Poisson arrivals at ARRIVAL_RATE customers per tick
+#   "rush"    → Poisson at ARRIVAL_RATE plus the RUSH_HOURS peaks
+ARRIVAL_MODEL = "fixed"
+ARRIVAL_RATE  = 1 / CUSTOMER_RANDOM_SPAWN_RATE   # same average load as "fixed"
+RUSH_HOURS = [
+    # (center tick, width in ticks, extra customers per tick)
+    (60,  15, 0.15),   # lunch
+    (190, 20, 0.20),   # dinner
+]
+
 # ─── SERVO ───────────────────────────────────────────────────────────────
 NUM_SERVOS = 3
 SERVO_WAGE = 20
@@ -35,6 +53,66 @@ SERVO_COLORS = [
 # ─── GRID / TIMING ────────────────────────────────────────────────────────────
 TILE_SIZE      = 80      # pixels per grid‐cell (world.py uses this to convert grid ↔ pixel)
 TICKS_PER_MIN  = 1       # 1 tick = 1 minute of simulated "in‐game" time
+OBSTACLE_HASH_CELL_SIZE = 160   # pixels per bucket of the steering obstacle index (Simulation/spatial_hash.py)
+
+# ─── STEERING ────────────────────────────────────────────────────────────────
+# How servo steering forces are computed each move:
+#   "object" → ServoAgent.move() per servo with Vector2 maths (Actions/steering.py)
+#   "batch"  → all steering forces in NumPy broadcasts (Actions/batch_steering.py);
+#              faster from about 50 servos, slower with a handful
+#              (python -m Benchmarks.steering)
+#   "orca"   → servos take ORCA velocities (reciprocal collision avoidance,
+#              Actions/steering.py) instead of summing avoidance forces
+STEERING = "object"
+ORCA_TIME_HORIZON = 0.1            # seconds ahead a servo keeps clear of other servos
+ORCA_OBSTACLE_TIME_HORIZON = 0.1   # ... and of tables and seated customers
+ORCA_NEIGHBOUR_DIST = 240          # pixels (3 cells) within which neighbours count
+ORCA_MAX_NEIGHBOURS = 8            # nearest neighbours each servo considers
+
+# ─── PATHFINDING ─────────────────────────────────────────────────────────────
+# How Pathfinder.find_path answers (see Actions/pathfinder.py):
+#   "astar" → fresh A* per query
+#   "field" → cached per-goal distance fields, O(path length) per query once
+#             a goal's field exists; equally short paths, ties may differ
+#   "hpa"   → hierarchical A* over HPA_CLUSTER_SIZE clusters, for big floors;
+#             near-optimal paths, searched leg by leg as they are walked
+#   "dstar" → each servo plans with D* Lite and repairs its path every tick
+#             around cells where another servo is parked (PARKED_SERVO_PENALTY)
+#   "whca"  → servos reserve (cell, tick) slots and plan around each other's
+#             reservations, COOPERATIVE_WINDOW ticks at a time (serves a
+#             few percent fewer customers in the default room; see README)
+PATHFINDING = "astar"
+DISTANCE_FIELD_CACHE_SIZE = 64   # goals whose fields are kept (LRU)
+PATH_CACHE_SIZE = 256            # finished (start, goal) paths kept (LRU); 0 disables
+HPA_CLUSTER_SIZE = 10            # cells per side of an "hpa" cluster (Actions/hpa.py)
+PARKED_SERVO_PENALTY = 4         # "dstar": extra cost of walking through an idle servo's cell
+COOPERATIVE_WINDOW = 8           # "whca": ticks of each servo's path reserved ahead
+PATH_SMOOTHING = False           # string-pull paths to any-angle segments (Actions/smoothing.py)
+
+# ─── TARGET SELECTION ──────────────────────────────────────────────────────
+# Which free table, approach cell and food window a servo heads for
+# (see Actions/goap_servo.py):
+#   "first"   → first free table, first walkable cell next to it, food window
+#               nearest as the crow flies
+#   "nearest" → the shortest walk from the servo, one multi-goal search each
+TARGET_SELECTION = "first"
+# How an idle servo decides what to do (see Actions/goap_servo.py):
+#   "rules"  → the priority chain (deliver, pick up, seat), one action at a time
+#   "search" → A* over abstract states with walking costs (Actions/goap_search.py):
+#              multi-step plans such as pick up then deliver, memoized by state
+GOAP_PLANNER = "rules"
+# Which idle servo gets which task (see Actions/task_allocation.py):
+#   "greedy" → servos ask in index order, each taking the most urgent task left
+#   "global" → one assignment per tick over all idle servos and open tasks,
+#              cost = walk in steps - ALLOCATION_URGENCY * ticks the customer waited
+TASK_ALLOCATION = "greedy"
+ALLOCATION_URGENCY = 1.0   # steps of walking one tick of customer waiting is worth
+# When idle servos are planned for:
+#   "poll"  → every tick, for every idle servo
+#   "event" → only after something that can make work: a customer starts
+#             queueing, a dish becomes ready, a table comes free or a servo
+#             finishes its action; same plans, far fewer planner calls
+REPLANNING = "poll"
 
 # ─── CUSTOMER WAIT TIME THRESHOLDS (in ticks) ───────────────────────────────
 UNHAPPY_TICKS  = 10      # at 10 ticks waiting, customer goes from "Waiting" → "Angry/Unhappy"
@@ -44,7 +122,6 @@ LEAVE_TICKS    = 30      # at 30 ticks, customer's satisfaction → 0 and they L
 # ─── SERVO MOVEMENT ──────────────────────────────────────────────────────────
 # We want the servo to traverse exactly one TILE_SIZE (80 pixels) per tick,
 # so that each cell–to–cell move takes "1 minute" (given our 1 tick=1 min).
-SERVO_INITIAL_POSITION = (9, 6)
 SERVO_SPEED_PIXELS_PER_TICK = 720
 
 # ─── CUSTOMER SATISFACTION ADJUSTMENTS ───────────────────────────────────────
@@ -53,7 +130,9 @@ SAT_DECREASE_UNHAPPY = 35  # as soon as wait_time == UNHAPPY_TICKS
 SAT_ANGRY_VALUE     = 15  # as soon as wait_time == ANGRY_TICKS
 SAT_LEAVE_VALUE     = 0   # as soon as wait_time >= LEAVE_TICKS
 
-# ─── FOOD WINDOW GRID LOCATION ──────────────────────────────────────────────
-# (unchanged from original GOAPPlanner, but pulled here for easy tuning)
-FOOD_WINDOW_CELL   = (6, 1) 
+# ─── FLOOR PLAN ─────────────────────────────────────────────────────────────
+# Grid size, tables, food windows, servo start and queue come from a layout
+# file (see Simulation/layout.py). A name is looked up in Layouts/, anything
+# else is treated as a path. "default" is the original 10×7 room.
+LAYOUT = "default"
 
@@ -1,9 +1,15 @@
+import os
 from world import World
-import pygame
+from Simulation import trace
 import sys
 import traceback
 
 if __name__ == "__main__":
+    # Interactive runs: state changes on the console, full DEBUG detail kept in
+    # a ring buffer that gets dumped if something blows up.
+    if "DINER_TRACE" not in os.environ:
+        trace.configure(default=trace.DEBUG, stdout=True, stdout_level=trace.INFO, ring_buffer=2000)
+
     print("[Main] Starting DinnerAutoDashhhh...")
     try:
         print("[Main] Creating World instance...")
@@ -14,7 +20,12 @@ if __name__ == "__main__":
         print("\n=== EXCEPTION in main.py ===")
         print(f"Error type: {type(e).__name__}")
         print(f"Error message: {str(e)}")
+        if trace.get_ring_buffer() is not None:
+            print("\nLast trace records:")
+            trace.dump()
         print("\nFull traceback:")
         traceback.print_exc()
-        pygame.quit()
+        # pygame is only loaded by the renderer; shut it down if it got that far
+        if "pygame" in sys.modules:
+            sys.modules["pygame"].quit()
         sys.exit(1)
\ No newline at end of file
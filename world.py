@@ -1,89 +1,124 @@
-import pygame
-import random
+import numpy as np
+from types import SimpleNamespace
 from Actions.pathfinder import Pathfinder
 from Render.table import Table
 from Customers.customer import Customer
+from Customers.customer_index import CustomerIndex
 from Agents.servo_agent import ServoAgent
 from Customers.customer_fsm import CustomerState
 from Actions.goap_servo import ServoGOAPPlanner
-from constants import CUSTOMER_RANDOM_SPAWN_RATE, HEIGHT, MAX_TICKS, NUM_SERVOS, SERVO_COLORS, SERVO_WAGE, SIM_SECONDS_PER_TICK, TILE_SIZE, WIDTH
+from Actions.batch_steering import BatchSteering
+from Actions.steering import STEERING_MODES, OrcaAvoidance, pack_walls
+from Simulation.vector import Vector2
+from Simulation.arrivals import make_arrivals
+from Simulation.layout import load_layout
+from Simulation.nav_grid import NavGrid
+from Simulation.spatial_hash import ObstacleIndex, ObstacleView
+from Simulation import trace
+from Simulation.trace import DEBUG, INFO
+from constants import (MAX_TICKS, NUM_SERVOS, OBSTACLE_HASH_CELL_SIZE, ORCA_MAX_NEIGHBOURS, ORCA_NEIGHBOUR_DIST,
+                       ORCA_OBSTACLE_TIME_HORIZON, ORCA_TIME_HORIZON, PARKED_SERVO_PENALTY, PHYSICS_SUBSTEPS,
+                       SERVO_COLORS, SERVO_WAGE, SIM_SECONDS_PER_TICK, STEERING)
+
+_trace = trace.channel("world")
 
 class World:
-    def __init__(self, num_servos=NUM_SERVOS, seed=None, render=True):
-        # ─── Seed the RNG for reproducibility ────────────────────────────
-        if seed is not None:
-            random.seed(seed)
+    def __init__(self, num_servos=NUM_SERVOS, seed=None, render=True, arrivals=None, layout=None,
+                 pathfinding=None, targets=None, smoothing=None, steering=None, substeps=None,
+                 planner=None, allocation=None, replanning=None):
+        # ─── Per-world RNG streams for reproducibility ───────────────────
+        # Independent child streams, so drawing more from one (e.g. a
+        # different arrival model) never shifts the others.
+        self.seed = seed
+        arrival_seq, misc_seq = np.random.SeedSequence(seed).spawn(2)
+        self.arrival_rng = np.random.default_rng(arrival_seq)
+        self.rng = np.random.default_rng(misc_seq)
             
-        print("[World] Initializing...")
-        pygame.init()
-        pygame.font.init()
+        if _trace.info:
+            _trace.log(INFO, "[World] Initializing...")
         
-        # Only create screen if rendering is enabled
+        # ─── GRID / PIXEL SETUP (from the floor plan) ───────────────────────
+        self.layout = load_layout(layout)
+        self.width = self.layout.width
+        self.height = self.layout.height
+        self.cell_size = self.layout.cell_size  # Size of each grid cell in pixels
+        self.grid_width = self.layout.grid_width
+        self.grid_height = self.layout.grid_height
+
+        # Only bring up pygame (window, fonts, clock) if rendering is enabled.
+        # Headless worlds never import pygame at all.
         self.render = render
+        self.renderer = None
         if render:
-            self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-            pygame.display.set_caption("DinnerAutoDashhhh (D-Stage)")
-            # Initialize fonts
-            self.font_status = pygame.font.SysFont(None, 24)
-            self.font_kitchen = pygame.font.SysFont(None, 32)
-            self.font_window = pygame.font.SysFont(None, 24)
-            self.font_legend = pygame.font.SysFont(None, 16)
-            self.font_sat = pygame.font.SysFont(None, 18)
-        else:
-            # Create a dummy surface for non-rendering mode
-            self.screen = pygame.Surface((WIDTH, HEIGHT))
-
-        # ─── GRID / PIXEL SETUP ──────────────────────────────────────────────
-        self.width = WIDTH
-        self.height = HEIGHT
-        self.cell_size = TILE_SIZE  # Size of each grid cell in pixels
-        self.grid_width = self.width // self.cell_size
-        self.grid_height = self.height // self.cell_size
+            from Render.renderer import Renderer
+            self.renderer = Renderer(self)
         
         # ─── SIMULATION STATE ───────────────────────────────────────────────
         self.tick_count = 0
         self.max_ticks = MAX_TICKS
-        self.next_spawn_tick = CUSTOMER_RANDOM_SPAWN_RATE
+        # ─── ARRIVAL SCHEDULE (drawn once, walked by spawn_customer) ──────
+        self.arrivals = make_arrivals(arrivals)
+        self.arrival_ticks = self.arrivals.schedule(self.arrival_rng, self.max_ticks).tolist()
+        self._next_arrival = 0
+        self.next_spawn_tick = self.arrival_ticks[0] if self.arrival_ticks else None
+        if _trace.info:
+            _trace.log(INFO, f"[World] {self.arrivals}: {len(self.arrival_ticks)} arrivals scheduled")
         
         # Accumulator in "real seconds" so we know when 1 in-game minute has passed
         self._sim_time_acc = 0.0
         # How many real seconds = 1 in-game minute (simulation tick)
         self.SIM_SECONDS_PER_TICK = SIM_SECONDS_PER_TICK  # 1 in-game minute = 0.5 real seconds
+        # Fixed physics clock: every tick moves the servos physics_substeps times by physics_dt
+        self.physics_substeps = PHYSICS_SUBSTEPS if substeps is None else substeps
+        if not isinstance(self.physics_substeps, int) or self.physics_substeps < 1:
+            raise ValueError(f"substeps must be a positive int, got {self.physics_substeps!r}")
+        self.physics_dt = self.SIM_SECONDS_PER_TICK / self.physics_substeps
 
         # ─── CREATE TABLES (grid coords) ───────────────────────────────────────
-        print("[World] Creating tables...")
+        if _trace.info:
+            _trace.log(INFO, "[World] Creating tables...")
         self.tables = []
-        table_positions = [
-            (3, 3), (5, 3), (7, 3),  # Top row
-            (3, 5), (5, 5), (7, 5)   # Bottom row
-        ]
-        for (gx, gy) in table_positions:
+        for (gx, gy) in self.layout.tables:
             pos = self.grid_to_pixel(gx, gy)
-            t = Table(center=pos)
+            t = Table(center=pos, size=self.cell_size)
             t.occupied = False
             t.id = (gx, gy)
             self.tables.append(t)
+
+        # Live customer/table indexes the GOAP planner picks from
+        self.customer_index = CustomerIndex(self)
+        for i, table in enumerate(self.tables):
+            self.customer_index.add_table(table, i)
         
-        print(f"[World] Created tables at: {[tuple(t.center) for t in self.tables]}")
+        if _trace.info:
+            _trace.log(INFO, f"[World] Created tables at: {[tuple(t.center) for t in self.tables]}")
+
+        # Create food windows (servos pick dishes up from the nearest one)
+        self.food_windows = [
+            SimpleNamespace(center=self.grid_to_pixel(gx, gy), cell=(gx, gy))
+            for (gx, gy) in self.layout.food_windows
+        ]
+        self.food_window = self.food_windows[0]
 
         # ─── INITIAL CUSTOMER ─────────────────────────────────────────────────
-        print("[World] Creating initial customer...")
+        if _trace.info:
+            _trace.log(INFO, "[World] Creating initial customer...")
         self.customers = []
         self.spawn_customer()
 
         # ─── BUILD NAV GRID FOR A* & GOAP ─────────────────────────────────────
-        print("[World] Creating navigation grid...")
-        self.nav_grid = [[0 for _ in range(self.grid_height)] for _ in range(self.grid_width)]
+        if _trace.info:
+            _trace.log(INFO, "[World] Creating navigation grid...")
+        self.nav_grid = NavGrid(self.grid_width, self.grid_height)
         self.update_nav_grid()
 
-        print("[World] Creating pathfinder...")
-        self.pathfinder = Pathfinder(self)
+        if _trace.info:
+            _trace.log(INFO, "[World] Creating pathfinder...")
+        self.pathfinder = Pathfinder(self, pathfinding, smoothing)
 
-        print("[World] Creating GOAP planner...")
-        self.goap = ServoGOAPPlanner(self)
-        
-        # ─── PYGAME CLOCK ─────────────────────────────────────────────────────
-        self.clock = pygame.time.Clock()
+        if _trace.info:
+            _trace.log(INFO, "[World] Creating GOAP planner...")
+        self.goap = ServoGOAPPlanner(self, targets, planner, allocation, replanning)
 
         # ─── ADD BUSINESS COST & SERVO ───────────────────────────────────────
         self.profit = 500
@@ -94,38 +129,112 @@ class World:
             # give it a color based on its index
             servo.color = SERVO_COLORS[i % len(SERVO_COLORS)]
             self.servos.append(servo)
+
+        # ─── OBSTACLE INDEX FOR STEERING ─────────────────────────────────────
+        # Tables and servos now, seated customers synced every tick
+        self.obstacle_index = ObstacleIndex(OBSTACLE_HASH_CELL_SIZE)
+        for i, table in enumerate(self.tables):
+            self.obstacle_index.add_table(table, i)
+        for i, servo in enumerate(self.servos):
+            self.obstacle_index.add_servo(servo, i)
                 
         # ─── TRACK COMPLETED CUSTOMERS FOR ANALYSIS ─────────────────────────
         self.completed_customers: list[Customer] = []
-        
-        # Create food window
-        from types import SimpleNamespace
-        self.food_window = SimpleNamespace(center=pygame.math.Vector2(520, 120))
+
+        # Optional per-tick replay recorder (Simulation/replay.py)
+        self.recorder = None
         
         # Define walls for avoidance behavior
         self.walls = self._create_walls()
+        self.wall_segments = pack_walls(self.walls)
         self.obstacles = self.tables # Start with tables as static obstacles
 
-        print("[World] Initialization complete.")
+        # "batch" and "orca" steering move all servos together
+        self.steering = STEERING if steering is None else steering
+        if self.steering not in STEERING_MODES:
+            raise ValueError(f"Unknown steering mode {self.steering!r}; expected one of {STEERING_MODES}")
+        self.steering_engine = self.make_steering_engine()
+
+        if _trace.info:
+            _trace.log(INFO, "[World] Initialization complete.")
 
     def get_obstacles(self, agent_to_exclude):
-        """Returns a list of all dynamic and static obstacles, excluding the agent itself."""
-        # Other servos
-        other_agents = [agent for agent in self.servos if agent is not agent_to_exclude]
-        # Seated customers (treat them as temporary obstacles)
-        seated_customers = [cust for cust in self.customers if cust.fsm.current == CustomerState.SEATED]
-        
-        # Combine all obstacles
-        return self.tables + other_agents + seated_customers
+        """
+        All dynamic and static obstacles excluding the agent itself: tables,
+        other servos and seated customers (as of the last sync_obstacles()).
+        Returns a view over the spatial index; it iterates like the old list
+        and steering queries it with near() for just the detection box.
+        """
+        return ObstacleView(self.obstacle_index, agent_to_exclude)
+
+    def sync_obstacles(self):
+        """Seated customers (treat them as temporary obstacles) into the obstacle index."""
+        self.obstacle_index.sync_customers(self.customer_index.in_state(CustomerState.SEATED))
+
+    def maintain_paths(self):
+        """Per-tick upkeep of walking servos' paths: repair ("dstar") or extend ("whca")."""
+        if self.pathfinder.mode == "dstar":
+            self.repair_paths()
+        elif self.pathfinder.mode == "whca":
+            self.extend_reservations()
+
+    def repair_paths(self):
+        """
+        "dstar" pathfinding: servos standing idle make their cells expensive to
+        walk through; every walking servo whose planner was affected repairs
+        its remaining path in place.
+        """
+        parked = {servo.grid_position(): PARKED_SERVO_PENALTY
+                  for servo in self.servos if not servo.executing}
+        touched = self.pathfinder.update_penalties(parked)
+        for servo in self.servos:
+            if servo.executing and servo in touched:
+                servo.repair_path()
+
+    def make_steering_engine(self):
+        """What moves the servos together for self.steering, or None for per-servo move()."""
+        if self.steering == "batch":
+            return BatchSteering(self)
+        if self.steering == "orca":
+            return OrcaAvoidance(self, ORCA_TIME_HORIZON, ORCA_OBSTACLE_TIME_HORIZON,
+                                 ORCA_NEIGHBOUR_DIST, ORCA_MAX_NEIGHBOURS)
+        return None
+
+    def move_servos(self, dt):
+        """Move every servo by dt, in order (all at once with "batch" or "orca" steering)."""
+        if self.steering_engine is not None:
+            self.steering_engine.move(self.servos, dt)
+            return
+        for servo in self.servos:
+            servo.move(dt)
+
+    def step_physics(self):
+        """One tick of servo movement: physics_substeps fixed steps of physics_dt."""
+        if self.render:
+            # Where each servo was, so frames can be drawn between this tick and the last
+            for servo in self.servos:
+                servo.previous_position = servo.position.copy()
+        for _ in range(self.physics_substeps):
+            self.move_servos(self.physics_dt)
+
+    def extend_reservations(self):
+        """
+        "whca" pathfinding: drop reservations for ticks gone by, and let every
+        walking servo that has used up half its reserved window plan the next.
+        """
+        self.pathfinder.expire_reservations()
+        for servo in self.servos:
+            if servo.executing:
+                servo.extend_path()
 
     def _create_walls(self):
         """Creates a list of wall line segments for wall avoidance."""
         walls = []
         # Top, Bottom, Left, Right
-        walls.append((pygame.math.Vector2(0, 0), pygame.math.Vector2(self.width, 0)))
-        walls.append((pygame.math.Vector2(0, self.height), pygame.math.Vector2(self.width, self.height)))
-        walls.append((pygame.math.Vector2(0, 0), pygame.math.Vector2(0, self.height)))
-        walls.append((pygame.math.Vector2(self.width, 0), pygame.math.Vector2(self.width, self.height)))
+        walls.append((Vector2(0, 0), Vector2(self.width, 0)))
+        walls.append((Vector2(0, self.height), Vector2(self.width, self.height)))
+        walls.append((Vector2(0, 0), Vector2(0, self.height)))
+        walls.append((Vector2(self.width, 0), Vector2(self.width, self.height)))
         return walls
 
     def grid_to_pixel(self, gx: int, gy: int):
@@ -136,7 +245,7 @@ class World:
         # Convert to pixel coordinates (center of cell)
         px = (gx + 0.5) * self.cell_size
         py = (gy + 0.5) * self.cell_size
-        return pygame.math.Vector2(px, py)
+        return Vector2(px, py)
 
     def pixel_to_grid(self, pixel_pos):
         """Convert pixel coordinates to grid coordinates."""
@@ -159,59 +268,36 @@ class World:
         """Get the grid cell containing this table's center."""
         return self.pixel_to_grid(table.center)
 
+    def approach_cells(self, table):
+        """Walkable cells a servo can serve `table` from, in (0,+1), (0,-1), (+1,0), (-1,0) order."""
+        tgx, tgy = self.pixel_to_grid(table.center)
+        cells = []
+        for dx, dy in [(0, +1), (0, -1), (+1, 0), (-1, 0)]:
+            nx, ny = tgx + dx, tgy + dy
+            if (0 <= nx < self.grid_width
+                and 0 <= ny < self.grid_height
+                and self.nav_grid[nx][ny] == 0):
+                cells.append((nx, ny))
+        return cells
+
     def update_nav_grid(self):
-        """Mark edges/kitchen/food window/queue as walkable or blocked."""
-        # 1) Reset grid (0 = walkable, 1 = blocked)
-        for x in range(self.grid_width):
-            for y in range(self.grid_height):
-                self.nav_grid[x][y] = 0
-                
-        # 2) Edges (GUI window size) is blocked
-        for x in range(self.grid_width):
-            self.nav_grid[x][0] = 1  # Top edge
-            self.nav_grid[x][self.grid_height-1] = 1  # Bottom edge
-        for y in range(self.grid_height):
-            self.nav_grid[0][y] = 1  # Left edge
-            self.nav_grid[self.grid_width-1][y] = 1  # Right edge
-            
-        # 3) Kitchen area - row 0 to 1 (y=0 to y=1) is walkable
-        for x in range(1, self.grid_width-1):
-            self.nav_grid[x][0] = 0  
-            self.nav_grid[x][1] = 0  
-            
-        # 4) Food window area - row 2 (y=2) is walkable
-        for x in range(3, self.grid_width-1):  
-            self.nav_grid[x][2] = 0  
-            
-        # 5) Customer queue is col 1 (x=1, just under food window) is walkable
-        for y in range(2, self.grid_height-1):
-            self.nav_grid[1][y] = 0 
-            
-        # 6) Tables: only mark the eight neighbors WALKABLE so the servo can approach.
-        for table in self.tables:
-            gx, gy = self.pixel_to_grid(table.center)
-            # ───── Block the table's own grid cell ─────
-            self.nav_grid[gx][gy] = 1
-            print(f"[DEBUG] Blocking table cell at grid {(gx,gy)}")
-
-            # Mark cells around table as walkable
-            for dx in [-1, 0, 1]:
-                for dy in [-1, 0, 1]:
-                    nx, ny = gx + dx, gy + dy
-                    if 0 <= nx < self.grid_width and 0 <= ny < self.grid_height:
-                        if dx != 0 or dy != 0:  # If it's not the table's own cell, force it to be walkable
-                            self.nav_grid[nx][ny] = 0
-                        # If it's not the table's own center, force it to be walkable
-                        if not (dx == 0 and dy == 0):
-                            self.nav_grid[nx][ny] = 0
+        """
+        Rebuild the nav grid from the floor plan: border and walls blocked,
+        kitchen/food window/queue open, each table's cell blocked with its
+        eight neighbours walkable (see Simulation/layout.py).
+        """
+        self.layout.build_nav_grid(self.nav_grid)
+        if _trace.debug:
+            for table in self.tables:
+                _trace.log(DEBUG, f"[DEBUG] Blocking table cell at grid {self.pixel_to_grid(table.center)}")
 
     # ─── SIMULATION TICK (advance "1 in-game minute") ─────────────────────────
     def _do_one_simulation_tick(self):
         """All the logic that used to live in your old updateAll(), *except* servo movement."""
         self.tick_count += 1
 
-        # ─── (A) SPAWN NEW CUSTOMER ──────────────────────────────────────
-        if self.tick_count == self.next_spawn_tick and self.tick_count <= self.max_ticks:
+        # ─── (A) SPAWN NEW CUSTOMER(S) ───────────────────────────────────
+        while self.tick_count == self.next_spawn_tick and self.tick_count <= self.max_ticks:
             self.spawn_customer()
 
         # ─── (B) UPDATE EACH CUSTOMER'S FSM & TIMERS ──────────────────────
@@ -219,25 +305,39 @@ class World:
             cust.update()
                 
         # (C) RUN GOAP → ASSIGN A PLAN TO EACH SERVO
+        self.sync_obstacles()
+        self.maintain_paths()
+        idle = [servo for servo in self.servos if not servo.executing]
+        planning = self.goap.should_plan(idle)
+        allocated = None
+        if planning and self.goap.allocation == "global":
+            allocated = self.goap.allocate(idle)
+        handed_out = False
         for idx, servo in enumerate(self.servos):
             # Update obstacle list for the servo
             servo.obstacles = self.get_obstacles(servo)
             if servo.executing:
-                print(f"Servo#{idx} already busy")
+                if _trace.debug:
+                    _trace.log(DEBUG, f"Servo#{idx} already busy")
+                continue
+            if not planning:
                 continue
-            new_plan = self.goap.compute_plan(servo)
-            print(f"Servo#{idx} plan → {new_plan}")
+            new_plan = self.goap.compute_plan(servo) if allocated is None else allocated.get(servo)
+            if _trace.debug:
+                _trace.log(DEBUG, f"Servo#{idx} plan → {new_plan}")
             
             if new_plan is None:
                 continue
+            handed_out = True
 
             # block double–pickups
             if not servo.actions_equal(new_plan, servo.current_action):
                 servo.start_new_plan(new_plan)
+        if planning:
+            self.goap.planned(idle, handed_out)
 
         # ─── (D) MOVE SERVOS ALONG THEIR WAYPOINTS ────────────────────────────────────
-        for servo in self.servos:
-            servo.move(self.SIM_SECONDS_PER_TICK)
+        self.step_physics()
 
         # ─── (E) DEDUCT STAFF WAGE COST ────────────────────────────────────
         self.profit -= SERVO_WAGE / 60.0 * self.num_servos
@@ -249,6 +349,11 @@ class World:
                 self.completed_customers.append(cust)
                 # remove from active list
                 self.customers.remove(cust)
+                self.customer_index.remove(cust)
+
+        # ─── (G) Replay frame, if this run is being recorded ──────────────
+        if self.recorder is not None:
+            self.recorder.record(self)
 
     def spawn_customer(self):
         """Create a new customer."""
@@ -258,7 +363,8 @@ class World:
             if not c.arrived and not c.marked_for_removal
         ]
         queue_size = len(waiting_list)
-        queue_y = 180 + queue_size * 60  # Space customers 60 pixels apart vertically
+        queue_x, queue_y0 = self.layout.queue_origin
+        queue_y = queue_y0 + queue_size * self.layout.queue_spacing  # Space customers apart vertically
         
         # Create customer at queue position
         customer = Customer(
@@ -266,115 +372,79 @@ class World:
             spawn_tick=self.tick_count,
             group_size=1
         )
-        customer.position = pygame.math.Vector2(100, queue_y)
+        customer.position = Vector2(queue_x, queue_y)
         self.customers.append(customer)
-        print(f"[World] Spawned Customer#{customer.spawn_tick} at queue y={queue_y}")
+        self.customer_index.add(customer)
+        if _trace.info:
+            _trace.log(INFO, f"[World] Spawned Customer#{customer.spawn_tick} at queue y={queue_y}")
         
-        # Set next spawn time
-        self.next_spawn_tick = self.tick_count + CUSTOMER_RANDOM_SPAWN_RATE
-        print(f"[World] Next spawn at tick {self.next_spawn_tick}")
+        # Set next spawn time from the pre-drawn schedule (the customer present
+        # at opening isn't on it; everyone after is)
+        arrival_ticks = self.arrival_ticks
+        if self._next_arrival < len(arrival_ticks) and arrival_ticks[self._next_arrival] <= self.tick_count:
+            self._next_arrival += 1
+        i = self._next_arrival
+        self.next_spawn_tick = arrival_ticks[i] if i < len(arrival_ticks) else None
+        if _trace.debug:
+            _trace.log(DEBUG, f"[World] Next spawn at tick {self.next_spawn_tick}")
         
         return customer
 
-    def drawAll(self):
-        """Draw all game objects to the screen."""
+    def add_servo(self):
+        """Clock in one more servo mid-service (e.g. in a forked what-if branch)."""
+        servo = ServoAgent(self, self.goap, self.pathfinder)
+        servo.color = SERVO_COLORS[len(self.servos) % len(SERVO_COLORS)]
+        self.servos.append(servo)
+        self.obstacle_index.add_servo(servo, len(self.servos) - 1)
+        self.num_servos = len(self.servos)
+        return servo
+
+    # ─── SNAPSHOT / FORK ──────────────────────────────────────────────────
+    def snapshot(self):
+        """Compact, immutable copy of the current state (see Simulation/snapshot.py)."""
+        from Simulation.snapshot import take_snapshot
+        return take_snapshot(self)
+
+    def fork(self, render=False):
+        """Independent copy of this world that can be stepped on its own."""
+        return self.snapshot().restore(render=render)
+
+    def drawAll(self, alpha=1.0):
+        """Draw all game objects to the screen, servos `alpha` of the way from the last tick to this one."""
         if not self.render:
             return
-            
-        print(f"[World] Tick {self.tick_count:03d}: drawAll()")
-        
-        # 1) Fill background
-        self.screen.fill((249, 247, 237))
-
-        # 2) Draw status bar (dark gray)
-        pygame.draw.rect(self.screen, (64, 64, 64), pygame.Rect(0, 0, WIDTH, 40))
-        tick_text = self.font_status.render(f"Tick: {self.tick_count}/{self.max_ticks}", True, (255, 255, 255))
-        self.screen.blit(tick_text, (20, 10))
-        
-        profit_text = self.font_status.render(f"Profit: ${int(self.profit)}", True, (255,255,255))
-        self.screen.blit(profit_text, (200, 10))
-
-
-        # 3) Draw KITCHEN bar (pale pink)
-        pygame.draw.rect(self.screen, (255, 246, 250), pygame.Rect(0, 40, WIDTH, 40))
-        kitchen_text = self.font_kitchen.render("KITCHEN", True, (0, 0, 0))
-        self.screen.blit(kitchen_text, (WIDTH // 2 - kitchen_text.get_width() // 2, 60 - 16))
-
-        # 4) Draw FOOD WINDOW (off-white)
-        pygame.draw.rect(self.screen, (250, 240, 240), pygame.Rect(200, 80, WIDTH-200, 40))
-        food_text = self.font_window.render("FOOD WINDOW", True, (0, 0, 0))
-        self.screen.blit(food_text, (WIDTH // 2 - food_text.get_width() // 2, 100 - 12))
-
-        # 5) Draw left queue panel (light yellow)
-        pygame.draw.rect(self.screen, (255, 247, 231), pygame.Rect(0, 120, 200, HEIGHT-120))
-        pygame.draw.rect(self.screen, (64, 64, 64), pygame.Rect(0, 120, 200, HEIGHT-120), 2)
-        
-        # Draw legend text at top of queue panel
-        legend_lines = [
-            "1 tick = 1 min",
-            "Wait time:",
-            "  10 mins: UNHAPPY (yellow)",
-            "  20 mins: ANGRY (orange)",
-            "  30 mins: LEAVING (red)",
-
-        ]
-        for i, line in enumerate(legend_lines):
-            legend = self.font_legend.render(line, True, (0, 0, 0))
-            self.screen.blit(legend, (10, 42 + i*15))
-
-        #  6) Now draw each table on top of that overlay
-        for table in self.tables:
-            table.draw(self.screen)
-            
-        # 7) Draw ALL customers (both waiting and seated)
-        waiting_count = 0
-        for cust in self.customers:
-            if cust.fsm.current in (CustomerState.WAITING,
-                                    CustomerState.UNHAPPY,
-                                    CustomerState.ANGRY):
-                # Position in queue
-                queue_x = 100
-                queue_y = 180 + waiting_count * 60
-                cust.position = pygame.math.Vector2(queue_x, queue_y)
-                waiting_count += 1
-            cust.draw(self.screen)
-
-        # 8) Draw ALL servos LAST so they remain on top
-        for idx, servo in enumerate(self.servos):
-            servo.color = SERVO_COLORS[idx % len(SERVO_COLORS)]
-            servo.draw(self.screen)
-                
-        pygame.display.flip()
+        self.renderer.draw(alpha)
 
     # ─── MAIN LOOP ──────────────────────────────────────────────────────────
     def run(self):
+        if self.renderer is None:
+            raise RuntimeError("World.run() is the interactive loop and needs render=True; "
+                               "headless runs should step _do_one_simulation_tick() or use EventScheduler")
+        # Stamp trace records with the tick of the world on screen
+        trace.set_clock(lambda: self.tick_count)
         running = True
         while running:
             # (1) Pygame events
-            for ev in pygame.event.get():
-                if ev.type == pygame.QUIT:
-                    running = False
+            if self.renderer.quit_requested():
+                running = False
 
             # (2) Figure out how much real time has passed
-            dt = self.clock.tick(10) / 1000.0
+            dt = self.renderer.tick(10)
             #   dt is in seconds. If you run at ~60 FPS, dt ~ 0.0167.
 
             # (3) Accumulate until we hit 1 simulation tick
             self._sim_time_acc += dt
             while self._sim_time_acc >= self.SIM_SECONDS_PER_TICK:
-                # Advance exactly one in-game minute:
+                # Advance exactly one in-game minute (servos move on the fixed physics clock):
                 self._do_one_simulation_tick()
                 self._sim_time_acc -= self.SIM_SECONDS_PER_TICK
 
-            # (4) Move all servos smoothly (every frame):
-            for servo in self.servos:
-                servo.move(dt)
-
-            # (5) Draw everything (this also shows newly updated customers/tables):
+            # (4) Draw everything, servos interpolated between the last two ticks
+            #     so movement looks smooth at any frame rate:
             if self.render:
-                self.drawAll()
+                self.drawAll(self._sim_time_acc / self.SIM_SECONDS_PER_TICK)
 
-        pygame.quit()
+        self.renderer.close()
 
     def update_queue_positions(self):
         """Update the positions of customers in the queue."""
@@ -386,7 +456,7 @@ class World:
         
         # Update each customer's position in queue
         for i, customer in enumerate(waiting_list):
-            target_y = 180 + i * 60  # Space customers 60 pixels apart vertically
+            target_y = self.layout.queue_origin[1] + i * self.layout.queue_spacing  # Space customers apart vertically
             # Smoothly move towards target position
             current_y = customer.position.y
             dy = target_y - current_y
@@ -405,6 +475,9 @@ class World:
         self.update_queue_positions()
 
         # Remove customers marked for removal
+        for c in self.customers:
+            if c.marked_for_removal:
+                self.customer_index.remove(c)
         self.customers = [c for c in self.customers if not c.marked_for_removal]
 
         # Update servos
@@ -412,7 +485,7 @@ class World:
             servo.update()
 
         # Spawn new customer if it's time
-        if self.tick_count >= self.next_spawn_tick:
+        if self.next_spawn_tick is not None and self.tick_count >= self.next_spawn_tick:
             self.spawn_customer()
 
         # Increment tick counter